@@ -0,0 +1,188 @@
+"""
+Command-line launcher shared by the MCP servers of task2 and task3.
+
+By default a server runs over stdio, as spawned by the MCP client. With
+`--transport streamable-http` (or `sse`) it runs as a long-lived HTTP server
+that many clients can share, optionally with several uvicorn worker processes
+behind one port:
+
+    python summarization_server.py --transport streamable-http --port 8001 --workers 4
+
+The same settings can be given through MCP_TRANSPORT, MCP_HOST, MCP_PORT,
+MCP_WORKERS and MCP_ALLOWED_HOSTS.
+
+The servers have no authentication and their tools read local files, so they
+bind to 127.0.0.1 by default. Binding another address requires the Host
+names clients will use (`--allowed-host mcp.internal:8001`, repeatable, or
+MCP_ALLOWED_HOSTS as a comma-separated list): requests with any other Host or
+Origin header are rejected (DNS rebinding protection).
+
+Worker processes share nothing but the port. Only streamable HTTP (which runs
+stateless) supports several workers: an SSE session lives in the process that
+opened it, so its POSTs to /messages would reach other workers, and --workers
+is rejected for SSE. Stateful tools are per worker as well: background jobs
+and chunk retries run in the worker that accepted them, and other workers
+only see them through the state files they write under output/.
+"""
+
+import argparse
+import contextlib
+import os
+import re
+import sys
+from typing import List
+
+TRANSPORTS = ["stdio", "streamable-http", "sse"]
+LOCAL_HOSTS = ("127.0.0.1", "localhost", "::1")
+# Host headers and origins that are always accepted
+LOCAL_ALLOWED_HOSTS = ["127.0.0.1:*", "localhost:*", "[::1]:*"]
+LOCAL_ALLOWED_ORIGINS = ["http://127.0.0.1:*", "http://localhost:*", "http://[::1]:*"]
+
+
+def _env_allowed_hosts() -> List[str]:
+    """Host names from MCP_ALLOWED_HOSTS (comma-separated)."""
+    return [host.strip() for host in os.getenv("MCP_ALLOWED_HOSTS", "").split(",") if host.strip()]
+
+
+def parse_args(default_port: int, description: str):
+    """Parse the transport options for a server."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--transport", choices=TRANSPORTS,
+                        default=os.getenv("MCP_TRANSPORT", "stdio"),
+                        help="MCP transport (default: stdio)")
+    parser.add_argument("--host", default=os.getenv("MCP_HOST", "127.0.0.1"),
+                        help="Bind address for HTTP transports")
+    parser.add_argument("--port", type=int, default=int(os.getenv("MCP_PORT", default_port)),
+                        help="Port for HTTP transports")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("MCP_WORKERS", "1")),
+                        help="uvicorn worker processes for HTTP transports")
+    parser.add_argument("--allowed-host", dest="allowed_hosts", action="append", default=None,
+                        help="Host header clients use to reach a non-local bind address, e.g. "
+                             "mcp.internal or 10.0.0.5:8001 (repeatable; default: MCP_ALLOWED_HOSTS)")
+    args = parser.parse_args()
+    if args.allowed_hosts is None:
+        args.allowed_hosts = _env_allowed_hosts()
+    if args.transport == "sse" and args.workers > 1:
+        parser.error("--workers > 1 is not supported with --transport sse: SSE sessions are bound "
+                     "to one process (use streamable-http, or run one worker per port behind a "
+                     "sticky load balancer)")
+    if args.transport != "stdio" and args.host not in LOCAL_HOSTS and not args.allowed_hosts:
+        parser.error(f"--host {args.host} exposes the server beyond this machine: pass --allowed-host "
+                     "(or MCP_ALLOWED_HOSTS) with the Host names clients will use")
+    return args
+
+
+def transport_security(allowed_hosts: List[str]):
+    """
+    Build the DNS rebinding protection settings for the given Host names.
+
+    A name without a port (e.g. 'mcp.internal') is accepted on any port.
+
+    Args:
+        allowed_hosts: Host header values clients use, besides localhost
+
+    Returns:
+        TransportSecuritySettings accepting localhost and the given hosts
+    """
+    from mcp.server.transport_security import TransportSecuritySettings
+
+    hosts, origins = list(LOCAL_ALLOWED_HOSTS), list(LOCAL_ALLOWED_ORIGINS)
+    for host in allowed_hosts:
+        names = [host] if re.search(r":(\d+|\*)$", host) else [host, f"{host}:*"]
+        hosts.extend(names)
+        origins.extend(f"{scheme}://{name}" for name in names for scheme in ("http", "https"))
+    return TransportSecuritySettings(enable_dns_rebinding_protection=True,
+                                     allowed_hosts=hosts, allowed_origins=origins)
+
+
+def http_app(mcp, transport: str = None):
+    """
+    Build the ASGI app for an HTTP transport.
+
+    With streamable HTTP the server runs stateless, so any worker process can
+    answer any request. The server's own lifespan (the background warm-up) is
+    started with the app, so the first client does not pay for model loading.
+
+    Args:
+        mcp: The FastMCP server instance
+        transport: 'streamable-http' or 'sse' (defaults to MCP_TRANSPORT)
+
+    Returns:
+        A Starlette application
+
+    Raises:
+        RuntimeError: If MCP_HOST is not a local address and MCP_ALLOWED_HOSTS is empty
+    """
+    transport = transport or os.getenv("MCP_TRANSPORT", "streamable-http")
+    host = os.getenv("MCP_HOST", mcp.settings.host)
+    allowed_hosts = _env_allowed_hosts()
+    if host not in LOCAL_HOSTS and not allowed_hosts:
+        raise RuntimeError(f"MCP_HOST={host} requires MCP_ALLOWED_HOSTS (see server_cli.py)")
+    if allowed_hosts:
+        mcp.settings.transport_security = transport_security(allowed_hosts)
+
+    if transport == "sse":
+        app = mcp.sse_app()
+    else:
+        mcp.settings.stateless_http = True
+        app = mcp.streamable_http_app()
+
+    server_lifespan = mcp.settings.lifespan
+    if server_lifespan is not None:
+        app_lifespan = app.router.lifespan_context
+
+        @contextlib.asynccontextmanager
+        async def lifespan(starlette_app):
+            async with server_lifespan(mcp):
+                async with app_lifespan(starlette_app):
+                    yield
+
+        app.router.lifespan_context = lifespan
+    return app
+
+
+def run_server(mcp, module_name: str, default_port: int, description: str):
+    """
+    Run a FastMCP server with the transport selected on the command line.
+
+    Args:
+        mcp: The FastMCP server instance
+        module_name: Module that defines `create_http_app()`, used by uvicorn
+                     to build the app in each worker process
+        default_port: Port used when --port / MCP_PORT is not given
+        description: Help text for the command line
+
+    With several workers, in-memory state (job threads, retry timers, caches)
+    is per worker process; see the module docstring.
+    """
+    args = parse_args(default_port, description)
+
+    if args.transport == "stdio":
+        print("Launching FastMCP Server via stdio...", file=sys.stderr)
+        mcp.run()
+        return
+
+    import uvicorn
+
+    # Worker processes re-import the server module and read these back
+    os.environ["MCP_TRANSPORT"] = args.transport
+    os.environ["MCP_HOST"] = args.host
+    os.environ["MCP_ALLOWED_HOSTS"] = ",".join(args.allowed_hosts)
+
+    path = mcp.settings.sse_path if args.transport == "sse" else mcp.settings.streamable_http_path
+    print(f"Launching FastMCP Server via {args.transport} on http://{args.host}:{args.port}{path} "
+          f"({args.workers} worker(s))...", file=sys.stderr)
+
+    if args.workers <= 1:
+        uvicorn.run(http_app(mcp, args.transport), host=args.host, port=args.port)
+    else:
+        # Each worker process imports the server module (from the directory of
+        # the launched script) and builds its own app
+        uvicorn.run(
+            f"{module_name}:create_http_app",
+            factory=True,
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            app_dir=os.path.dirname(os.path.abspath(sys.modules["__main__"].__file__)),
+        )
@@ -8,8 +8,11 @@ from google import genai
 from dotenv import load_dotenv
 import requests
 from google.adk.tools.tool_context import ToolContext
+from pydantic import ValidationError
 import re
 from api_fetching_agent.tools import fetch_weather, fetch_exchange_rate
+from .schemas import HallucinationJudgment
+from summarization_agent.context_cache import ContextCache, GeminiContextBackend, LocalContextBackend, CONTEXT_CACHE_BACKEND, is_cache_error
 
 # Load environment variables
 
@@ -18,6 +21,15 @@ load_dotenv()
 # Configure Gemini API
 client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 
+# Source documents sent to the judge are cached as prefixes and reused when the
+# same document is evaluated again (see summarization_agent/context_cache.py)
+if CONTEXT_CACHE_BACKEND == "off":
+    context_cache = None
+elif CONTEXT_CACHE_BACKEND == "local":
+    context_cache = ContextCache(LocalContextBackend())
+else:
+    context_cache = ContextCache(GeminiContextBackend(client))
+
 # Initialize embedding model for similarity calculation
 embedding_model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
 
@@ -75,6 +87,80 @@ def evaluate_llm_responses(response: str, ground_truth: str, threshold: float =
         raise Exception(f"Error in similarity evaluation: {str(e)}")
 
 
+# Schema-constrained judge output (the SDK returns it as response.parsed)
+JUDGE_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": HallucinationJudgment,
+}
+
+
+def _judge_prompt(response: str, ground_truth: Optional[str] = None) -> str:
+    """
+    Build the judge prompt.
+
+    Without ground_truth the prompt refers to the source text sent before it
+    as a cached prefix.
+    """
+    if ground_truth is None:
+        source = "The SOURCE TEXT is the document provided above."
+    else:
+        source = f"""**SOURCE TEXT**:
+{ground_truth}"""
+    return f"""You are an expert fact-checker evaluating whether a summary contains hallucinations.
+
+**Task**: Determine if the SUMMARY contains any information that cannot be found or reasonably inferred from the SOURCE TEXT.
+
+{source}
+
+**SUMMARY**:
+{response}
+
+**Instructions**:
+1. Carefully read both the source text and the summary
+2. Identify any claims, facts, or details in the summary that are NOT present in the source
+3. Distinguish between:
+   - Valid abstractions/generalizations (acceptable)
+   - Information that can be reasonably inferred (acceptable)
+   - Fabricated or added information (hallucination)
+
+**Response Format**: The response schema defines the fields: has_hallucination, confidence (high/medium/low),
+hallucinated_claims (the unsupported statements, empty if none) and explanation (detailed reasoning for your decision)."""
+
+
+def _parse_judgment(judge_response, model_name: str) -> HallucinationJudgment:
+    """
+    Validate the judge's structured output, with one repair call if it is malformed.
+    
+    The repair call sends only the malformed output and the validation error,
+    not the source text, so it costs far less than repeating the judgment.
+    
+    Raises:
+        ValidationError: If the repaired output is still invalid
+    """
+    parsed = getattr(judge_response, "parsed", None)
+    if isinstance(parsed, HallucinationJudgment):
+        return parsed
+    raw_output = judge_response.text or ""
+    try:
+        return HallucinationJudgment.model_validate_json(raw_output)
+    except ValidationError as e:
+        print(f"Judge output does not match the schema, repairing it: {e.error_count()} error(s)", flush=True)
+        repair_prompt = (
+            "Rewrite the following output as a JSON object that matches the response schema. "
+            "Keep its verdict, claims and reasoning; only fix the format.\n\n"
+            f"**Validation errors**:\n{str(e)}\n\n**Output**:\n{raw_output}"
+        )
+    repair_response = client.models.generate_content(
+        model=model_name,
+        contents=repair_prompt,
+        config=JUDGE_CONFIG
+    )
+    parsed = getattr(repair_response, "parsed", None)
+    if isinstance(parsed, HallucinationJudgment):
+        return parsed
+    return HallucinationJudgment.model_validate_json(repair_response.text or "")
+
+
 def hallucination_checker(response: str, ground_truth: str, model_name: str = "gemini-3-flash-preview") -> Dict[str, Any]:
     """
     Check for hallucinations in the LLM-generated response using an LLM-as-a-judge approach.
@@ -95,6 +181,8 @@ def hallucination_checker(response: str, ground_truth: str, model_name: str = "g
             - hallucinated_claims (list): List of specific hallucinated statements (if any)
             - explanation (str): Detailed reasoning from the judge
             - judge_model (str): The model used for judgment
+            - context_cache (dict): Cache name and whether it was reused, if the
+              source text was sent as a cached prefix
             
     Raises:
         ValueError: If response or ground_truth is empty
@@ -107,72 +195,62 @@ def hallucination_checker(response: str, ground_truth: str, model_name: str = "g
         if not ground_truth or not ground_truth.strip():
             raise ValueError("Ground truth text is empty or contains only whitespace")
         
-        # Create the judge prompt
-        judge_prompt = f"""You are an expert fact-checker evaluating whether a summary contains hallucinations.
-
-**Task**: Determine if the SUMMARY contains any information that cannot be found or reasonably inferred from the SOURCE TEXT.
-
-**SOURCE TEXT**:
-{ground_truth}
-
-**SUMMARY**:
-{response}
-
-**Instructions**:
-1. Carefully read both the source text and the summary
-2. Identify any claims, facts, or details in the summary that are NOT present in the source
-3. Distinguish between:
-   - Valid abstractions/generalizations (acceptable)
-   - Information that can be reasonably inferred (acceptable)
-   - Fabricated or added information (hallucination)
-
-**Response Format** (JSON):
-{{
-  "has_hallucination": true/false,
-  "confidence": "high/medium/low",
-  "hallucinated_claims": ["claim 1", "claim 2", ...],
-  "explanation": "Detailed reasoning for your decision"
-}}
-
-Respond ONLY with valid JSON, no additional text."""
-
-        # Call Gemini API for judgment
-        judge_response = client.models.generate_content(
-            model=model_name,
-            contents=judge_prompt
-        )
-        
-        # Parse the JSON response
-        response_text = judge_response.text.strip()
-        
-        # Extract JSON from markdown code blocks if present
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0].strip()
+        # The source document is sent as a cached prefix when it is long enough, so
+        # re-evaluating the same document only sends the summary and instructions
+        cached = None
+        if context_cache is not None:
+            cached = context_cache.request(model_name, ground_truth, _judge_prompt(response),
+                                           display_name="hallucination_checker")
         
-        judgment = json.loads(response_text)
+        # Call Gemini API for judgment
+        try:
+            if cached is not None:
+                judge_response = client.models.generate_content(
+                    model=model_name,
+                    contents=cached["contents"],
+                    config={**cached["config"], **JUDGE_CONFIG}
+                )
+            else:
+                judge_response = client.models.generate_content(
+                    model=model_name,
+                    contents=_judge_prompt(response, ground_truth),
+                    config=JUDGE_CONFIG
+                )
+        except Exception as e:
+            if cached is None or not is_cache_error(e):
+                raise
+            # The cache expired or was deleted: drop it and send the document inline
+            print(f"Context cache {cached['cache']} unavailable, retrying without it", flush=True)
+            context_cache.invalidate(model_name, ground_truth)
+            cached = None
+            judge_response = client.models.generate_content(
+                model=model_name,
+                contents=_judge_prompt(response, ground_truth),
+                config=JUDGE_CONFIG
+            )
         
-        # Validate judgment structure
-        has_hallucination = judgment.get("has_hallucination", False)
+        # Validate the structured judgment (one cheap repair call if it is malformed)
+        judgment = _parse_judgment(judge_response, model_name)
         
         # Determine verdict
-        verdict = "FAIL" if has_hallucination else "PASS"
+        verdict = "FAIL" if judgment.has_hallucination else "PASS"
         
         # Create evaluation result
         result = {
-            "has_hallucination": has_hallucination,
+            "has_hallucination": judgment.has_hallucination,
             "verdict": verdict,
-            "confidence": judgment.get("confidence", "unknown"),
-            "hallucinated_claims": judgment.get("hallucinated_claims", []),
-            "explanation": judgment.get("explanation", "No explanation provided"),
+            "confidence": judgment.confidence,
+            "hallucinated_claims": judgment.hallucinated_claims,
+            "explanation": judgment.explanation,
             "judge_model": model_name
         }
+        if cached is not None:
+            result["context_cache"] = {"cache": cached["cache"], "hit": cached["hit"]}
         
         return result
     
-    except json.JSONDecodeError as e:
-        raise Exception(f"Failed to parse judge response as JSON: {str(e)}")
+    except ValidationError as e:
+        raise Exception(f"Judge response does not match the schema after one repair attempt: {str(e)}")
     except Exception as e:
         raise Exception(f"Error in hallucination check: {str(e)}")
 
@@ -0,0 +1,121 @@
+"""
+Shared LLM rate limiting and path expansion for summarize_pdfs.
+
+summarize_pdfs summarizes DOCUMENT_WORKERS documents at a time on a thread
+pool. Every summarize_text call of summarize_pdf goes through one shared
+LLMExecutor, which bounds the concurrent requests (LLM_CONCURRENCY) and paces
+them to the provider's rate limit (LLM_REQUESTS_PER_MINUTE), so concurrent
+documents never exceed the quota together.
+"""
+
+import glob
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Union
+
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+DOCUMENT_WORKERS = int(os.getenv("BATCH_DOCUMENT_WORKERS", "4"))
+MAX_BATCH_DOCUMENTS = int(os.getenv("MAX_BATCH_DOCUMENTS", "5000"))
+
+
+class RateLimiter:
+    """
+    Space calls evenly to stay under a requests-per-minute limit.
+
+    Args:
+        requests_per_minute: Allowed rate (0 or less disables the limit)
+    """
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until the next call may start; return the seconds waited."""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        wait = start - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class LLMExecutor:
+    """
+    Shared thread pool for LLM calls with a request rate limit.
+
+    Args:
+        max_workers: Concurrent requests
+        requests_per_minute: Rate limit across all workers
+    """
+
+    def __init__(self, max_workers: int = LLM_CONCURRENCY, requests_per_minute: float = LLM_REQUESTS_PER_MINUTE):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+        self._limiter = RateLimiter(requests_per_minute)
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "failures": 0, "wait_seconds": 0.0}
+
+    def _run(self, fn: Callable, args, kwargs):
+        waited = self._limiter.acquire()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self.stats["failures"] += 1
+            raise
+        finally:
+            with self._lock:
+                self.stats["calls"] += 1
+                self.stats["wait_seconds"] += waited
+
+    def submit(self, fn: Callable, *args, **kwargs):
+        """Schedule fn(*args, **kwargs) once a worker and the rate limit allow it."""
+        return self._executor.submit(self._run, fn, args, kwargs)
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """Run fn through the executor and wait for its result."""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return dict(self.stats)
+
+
+def expand_paths(paths: Union[str, Iterable[str]]) -> List[str]:
+    """
+    Expand PDF paths and glob patterns into a sorted, de-duplicated list.
+
+    Args:
+        paths: A list of paths/patterns/URLs, or one string of them separated by
+               commas or newlines (e.g. "reports/*.pdf, extra/a.pdf")
+
+    Raises:
+        ValueError: If nothing matches or the batch exceeds MAX_BATCH_DOCUMENTS
+    """
+    if isinstance(paths, str):
+        paths = [part for line in paths.splitlines() for part in line.split(",")]
+    expanded = []
+    for pattern in (path.strip() for path in paths):
+        if not pattern:
+            continue
+        if pattern.startswith(("http://", "https://")) or not glob.has_magic(pattern):
+            matches = [pattern]
+        else:
+            matches = glob.glob(os.path.expanduser(pattern), recursive=True)
+        if not matches:
+            print(f"Batch: no files match {pattern}", flush=True)
+        expanded.extend(matches)
+    expanded = sorted(set(expanded))
+    if not expanded:
+        raise ValueError("No PDF files matched the given paths")
+    if len(expanded) > MAX_BATCH_DOCUMENTS:
+        raise ValueError(f"{len(expanded)} files matched; the limit is {MAX_BATCH_DOCUMENTS} per batch")
+    return expanded
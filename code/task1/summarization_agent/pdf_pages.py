@@ -0,0 +1,96 @@
+"""
+Page-range and incremental PDF access.
+
+Agents working on very large PDFs should not have to extract the whole
+document. This module parses page-range specs ("1-5,10,20-"), yields pages
+lazily with their character offsets in the extracted text, and reads the
+document outline with `doc.get_toc()`, which needs no text extraction.
+"""
+
+from typing import Dict, Iterator, List, Optional
+
+
+def parse_page_range(spec: Optional[str], num_pages: int) -> List[int]:
+    """
+    Parse a 1-based page-range spec into sorted 0-based page indices.
+
+    Args:
+        spec: Comma-separated pages and ranges, e.g. "1-5,10,20-" ("20-" runs to
+              the last page, "-3" is pages 1-3). Empty or None selects all pages.
+        num_pages: Number of pages in the document
+
+    Returns:
+        list[int]: Sorted, de-duplicated 0-based page indices
+
+    Raises:
+        ValueError: If the spec is malformed or selects pages outside the document
+    """
+    if not spec or not spec.strip():
+        return list(range(num_pages))
+
+    selected = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if "-" in part:
+                first, last = part.split("-", 1)
+                first = int(first) if first.strip() else 1
+                last = int(last) if last.strip() else num_pages
+            else:
+                first = last = int(part)
+        except ValueError:
+            raise ValueError(f"Invalid page range '{part}' (expected e.g. '1-5,10,20-')")
+        if first < 1 or last > num_pages or first > last:
+            raise ValueError(f"Page range '{part}' is outside the document (pages 1-{num_pages})")
+        selected.update(range(first - 1, last))
+
+    if not selected:
+        raise ValueError(f"Page range '{spec}' selects no pages")
+    return sorted(selected)
+
+
+def iter_pages(doc, pages: Optional[List[int]] = None) -> Iterator[Dict]:
+    """
+    Yield the text of the selected pages one at a time.
+
+    Offsets are positions in the concatenation of the yielded page texts, i.e.
+    in the extracted_text that extracting the same pages returns.
+
+    Args:
+        doc: An open fitz.Document
+        pages: 0-based page indices (default: all pages)
+
+    Yields:
+        dict: {"page" (1-based), "start", "end", "text"}
+    """
+    offset = 0
+    for page_num in (range(len(doc)) if pages is None else pages):
+        text = doc[page_num].get_text()
+        yield {"page": page_num + 1, "start": offset, "end": offset + len(text), "text": text}
+        offset += len(text)
+
+
+def read_outline(doc) -> List[Dict]:
+    """
+    Read the document outline (bookmarks) without extracting any page text.
+
+    Each entry's end_page is the page before the next entry of the same or a
+    higher level starts (the last page for the final entries), so an entry's
+    pages can be passed straight to a page-range spec.
+
+    Returns:
+        list[dict]: {"level", "title", "page", "end_page"}; empty if the PDF has no outline
+    """
+    num_pages = len(doc)
+    toc = [(level, title, page) for level, title, page in doc.get_toc(simple=True) if page >= 1]
+    outline = []
+    for i, (level, title, page) in enumerate(toc):
+        end_page = num_pages
+        for next_level, _, next_page in toc[i + 1:]:
+            if next_level <= level:
+                end_page = max(page, next_page - 1)
+                break
+        outline.append({"level": level, "title": title.strip(), "page": page, "end_page": end_page})
+    return outline
@@ -7,8 +7,17 @@ import json
 import time
 import requests
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from langchain_experimental.text_splitter import SemanticChunker
 from langchain_huggingface import HuggingFaceEmbeddings
+from .ocr import needs_ocr, ocr_available, ocr_pages
+from .pdf_pages import parse_page_range, iter_pages, read_outline
+from .vector_index import DocumentIndex, document_id, embed_chunks, pool_chunk_windows
+from .summary_cache import SummaryCache, content_key, hierarchical_reduce
+from .batch import LLMExecutor, DOCUMENT_WORKERS, expand_paths
+from .context_cache import ContextCache, GeminiContextBackend, LocalContextBackend, CONTEXT_CACHE_BACKEND, is_cache_error
+import numpy as np
 
 # Load environment variables
 load_dotenv()
@@ -16,34 +25,112 @@ load_dotenv()
 # Set seed for consistent language detection results
 DetectorFactory.seed = 0
 
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+SUMMARY_MODEL = "gemini-2.5-flash-lite"
+_embeddings = None
+_embeddings_lock = threading.Lock()
+# One LLM executor for all summarize_text calls of summarize_pdf, so the
+# documents of a summarize_pdfs batch share one rate limit
+_llm_executor = LLMExecutor()
+# Serializes writes to the shared output/*.json files (summarize_pdfs does not write them)
+_output_lock = threading.Lock()
+# Cached document prefixes of summarize_text (see context_cache.py)
+_context_cache = None
+_context_cache_lock = threading.Lock()
 
-def extract_pdf_text(pdf_path: str) -> tuple[str, int]:
+
+def _get_embeddings() -> HuggingFaceEmbeddings:
+    """Load the HuggingFace embedding model once and reuse it for chunking and search."""
+    global _embeddings
+    with _embeddings_lock:
+        if _embeddings is None:
+            _embeddings = HuggingFaceEmbeddings(
+                model_name=EMBEDDING_MODEL_NAME  # Free, lightweight, and effective
+            )
+    return _embeddings
+
+
+def _encode(texts: List[str]) -> np.ndarray:
+    """Embed texts with the shared embedding model."""
+    return np.asarray(_get_embeddings().embed_documents(texts), dtype=np.float32)
+
+
+class _RecordingEmbeddings:
+    """Embeddings wrapper that keeps the vectors the semantic chunker computes."""
+
+    def __init__(self, embeddings: HuggingFaceEmbeddings):
+        self.embeddings = embeddings
+        self.vectors = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.embeddings.embed_documents(texts)
+        self.vectors.extend(vectors)
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+
+def _semantic_chunks(text: str) -> tuple[List[str], Optional[np.ndarray]]:
+    """
+    Split text into semantic chunks and pool the chunker's embeddings per chunk.
+
+    Returns:
+        tuple: (chunks, chunk vectors for the search index, or None if they
+               could not be derived from the chunking pass)
+    """
+    recorder = _RecordingEmbeddings(_get_embeddings())
+    # Splits when similarity between neighboring sentence windows drops significantly
+    text_splitter = SemanticChunker(
+        embeddings=recorder,
+        breakpoint_threshold_type="percentile"
+    )
+    chunks = [doc.page_content for doc in text_splitter.create_documents([text])]
+    vectors = None
+    if recorder.vectors:
+        vectors = pool_chunk_windows(np.asarray(recorder.vectors, dtype=np.float32), chunks)
+    return chunks, vectors
+
+
+def _download_pdf(pdf_path: str) -> str:
+    """Download a PDF URL to a temporary file and return its path (the caller deletes it)."""
+    print(f"Downloading PDF from URL: {pdf_path}", flush=True)
+    response = requests.get(pdf_path, timeout=30)
+    response.raise_for_status()
+    
+    # Create a temporary file to store the downloaded PDF
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
+        temp_file.write(response.content)
+        return temp_file.name
+
+
+def extract_pdf_text(pdf_path: str, pages: str = "") -> tuple[str, int]:
     """
     Extract text content from a PDF file using PyMuPDF.
     
     Args:
         pdf_path (str): Path to the PDF file or HTTP URL
+        pages (str): 1-based page range such as "1-5,10,20-"; only these pages
+            are read (default: all pages). Use get_pdf_outline to find them.
         
     Returns:
         tuple[str, int]: A tuple containing (extracted_text, num_pages)
         
     Raises:
         FileNotFoundError: If the local PDF file doesn't exist
-        ValueError: If PDF is empty or has no extractable text
+        ValueError: If PDF is empty, the page range is invalid, or there is no extractable text
         Exception: If PDF download from URL fails (e.g., network error, 404) or extraction fails
     """
+    return _extract_pdf_text(pdf_path, pages)
+
+
+def _extract_pdf_text(pdf_path: str, pages: str = "", save_raw: bool = True) -> tuple[str, int]:
+    """extract_pdf_text; save_raw=False (batch runs, index_pdf) skips the shared output/raw_extracted_data.json."""
     temp_file_path = None
     try:
         # Handle HTTP URL [Requirement: Accepts local path and HTTP URL]
         if pdf_path.startswith(("http://", "https://")):
-            print(f"Downloading PDF from URL: {pdf_path}", flush=True)
-            response = requests.get(pdf_path, timeout=30)
-            response.raise_for_status()
-            
-            # Create a temporary file to store the downloaded PDF
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-                temp_file.write(response.content)
-                temp_file_path = temp_file.name
+            temp_file_path = _download_pdf(pdf_path)
             actual_path = temp_file_path
         else:
             actual_path = pdf_path
@@ -56,12 +143,31 @@ def extract_pdf_text(pdf_path: str) -> tuple[str, int]:
         if num_pages == 0:
             doc.close()
             raise ValueError("PDF file is empty (0 pages)")
-        
-        # Extract text from all pages
-        text = ""
-        for page_num in range(num_pages):
-            page = doc[page_num]
-            text += page.get_text()
+        try:
+            selected_pages = parse_page_range(pages, num_pages)
+        except ValueError:
+            doc.close()
+            raise
+        
+        # Extract text from the selected pages, one page at a time
+        page_texts = []
+        scanned_pages = []
+        for position, page_data in enumerate(iter_pages(doc, selected_pages)):
+            page_texts.append(page_data["text"])
+            if needs_ocr(doc[selected_pages[position]], page_data["text"]):
+                scanned_pages.append(selected_pages[position])
+        
+        # OCR only the pages without a text layer (scans), before the temp file is removed
+        ocr_page_numbers = []
+        if scanned_pages:
+            if ocr_available():
+                for page_num, page_text in ocr_pages(actual_path, doc, scanned_pages).items():
+                    page_texts[selected_pages.index(page_num)] = page_text
+                ocr_page_numbers = [page_num + 1 for page_num in scanned_pages]
+            else:
+                print(f"{len(scanned_pages)} page(s) have no text layer; OCR skipped "
+                      f"(Tesseract not found or PDF_OCR=0)", flush=True)
+        text = "".join(page_texts)
         
         # Close the document
         doc.close()
@@ -72,23 +178,29 @@ def extract_pdf_text(pdf_path: str) -> tuple[str, int]:
         
         # Check if PDF has no extractable text (images, scanned without OCR, binary data) [Requirement 3]
         extracted_text = text.strip()
+        if not extracted_text and len(selected_pages) < num_pages:
+            raise ValueError(f"Pages {pages} of the PDF have no extractable text (might be scanned images; OCR needs a local Tesseract install)")
         if not extracted_text:
-            raise ValueError(f"PDF has {num_pages} page(s) but no extractable text (might be scanned images, binary data, or images without OCR)")
+            raise ValueError(f"PDF has {num_pages} page(s) but no extractable text (might be scanned images, binary data, or images without OCR; OCR needs a local Tesseract install)")
         
         # Save extracted data to JSON file for evaluation agent
-        output_dir = os.path.join(os.path.dirname(__file__), "output")
-        os.makedirs(output_dir, exist_ok=True)
-        
-        raw_data = {
-            "pdf_path": pdf_path,
-            "extracted_text": extracted_text,
-            "num_pages": num_pages,
-            "extraction_timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-        output_path = os.path.join(output_dir, "raw_extracted_data.json")
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(raw_data, f, indent=2, ensure_ascii=False)
+        if save_raw:
+            output_dir = os.path.join(os.path.dirname(__file__), "output")
+            os.makedirs(output_dir, exist_ok=True)
+            
+            raw_data = {
+                "pdf_path": pdf_path,
+                "extracted_text": extracted_text,
+                "num_pages": num_pages,
+                "pages": [page_num + 1 for page_num in selected_pages],
+                "page_offsets": _page_offsets(selected_pages, page_texts, text),
+                "ocr_pages": ocr_page_numbers,
+                "extraction_timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+            }
+            
+            output_path = os.path.join(output_dir, "raw_extracted_data.json")
+            with _output_lock, open(output_path, "w", encoding="utf-8") as f:
+                json.dump(raw_data, f, indent=2, ensure_ascii=False)
         
         return extracted_text, num_pages #[Requirement 2]
     
@@ -111,6 +223,82 @@ def extract_pdf_text(pdf_path: str) -> tuple[str, int]:
         raise Exception(f"Error extracting PDF (possibly corrupted or unreadable): {str(e)}")
 
 
+def _page_offsets(selected_pages: List[int], page_texts: List[str], text: str) -> List[dict]:
+    """Character range of each page in the stripped extracted text."""
+    stripped_length = len(text.strip())
+    leading = len(text) - len(text.lstrip())
+    offsets = []
+    offset = 0
+    for page_num, page_text in zip(selected_pages, page_texts):
+        start = min(max(offset - leading, 0), stripped_length)
+        end = min(max(offset + len(page_text) - leading, 0), stripped_length)
+        offsets.append({"page": page_num + 1, "start": start, "end": end})
+        offset += len(page_text)
+    return offsets
+
+
+def iter_pdf_pages(pdf_path: str, pages: str = ""):
+    """
+    Yield the pages of a PDF lazily, for processing huge PDFs incrementally.
+    
+    No OCR is applied; scanned pages yield empty text.
+    
+    Args:
+        pdf_path (str): Path to the PDF file or HTTP URL
+        pages (str): 1-based page range such as "1-5,10" (default: all pages)
+        
+    Yields:
+        dict: {"page" (1-based), "start", "end" (character offsets in the
+              concatenated page texts), "text"}
+    """
+    temp_file_path = _download_pdf(pdf_path) if pdf_path.startswith(("http://", "https://")) else None
+    try:
+        with fitz.open(temp_file_path or pdf_path) as doc:
+            yield from iter_pages(doc, parse_page_range(pages, len(doc)))
+    finally:
+        if temp_file_path and os.path.exists(temp_file_path):
+            os.unlink(temp_file_path)
+
+
+def get_pdf_outline(pdf_path: str) -> dict:
+    """
+    Get a PDF's page count and table of contents without extracting any text.
+    
+    Fast even for very large PDFs: inspect the structure first, then call
+    extract_pdf_text(pdf_path, pages="...") for only the pages needed.
+    
+    Args:
+        pdf_path (str): Path to the PDF file or HTTP URL
+        
+    Returns:
+        dict: num_pages, has_outline, outline (list of {level, title, page, end_page})
+              and document metadata
+        
+    Raises:
+        FileNotFoundError: If the local PDF file doesn't exist
+        Exception: If the PDF cannot be downloaded or opened
+    """
+    if not pdf_path.startswith(("http://", "https://")) and not os.path.exists(pdf_path):
+        raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+    temp_file_path = None
+    try:
+        if pdf_path.startswith(("http://", "https://")):
+            temp_file_path = _download_pdf(pdf_path)
+        with fitz.open(temp_file_path or pdf_path) as doc:
+            outline = read_outline(doc)
+            return {
+                "num_pages": len(doc),
+                "has_outline": bool(outline),
+                "outline": outline,
+                "metadata": {key: value for key, value in (doc.metadata or {}).items() if value},
+            }
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"Error downloading PDF from URL: {str(e)}")
+    finally:
+        if temp_file_path and os.path.exists(temp_file_path):
+            os.unlink(temp_file_path)
+
+
 def detect_language(text: str) -> str:
     """
     Detect the language of the given text using langdetect.
@@ -137,19 +325,37 @@ def detect_language(text: str) -> str:
         raise ValueError(f"Error detecting language: {str(e)}")
 
 
-def summarize_text(text: str, max_length: str = "medium") -> dict:
+def _get_context_cache() -> Optional[ContextCache]:
+    """Return the context cache selected by CONTEXT_CACHE_BACKEND (None if 'off'), created on first use."""
+    global _context_cache
+    if CONTEXT_CACHE_BACKEND == "off":
+        return None
+    with _context_cache_lock:
+        if _context_cache is None:
+            if CONTEXT_CACHE_BACKEND == "local":
+                _context_cache = ContextCache(LocalContextBackend())
+            else:
+                from google import genai
+                _context_cache = ContextCache(GeminiContextBackend(genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))))
+    return _context_cache
+
+
+def summarize_text(text: str, max_length: str = "medium", cache_context: bool = False) -> dict:
     """
     Summarize text using Gemini LLM.
     
     Args:
         text (str): Text to summarize
         max_length (str): Desired summary length - 'short', 'medium', or 'long'
+        cache_context (bool): Send a long text as a cached prefix that later calls on the
+                              same text and model reuse (needs CONTEXT_CACHE_BACKEND)
         
     Returns:
         dict: Structured JSON containing:
             - summary (str): The generated summary
             - prompt (dict): Contains system_prompt and user_prompt sent to LLM
             - metadata (dict): Contains input_length, summary_length, model, timestamp
+              (and context_cache when the text was sent as a cached prefix)
             
     Raises:
         ValueError: If text is empty or invalid
@@ -188,21 +394,38 @@ def summarize_text(text: str, max_length: str = "medium") -> dict:
             raise ValueError("GOOGLE_API_KEY not found in environment variables")
         
         client = genai.Client(api_key=api_key)
+        context_cache = _get_context_cache() if cache_context else None
+        cached = None
         
         # Retry logic for rate limiting
         max_retries = 3
         retry_delay = 30  # seconds
         
         for attempt in range(max_retries):
+            if context_cache is not None and cached is None:
+                # A cached prefix cannot be combined with a system instruction,
+                # so the system prompt leads the instruction that follows the text
+                cached = context_cache.request(
+                    SUMMARY_MODEL, text,
+                    f"{system_prompt}\n\nPlease summarize the text above "
+                    f"{length_guide.get(max_length, length_guide['medium'])}.",
+                    display_name="summarize_text"
+                )
             try:
-                # Use generate_content_stream for real-time terminal output
-                response = client.models.generate_content_stream(
-                    model='gemini-2.5-flash-lite',
-                    contents=user_prompt,
-                    config={
+                if cached is not None:
+                    contents = cached["contents"]
+                    config = {**cached["config"], 'temperature': 0.7}
+                else:
+                    contents = user_prompt
+                    config = {
                         'system_instruction': system_prompt,
                         'temperature': 0.7,
                     }
+                # Use generate_content_stream for real-time terminal output
+                response = client.models.generate_content_stream(
+                    model=SUMMARY_MODEL,
+                    contents=contents,
+                    config=config
                 )
                 
                 summary_parts = []
@@ -214,11 +437,16 @@ def summarize_text(text: str, max_length: str = "medium") -> dict:
                 
                 print()  # New line after streaming is complete
                 summary = "".join(summary_parts).strip()
-                model_name = "gemini-2.5-flash-lite"
+                model_name = SUMMARY_MODEL
                 break  # Success, exit retry loop
                 
             except Exception as e:
-                if "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e):
+                if cached is not None and is_cache_error(e) and attempt < max_retries - 1:
+                    # The cache expired or was deleted: drop it and send the text inline
+                    print(f"Context cache {cached['cache']} unavailable, retrying without it", flush=True)
+                    context_cache.invalidate(SUMMARY_MODEL, text)
+                    context_cache, cached = None, None
+                elif "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e):
                     if attempt < max_retries - 1:
                         wait_time = retry_delay * (2 ** attempt)  # Exponential backoff
                         print(f"Rate limit hit. Waiting {wait_time} seconds before retry {attempt + 2}/{max_retries}...", flush=True)
@@ -243,6 +471,8 @@ def summarize_text(text: str, max_length: str = "medium") -> dict:
                 "timestamp": __import__('datetime').datetime.now().isoformat()
             }
         }
+        if cached is not None:
+            result["metadata"]["context_cache"] = {"cache": cached["cache"], "hit": cached["hit"]}
         
         return result
     
@@ -257,6 +487,9 @@ def summarize_pdf(pdf_path: str) -> dict:
     Extract text from PDF and perform semantic chunking using embeddings.
     Automatically saves chunking output and final summary to files.
     
+    Chunk summaries and reduce steps are cached by content hash, so summarizing
+    a revised PDF only re-summarizes new or changed chunks (see reused_chunks).
+    
     Args:
         pdf_path (str): Path to the PDF file
         
@@ -266,6 +499,17 @@ def summarize_pdf(pdf_path: str) -> dict:
     Raises:
         Exception: If PDF extraction or chunking fails
     """
+    return _summarize_pdf(pdf_path)
+
+
+def _summarize_pdf(pdf_path: str, save_outputs: bool = True) -> dict:
+    """
+    summarize_pdf; save_outputs=False skips the shared output files.
+    
+    raw_extracted_data.json, pdf_chunking_output.json and summarize_after_chunks.json
+    hold one document at a time (the evaluation agent reads them as a pair), so
+    concurrent documents of summarize_pdfs must not write them.
+    """
     try:
         # Determine output directory (relative to this script)
         script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -276,7 +520,7 @@ def summarize_pdf(pdf_path: str) -> dict:
         
         # Step 1: Extract text from PDF
         print(f"Extracting text from PDF: {pdf_path}", flush=True)
-        extracted_text, num_pages = extract_pdf_text(pdf_path)
+        extracted_text, num_pages = _extract_pdf_text(pdf_path, save_raw=save_outputs)
         print(f"✓ Extracted {len(extracted_text)} characters from {num_pages} pages", flush=True)
         
         # Step 2: Detect language
@@ -287,20 +531,10 @@ def summarize_pdf(pdf_path: str) -> dict:
         print(f"\nPerforming semantic chunking with embeddings...", flush=True)
         print("Loading embedding model (this may take a moment on first run)...", flush=True)
         
-        # Use free HuggingFace embeddings model
-        embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"  # Free, lightweight, and effective
-        )
-        
-        # Create semantic chunker that groups similar content together
-        text_splitter = SemanticChunker(
-            embeddings=embeddings,
-            breakpoint_threshold_type="percentile"  # Splits when similarity drops significantly
-        )
-        
-        # Split text into semantic chunks
-        docs = text_splitter.create_documents([extracted_text])
-        chunks = [doc.page_content for doc in docs]
+        # Split text into semantic chunks with the free HuggingFace embeddings model
+        # (loaded once, shared with search_document); the sentence-window
+        # embeddings are kept for the search index
+        chunks, chunk_vectors = _semantic_chunks(extracted_text)
         
         # Step 4: Prepare results
         chunk_info = []
@@ -324,13 +558,24 @@ def summarize_pdf(pdf_path: str) -> dict:
             "timestamp": __import__('datetime').datetime.now().isoformat()
         }
         
+        print(f"✓ Created {len(chunks)} semantic chunks", flush=True)
+        
         # Save chunking output to file
         chunking_output_file = os.path.join(output_dir, "pdf_chunking_output.json")
-        with open(chunking_output_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
-        
-        print(f"✓ Created {len(chunks)} semantic chunks", flush=True)
-        print(f"✓ Chunking output saved to: {chunking_output_file}", flush=True)
+        if save_outputs:
+            with _output_lock, open(chunking_output_file, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2, ensure_ascii=False)
+            print(f"✓ Chunking output saved to: {chunking_output_file}", flush=True)
+        
+        # Keep the chunks as a search index so later questions can use search_document
+        doc_id = None
+        if not pdf_path.startswith(("http://", "https://")):
+            try:
+                doc_id = document_id(pdf_path)
+                _index_document(doc_id, pdf_path, chunks, chunk_vectors)
+            except Exception as e:
+                print(f"✗ Could not save the search index: {str(e)}", flush=True)
+                doc_id = None
         
         # Step 5: Summarize each chunk
         print(f"\n{'='*80}", flush=True)
@@ -338,16 +583,32 @@ def summarize_pdf(pdf_path: str) -> dict:
         print(f"{'='*80}", flush=True)
         
         chunk_summaries = []
+        summary_cache = SummaryCache()
         for i, chunk in enumerate(chunks, 1):
+            # Unchanged chunks (e.g. of a revised PDF) reuse their stored summary
+            cache_key = content_key(chunk, model=SUMMARY_MODEL, max_length="medium")
+            cached = summary_cache.get(cache_key)
+            if cached is not None:
+                chunk_summaries.append({
+                    "chunk_number": i,
+                    "chunk_length": len(chunk),
+                    "summary": cached["summary"],
+                    "summary_length": len(cached["summary"]),
+                    "reused": True
+                })
+                print(f"✓ Chunk {i}/{len(chunks)} unchanged, summary reused", flush=True)
+                continue
             print(f"\nSummarizing chunk {i}/{len(chunks)}...", flush=True)
             try:
-                summary_result = summarize_text(chunk, max_length="medium")
+                summary_result = _llm_executor.call(summarize_text, chunk, max_length="medium")
                 chunk_summaries.append({
                     "chunk_number": i,
                     "chunk_length": len(chunk),
                     "summary": summary_result["summary"],
-                    "summary_length": summary_result["metadata"]["summary_length"]
+                    "summary_length": summary_result["metadata"]["summary_length"],
+                    "reused": False
                 })
+                summary_cache.put(cache_key, {"summary": summary_result["summary"]})
                 # Bonus: Stream partial results to terminal
                 print(json.dumps({"chunk": i, "total_chunks": len(chunks), "partial_summary": summary_result["summary"]}), flush=True)
                 print(f"✓ Chunk {i} summarized: {len(chunk)} chars → {len(summary_result['summary'])} chars", flush=True)
@@ -357,26 +618,34 @@ def summarize_pdf(pdf_path: str) -> dict:
                     "chunk_number": i,
                     "chunk_length": len(chunk),
                     "summary": f"Error: {str(e)}",
-                    "summary_length": 0
+                    "summary_length": 0,
+                    "reused": False
                 })
+        reused_chunks = [s["chunk_number"] for s in chunk_summaries if s["reused"]]
+        print(f"✓ Reused {len(reused_chunks)}/{len(chunks)} chunk summaries", flush=True)
         
-        # Step 6: Combine all chunk summaries into one final summary
+        # Step 6: Combine all chunk summaries into one final summary, through a tree
+        # of cached reduce nodes (only branches above changed chunks are recomputed)
         print(f"\n{'='*80}", flush=True)
         print("CREATING COMBINED SUMMARY", flush=True)
         print(f"{'='*80}", flush=True)
         
-        all_summaries_text = "\n\n".join([f"Section {s['chunk_number']}: {s['summary']}" for s in chunk_summaries])
         print(f"Combining {len(chunk_summaries)} chunk summaries...", flush=True)
         
         try:
-            combined_summary_result = summarize_text(all_summaries_text, max_length="short")
-            combined_summary = combined_summary_result["summary"]
+            combined_summary, reduce_stats = hierarchical_reduce(
+                [(str(s["chunk_number"]), s["summary"], not s["summary"].startswith("Error:")) for s in chunk_summaries],
+                lambda text, final: _llm_executor.call(summarize_text, text, max_length="short" if final else "medium")["summary"],
+                summary_cache, model=SUMMARY_MODEL
+            )
             # Bonus: Stream final result to terminal
             print(json.dumps({"final_summary": combined_summary}), flush=True)
-            print(f"✓ Combined summary created: {len(combined_summary)} characters", flush=True)
+            print(f"✓ Combined summary created: {len(combined_summary)} characters "
+                  f"({reduce_stats['reused_nodes']}/{reduce_stats['nodes']} reduce nodes reused)", flush=True)
         except Exception as e:
             print(f"✗ Error creating combined summary: {str(e)}", flush=True)
             combined_summary = f"Error creating combined summary: {str(e)}"
+            reduce_stats = None
         
         # Step 7: Prepare final output
         summarize_after_chunks = {
@@ -388,13 +657,20 @@ def summarize_pdf(pdf_path: str) -> dict:
             "chunking_method": "semantic_embeddings",
             "embedding_model": "sentence-transformers/all-MiniLM-L6-v2",
             "chunk_summaries": chunk_summaries,
+            "reused_chunks": reused_chunks,
+            "resummarized_chunks": [s["chunk_number"] for s in chunk_summaries if not s["reused"]],
+            "reduce": reduce_stats,
             "combined_summary": combined_summary,
             "timestamp": __import__('datetime').datetime.now().isoformat()
         }
         
+        summarize_after_chunks["doc_id"] = doc_id
+        if not save_outputs:
+            return summarize_after_chunks
+        
         # Step 8: Save final summary to JSON file
         final_summary_file = os.path.join(output_dir, "summarize_after_chunks.json")
-        with open(final_summary_file, 'w', encoding='utf-8') as f:
+        with _output_lock, open(final_summary_file, 'w', encoding='utf-8') as f:
             json.dump(summarize_after_chunks, f, indent=2, ensure_ascii=False)
         
         print(f"\n{'='*80}", flush=True)
@@ -410,4 +686,184 @@ def summarize_pdf(pdf_path: str) -> dict:
         return summarize_after_chunks
         
     except Exception as e:
-        raise Exception(f"Error in summarize_pdf: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Error in summarize_pdf: {str(e)}")
+
+
+def summarize_pdfs(paths: str) -> dict:
+    """
+    Summarize many PDFs in one call.
+    
+    Documents are summarized DOCUMENT_WORKERS at a time; all their LLM calls
+    share one concurrency and rate limit (LLM_CONCURRENCY, LLM_REQUESTS_PER_MINUTE).
+    A failing document does not stop the batch: its entry carries an error instead.
+    The full result is saved to output/batch_summaries.json; the single-document
+    output files (raw_extracted_data.json, summarize_after_chunks.json, ...) are
+    not written, so they never mix documents of a batch.
+    
+    Args:
+        paths (str): PDF paths, URLs or glob patterns, separated by commas or newlines
+                     (e.g. "reports/*.pdf, extra/annex.pdf")
+        
+    Returns:
+        dict: Contains documents (pdf_path, num_pages, num_chunks, combined_summary
+              or error, per document in path order) and stats
+        
+    Raises:
+        ValueError: If no PDF matches the paths
+    """
+    pdf_paths = expand_paths(paths)
+    print(f"Summarizing {len(pdf_paths)} PDFs ({DOCUMENT_WORKERS} at a time)...", flush=True)
+    start = time.perf_counter()
+    llm_before = _llm_executor.snapshot()
+    
+    def summarize_document(pdf_path: str) -> dict:
+        doc_start = time.perf_counter()
+        try:
+            # The shared output/*.json files hold one document; batch results are per document
+            result = _summarize_pdf(pdf_path, save_outputs=False)
+            document = {
+                "pdf_path": pdf_path,
+                "doc_id": result["doc_id"],
+                "num_pages": result["num_pages"],
+                "num_chunks": result["num_chunks"],
+                "language": result["language"],
+                "reused_chunks": result["reused_chunks"],
+                "combined_summary": result["combined_summary"]
+            }
+        except Exception as e:
+            document = {"pdf_path": pdf_path, "error": str(e)}
+        document["seconds"] = round(time.perf_counter() - doc_start, 3)
+        print(f"✓ Batch: {pdf_path} done in {document['seconds']}s", flush=True)
+        return document
+    
+    with ThreadPoolExecutor(max_workers=max(1, DOCUMENT_WORKERS), thread_name_prefix="document") as pool:
+        documents = list(pool.map(summarize_document, pdf_paths))
+    
+    llm_after = _llm_executor.snapshot()
+    total = time.perf_counter() - start
+    failed = [document for document in documents if document.get("error")]
+    batch_result = {
+        "documents": documents,
+        "stats": {
+            "documents": len(documents),
+            "succeeded": len(documents) - len(failed),
+            "failed": len(failed),
+            "pages": sum(document.get("num_pages", 0) for document in documents),
+            "chunks": sum(document.get("num_chunks", 0) for document in documents),
+            "llm_calls": llm_after["calls"] - llm_before["calls"],
+            "llm_rate_limit_wait_seconds": round(llm_after["wait_seconds"] - llm_before["wait_seconds"], 3),
+            "total_seconds": round(total, 3),
+            "documents_per_minute": round(len(documents) * 60 / total, 2) if total else None
+        },
+        "timestamp": __import__('datetime').datetime.now().isoformat()
+    }
+    
+    output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output")
+    os.makedirs(output_dir, exist_ok=True)
+    batch_file = os.path.join(output_dir, "batch_summaries.json")
+    with open(batch_file, "w", encoding="utf-8") as f:
+        json.dump(batch_result, f, indent=2, ensure_ascii=False)
+    print(f"✓ Batch summary saved to: {batch_file}", flush=True)
+    
+    batch_result["output_file"] = batch_file
+    return batch_result
+
+
+def _index_document(doc_id: str, pdf_path: str, chunks: List[str],
+                    chunk_vectors: Optional[np.ndarray] = None) -> str:
+    """
+    Save chunks as the document's search index.
+    
+    chunk_vectors are the chunker's sentence-window embeddings pooled per chunk;
+    only without them are the chunks embedded again (mean of their sentence embeddings).
+    """
+    print(f"Indexing {len(chunks)} chunks for search_document...", flush=True)
+    if chunk_vectors is None:
+        chunk_vectors = embed_chunks(_encode, chunks)
+    index = DocumentIndex(doc_id, chunk_vectors, chunks, info={
+        "pdf_path": pdf_path,
+        "chunking_method": "semantic_embeddings",
+        "embedding_model": EMBEDDING_MODEL_NAME,
+        "indexed_at": __import__('datetime').datetime.now().isoformat()
+    })
+    path = index.save()
+    print(f"✓ Search index saved to: {path} (doc_id {doc_id})", flush=True)
+    return path
+
+
+def index_pdf(pdf_path: str) -> dict:
+    """
+    Chunk and embed a PDF for search_document, without summarizing it.
+    
+    Indexes are stored per document content hash (doc_id), so an already
+    indexed file is not processed again. summarize_pdf also indexes local PDFs.
+    The output/*.json files of the last summarize_pdf run are left untouched.
+    
+    Args:
+        pdf_path (str): Path to the PDF file or HTTP URL
+        
+    Returns:
+        dict: Contains doc_id, num_chunks, and whether an existing index was reused
+        
+    Raises:
+        FileNotFoundError: If the local PDF file doesn't exist
+        ValueError: If PDF is empty or has no extractable text
+        Exception: If download, extraction or embedding fails
+    """
+    temp_file_path = None
+    try:
+        if pdf_path.startswith(("http://", "https://")):
+            temp_file_path = _download_pdf(pdf_path)
+        elif not os.path.exists(pdf_path):
+            raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+        doc_id = document_id(temp_file_path or pdf_path)
+        try:
+            index = DocumentIndex.load(doc_id)
+            return {"doc_id": doc_id, "num_chunks": len(index.chunks), "reused": True, **index.info}
+        except FileNotFoundError:
+            pass
+        
+        extracted_text, num_pages = _extract_pdf_text(temp_file_path or pdf_path, save_raw=False)
+        chunks, chunk_vectors = _semantic_chunks(extracted_text)
+        _index_document(doc_id, pdf_path, chunks, chunk_vectors)
+        return {"doc_id": doc_id, "num_chunks": len(chunks), "num_pages": num_pages, "reused": False, "pdf_path": pdf_path}
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"Error downloading PDF from URL: {str(e)}")
+    finally:
+        if temp_file_path and os.path.exists(temp_file_path):
+            os.unlink(temp_file_path)
+
+
+def search_document(doc_id: str, query: str, k: int = 5) -> dict:
+    """
+    Find the chunks of an indexed PDF that are most relevant to a question.
+    
+    Use it to answer questions about a document from a few passages instead of
+    summarizing the whole document.
+    
+    Args:
+        doc_id (str): Document id returned by index_pdf or summarize_pdf
+        query (str): Question or search text
+        k (int): Number of chunks to return (default: 5)
+        
+    Returns:
+        dict: Contains doc_id, pdf_path, query, and results (chunk_number, score, text), best first
+        
+    Raises:
+        ValueError: If the query is empty or doc_id is malformed
+        FileNotFoundError: If the document has not been indexed (call index_pdf first)
+    """
+    if not query or not query.strip():
+        raise ValueError("Query is empty or contains only whitespace")
+    try:
+        index = DocumentIndex.load(doc_id)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"No index for doc_id '{doc_id}'; call index_pdf(pdf_path) first")
+    results = index.search(_encode([query])[0], k=max(1, k))
+    return {
+        "doc_id": doc_id,
+        "pdf_path": index.info.get("pdf_path"),
+        "query": query,
+        "num_chunks": len(index.chunks),
+        "results": results
+    }
@@ -2,7 +2,7 @@
 import os
 from google.adk.agents import LlmAgent
 from google.adk.tools.mcp_tool import McpToolset
-from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams
+from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams, StreamableHTTPConnectionParams, SseConnectionParams
 from mcp import StdioServerParameters
 from .system_prompt import task2_system_prompt 
 # Paths to MCP servers
@@ -12,6 +12,27 @@ API_FETCHING_SERVER_PATH = os.path.join(script_dir, "api_fetching_server.py")
 PYTHON_EXECUTABLE = os.path.join(script_dir, "..", "..", ".venv", "bin", "python3")
 EVALUATION_SERVER_PATH = os.path.join(script_dir, "evaluation_server.py")
 
+# Optional URLs of shared, already-running servers (e.g. http://127.0.0.1:8001/mcp).
+# When unset, each server is spawned privately over stdio.
+SUMMARIZATION_SERVER_URL = os.getenv("SUMMARIZATION_SERVER_URL")
+API_FETCHING_SERVER_URL = os.getenv("API_FETCHING_SERVER_URL")
+EVALUATION_SERVER_URL = os.getenv("EVALUATION_SERVER_URL")
+
+
+def connection_params(server_path, server_url, timeout):
+    """Connect to a shared HTTP/SSE server if a URL is given, else spawn the server over stdio."""
+    if server_url and server_url.rstrip("/").endswith("/sse"):
+        return SseConnectionParams(url=server_url, timeout=timeout, sse_read_timeout=timeout)
+    if server_url:
+        return StreamableHTTPConnectionParams(url=server_url, timeout=timeout, sse_read_timeout=timeout)
+    return StdioConnectionParams(
+        server_params=StdioServerParameters(
+            command=PYTHON_EXECUTABLE,
+            args=[server_path],
+        ),
+        timeout=timeout
+    )
+
 
 
 mcp_agent = LlmAgent(
@@ -21,22 +42,18 @@ mcp_agent = LlmAgent(
     tools=[
         # Server 1: Summarization Server
         McpToolset(
-            connection_params=StdioConnectionParams(
-                server_params=StdioServerParameters(
-                    command=PYTHON_EXECUTABLE,
-                    args=[SUMMARIZATION_SERVER_PATH],
-                ),
-                timeout=300  # 5 minutes timeout for long-running tools like summarize_pdf
+            connection_params=connection_params(
+                SUMMARIZATION_SERVER_PATH,
+                SUMMARIZATION_SERVER_URL,
+                timeout=300  # 5 minutes for blocking tools like summarize_pdf; large PDFs go through submit_summarize_pdf
             ),
-            tool_filter=['extract_pdf_text', 'detect_language', 'summarize_text', 'summarize_pdf']
+            tool_filter=['extract_pdf', 'get_pdf_outline', 'detect_language', 'summarize_text', 'summarize_pdf', 'summarize_pdfs', 'submit_summarize_pdf', 'get_job_status', 'get_job_result', 'cancel_job', 'get_chunk', 'get_text', 'get_prompt', 'index_pdf', 'search_document']
         ),
         # Server 2: API Fetching Server
         McpToolset(
-            connection_params=StdioConnectionParams(
-                server_params=StdioServerParameters(
-                    command=PYTHON_EXECUTABLE,
-                    args=[API_FETCHING_SERVER_PATH],
-                ),
+            connection_params=connection_params(
+                API_FETCHING_SERVER_PATH,
+                API_FETCHING_SERVER_URL,
                 timeout=60  # 1 minute timeout for API calls
             ),
             tool_filter=['fetch_weather', 'fetch_exchange_rate']
@@ -44,12 +61,10 @@ mcp_agent = LlmAgent(
         #Server 3: Output Evaluation Server (Adapted now only to evaluate summarization agent )
         
         McpToolset(
-            connection_params=StdioConnectionParams(
-                server_params=StdioServerParameters(
-                    command=PYTHON_EXECUTABLE,
-                    args=[EVALUATION_SERVER_PATH],
-        ),
-        timeout=120  # 2 minutes for embedding model load + evaluation
+            connection_params=connection_params(
+                EVALUATION_SERVER_PATH,
+                EVALUATION_SERVER_URL,
+                timeout=120  # 2 minutes for embedding model load + evaluation
     ),
     tool_filter=['evaluate_summarization_agent']
 )
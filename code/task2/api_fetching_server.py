@@ -1,9 +1,14 @@
 import sys
+import os
 import json
 import requests
 from datetime import datetime
 # FastMCP Import
 from mcp.server.fastmcp import FastMCP
+# server_cli.py lives in code/common, shared with the task3 server
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+from server_cli import run_server, http_app
+from artifacts import dumps
 mcp = FastMCP("api-fetching-mcp-server")
 
 
@@ -32,7 +37,7 @@ def fetch_weather(city: str, unit: str = "celsius") -> str:
         geo_data = geo_response.json()
 
         if "results" not in geo_data or len(geo_data["results"]) == 0:
-            return json.dumps({"error": f"City '{city}' not found"})
+            return dumps({"error": f"City '{city}' not found"})
 
         location = geo_data["results"][0]
         latitude = location["latitude"]
@@ -68,10 +73,10 @@ def fetch_weather(city: str, unit: str = "celsius") -> str:
                 "timestamp": datetime.utcnow().isoformat()
             }
         }
-        return json.dumps(result, indent=2)
+        return dumps(result)
     
     except Exception as e:
-        return json.dumps({"error": f"Error fetching weather: {str(e)}"})
+        return dumps({"error": f"Error fetching weather: {str(e)}"})
 
 
 @mcp.tool()
@@ -111,13 +116,18 @@ def fetch_exchange_rate(base: str, target: str) -> str:
                 "timestamp": datetime.utcnow().isoformat()
             }
         }
-        return json.dumps(result, indent=2)
+        return dumps(result)
     
     except Exception as e:
-        return json.dumps({"error": f"Error fetching exchange rate: {str(e)}"})
+        return dumps({"error": f"Error fetching exchange rate: {str(e)}"})
 
 
 
+def create_http_app():
+    """ASGI app factory used by uvicorn worker processes in HTTP mode."""
+    return http_app(mcp)
+
+
 if __name__ == "__main__":
-    print("Launching FastMCP Server via stdio...", file=sys.stderr)
-    mcp.run()
+    # stdio by default; --transport streamable-http/sse --host --port --workers to share one server
+    run_server(mcp, "api_fetching_server", default_port=8002, description="API fetching MCP server")
@@ -0,0 +1,130 @@
+"""
+Compact tool payloads and per-run artifact storage for the MCP servers.
+
+Tool results are serialized with orjson without indentation (set
+MCP_RESPONSE_FORMAT=pretty for indented output while debugging). Large bodies
+such as the extracted PDF text and the chunks are written to a per-run
+directory under output/runs/<run_id>/ and returned as references, which the
+agent can page through with the get_text / get_chunk tools.
+"""
+
+import base64
+import json
+import os
+import re
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+import orjson
+
+RESPONSE_FORMAT = os.getenv("MCP_RESPONSE_FORMAT", "compact")  # 'compact' or 'pretty'
+
+# Texts longer than this many characters are returned as artifact references
+INLINE_TEXT_LIMIT = int(os.getenv("MCP_INLINE_TEXT_LIMIT", "20000"))
+PREVIEW_CHARS = 500
+
+RUNS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "runs")
+_RUN_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def _default(obj: Any):
+    """Serialize values orjson does not handle natively (bytes, sets, numpy scalars)."""
+    if isinstance(obj, (bytes, bytearray)):
+        return base64.b64encode(obj).decode("ascii")
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "item"):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> str:
+    """
+    Serialize a tool result to a JSON string.
+
+    Args:
+        obj: JSON-compatible object (bytes are base64-encoded)
+
+    Returns:
+        Compact JSON, or indented JSON when MCP_RESPONSE_FORMAT=pretty
+    """
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    if RESPONSE_FORMAT == "pretty":
+        option |= orjson.OPT_INDENT_2
+    return _dump_bytes(obj, option, indent=2 if RESPONSE_FORMAT == "pretty" else None).decode("utf-8")
+
+
+def _dump_bytes(obj: Any, option: int, indent: Optional[int] = None) -> bytes:
+    """Serialize with orjson, falling back to the stdlib for text orjson rejects."""
+    try:
+        return orjson.dumps(obj, default=_default, option=option)
+    except TypeError:
+        # orjson rejects lone surrogates (e.g., from damaged PDF text); the stdlib escapes them
+        return json.dumps(obj, default=_default, indent=indent).encode("utf-8")
+
+
+def new_run_id() -> str:
+    """Create a sortable, unique run identifier."""
+    return time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:8]
+
+
+def run_dir(run_id: str, create: bool = False) -> str:
+    """
+    Return the artifact directory of a run.
+
+    Raises:
+        ValueError: If the run_id is malformed
+        FileNotFoundError: If the run does not exist and create is False
+    """
+    if not run_id or not _RUN_ID_PATTERN.match(run_id):
+        raise ValueError(f"Invalid run_id: {run_id}")
+    path = os.path.join(RUNS_DIR, run_id)
+    if create:
+        os.makedirs(path, exist_ok=True)
+    elif not os.path.isdir(path):
+        raise FileNotFoundError(f"Unknown run_id: {run_id}")
+    return path
+
+
+def save_artifact(run_id: str, name: str, obj: Any) -> str:
+    """Write a JSON artifact for a run and return its path."""
+    path = os.path.join(run_dir(run_id, create=True), f"{name}.json")
+    with open(path, "wb") as f:
+        f.write(_dump_bytes(obj, orjson.OPT_SERIALIZE_NUMPY))
+    return path
+
+
+def load_artifact(run_id: str, name: str) -> Any:
+    """
+    Read a JSON artifact of a run.
+
+    Raises:
+        FileNotFoundError: If the run or artifact does not exist
+    """
+    path = os.path.join(run_dir(run_id), f"{name}.json")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Artifact '{name}' not found for run {run_id}")
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        # Escaped lone surrogates written by the stdlib fallback of _dump_bytes
+        return json.loads(data)
+
+
+def text_reference(run_id: str, name: str, text: str, fetch_with: str) -> Dict[str, Any]:
+    """Describe a stored text artifact instead of inlining it."""
+    return {
+        "run_id": run_id,
+        "artifact": name,
+        "length": len(text),
+        "preview": text[:PREVIEW_CHARS] + "..." if len(text) > PREVIEW_CHARS else text,
+        "fetch_with": fetch_with,
+    }
+
+
+def is_large(text: Optional[str]) -> bool:
+    """True if the text should be returned as an artifact reference."""
+    return text is not None and len(text) > INLINE_TEXT_LIMIT
@@ -0,0 +1,223 @@
+"""
+Batch job engine for summarizing many PDFs in one call.
+
+summarize_pdfs runs documents through three stages:
+
+- extraction in a process pool (EXTRACT_WORKERS processes), so PyMuPDF text
+  extraction and OCR use every core,
+- chunking and summarization of each extracted document on a small thread
+  pool (DOCUMENT_WORKERS documents at a time),
+- every LLM call of every document through one shared LLMExecutor, which
+  bounds the concurrent requests (LLM_CONCURRENCY) and paces them to the
+  provider's rate limit (LLM_REQUESTS_PER_MINUTE).
+
+summarize_pdf uses the same LLMExecutor, so single and batch calls share the
+rate limit.
+"""
+
+import glob
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Union
+
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+EXTRACT_WORKERS = int(os.getenv("BATCH_EXTRACT_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+DOCUMENT_WORKERS = int(os.getenv("BATCH_DOCUMENT_WORKERS", "4"))
+MAX_BATCH_DOCUMENTS = int(os.getenv("MAX_BATCH_DOCUMENTS", "5000"))
+
+
+class RateLimiter:
+    """
+    Space calls evenly to stay under a requests-per-minute limit.
+
+    Args:
+        requests_per_minute: Allowed rate (0 or less disables the limit)
+    """
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until the next call may start; return the seconds waited."""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        wait = start - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class LLMExecutor:
+    """
+    Shared thread pool for LLM calls with a request rate limit.
+
+    Args:
+        max_workers: Concurrent requests
+        requests_per_minute: Rate limit across all workers
+    """
+
+    def __init__(self, max_workers: int = LLM_CONCURRENCY, requests_per_minute: float = LLM_REQUESTS_PER_MINUTE):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+        self._limiter = RateLimiter(requests_per_minute)
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "failures": 0, "wait_seconds": 0.0}
+
+    def _run(self, fn: Callable, args, kwargs):
+        waited = self._limiter.acquire()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self.stats["failures"] += 1
+            raise
+        finally:
+            with self._lock:
+                self.stats["calls"] += 1
+                self.stats["wait_seconds"] += waited
+
+    def submit(self, fn: Callable, *args, **kwargs):
+        """Schedule fn(*args, **kwargs) once a worker and the rate limit allow it."""
+        return self._executor.submit(self._run, fn, args, kwargs)
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """Run fn through the executor and wait for its result."""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return dict(self.stats)
+
+
+def expand_paths(paths: Union[str, Iterable[str]]) -> List[str]:
+    """
+    Expand PDF paths and glob patterns into a sorted, de-duplicated list.
+
+    Args:
+        paths: A list of paths/patterns, or one string of them separated by
+               commas or newlines (e.g. "reports/*.pdf, extra/a.pdf")
+
+    Raises:
+        ValueError: If nothing matches or the batch exceeds MAX_BATCH_DOCUMENTS
+    """
+    if isinstance(paths, str):
+        paths = [part for line in paths.splitlines() for part in line.split(",")]
+    expanded = []
+    for pattern in (path.strip() for path in paths):
+        if not pattern:
+            continue
+        matches = glob.glob(os.path.expanduser(pattern), recursive=True) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            print(f"Batch: no files match {pattern}", file=sys.stderr)
+        expanded.extend(matches)
+    expanded = sorted(set(expanded))
+    if not expanded:
+        raise ValueError("No PDF files matched the given paths")
+    if len(expanded) > MAX_BATCH_DOCUMENTS:
+        raise ValueError(f"{len(expanded)} files matched; the limit is {MAX_BATCH_DOCUMENTS} per batch")
+    return expanded
+
+
+def run_batch(paths: List[str], extract: Callable, summarize_document: Callable, llm: LLMExecutor,
+              extract_workers: int = EXTRACT_WORKERS, document_workers: int = DOCUMENT_WORKERS,
+              on_document: Callable = None) -> Dict:
+    """
+    Extract documents in a process pool and summarize them as they arrive.
+
+    Args:
+        paths: PDF paths
+        extract: Picklable top-level function extract(path) -> extract result;
+                 raising marks the document as failed
+        summarize_document: summarize_document(path, extract_result) -> result dict
+                            (its LLM calls should go through llm)
+        llm: Shared LLM executor, for the aggregate call statistics
+        extract_workers: Extraction processes
+        document_workers: Documents chunked and summarized at the same time
+        on_document: Optional callback(result) for each finished document
+
+    Returns:
+        dict: {"documents": [per-document results in input order], "stats": {...}}
+    """
+    start = time.perf_counter()
+    llm_before = llm.snapshot()
+    results: Dict[str, Dict] = {}
+    extract_seconds = 0.0
+    lock = threading.Lock()
+    # Bounds the documents extracted but not yet summarized, so a slow LLM
+    # stage holds back extraction instead of buffering every document's text
+    in_flight = threading.BoundedSemaphore(2 * max(1, document_workers))
+    finished = threading.Semaphore(0)
+
+    def finish(path: str, result: Dict) -> None:
+        with lock:
+            results[path] = result
+        in_flight.release()
+        try:
+            if on_document:
+                on_document(result)
+        finally:
+            finished.release()
+
+    def summarize(path: str, extract_result) -> None:
+        doc_start = time.perf_counter()
+        try:
+            result = summarize_document(path, extract_result)
+        except Exception as e:
+            result = {"pdf_path": path, "error": f"Error in summarize_pdf: {str(e)}"}
+        result["seconds"] = round(time.perf_counter() - doc_start, 3)
+        finish(path, result)
+
+    # Spawned workers do not inherit the server's threads (warm-up, thread pools)
+    context = multiprocessing.get_context("spawn")
+    workers = max(1, min(extract_workers, len(paths)))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as extract_pool, \
+            ThreadPoolExecutor(max_workers=max(1, document_workers), thread_name_prefix="document") as document_pool:
+        def extracted(path: str, future) -> None:
+            nonlocal extract_seconds
+            try:
+                extract_result = future.result()
+            except Exception as e:
+                finish(path, {"pdf_path": path, "error": f"PDF extraction failed: {str(e)}", "seconds": 0.0})
+                return
+            with lock:
+                extract_seconds = time.perf_counter() - start
+            document_pool.submit(summarize, path, extract_result)
+
+        for path in paths:
+            in_flight.acquire()
+            future = extract_pool.submit(extract, path)
+            future.add_done_callback(lambda f, path=path: extracted(path, f))
+        # Done callbacks may still be running when the futures complete: wait for the documents
+        for _ in paths:
+            finished.acquire()
+
+    llm_after = llm.snapshot()
+    documents = [results[path] for path in paths]
+    failed = [document for document in documents if document.get("error")]
+    total = time.perf_counter() - start
+    stats = {
+        "documents": len(documents),
+        "succeeded": len(documents) - len(failed),
+        "failed": len(failed),
+        "pages": sum(document.get("num_pages", 0) for document in documents),
+        "chunks": sum(document.get("num_chunks", 0) for document in documents),
+        "reused_chunks": sum(len(document.get("reused_chunks", [])) for document in documents),
+        "llm_calls": llm_after["calls"] - llm_before["calls"],
+        "llm_failures": llm_after["failures"] - llm_before["failures"],
+        "llm_rate_limit_wait_seconds": round(llm_after["wait_seconds"] - llm_before["wait_seconds"], 3),
+        "extract_workers": workers,
+        "extract_seconds": round(extract_seconds, 3),
+        "total_seconds": round(total, 3),
+        "documents_per_minute": round(len(documents) * 60 / total, 2) if total else None,
+    }
+    return {"documents": documents, "stats": stats}
@@ -0,0 +1,99 @@
+"""
+Per-chunk checkpoints of summarize_pdf runs.
+
+Every chunk summary is appended to output/runs/<run_id>/checkpoint.jsonl as
+soon as it is available, next to a run.json manifest (pdf_path, doc_id,
+chunking_method). If a chunk fails after its retries, or the server dies
+mid-run, summarize_pdf(..., resume_run_id=...) re-chunks the document
+(deterministic and LLM-free) and only summarizes the chunks that have no
+checkpoint entry, writing into the same run.
+
+Entries are keyed by the chunk's content key (text, prompt version, model),
+so a checkpoint never supplies a summary for a chunk whose text or prompt
+changed. Only successful summaries are recorded.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+from artifacts import RUNS_DIR, load_artifact, run_dir, save_artifact
+
+CHECKPOINT_FILE = "checkpoint.jsonl"
+
+
+class RunCheckpoint:
+    """
+    Append-only log of the finished chunk summaries of one run.
+
+    Args:
+        run_id: Run identifier (its artifact directory is created if needed)
+    """
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.path = os.path.join(run_dir(run_id, create=True), CHECKPOINT_FILE)
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, Dict]:
+        """Return the recorded chunk summaries by content key (a torn last line is ignored)."""
+        entries = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    entries[entry["key"]] = entry
+        except OSError:
+            pass
+        return entries
+
+    def record(self, key: str, chunk_summary: Dict) -> None:
+        """Append one successful chunk summary and flush it to disk."""
+        line = (json.dumps({"key": key, **chunk_summary}, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock, open(self.path, "ab+") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # Terminate a line torn by a crash, so it does not swallow this entry
+                    line = b"\n" + line
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def save_manifest(run_id: str, pdf_path: str, doc_id: str, chunking_method: str) -> None:
+    """Record what a run summarizes, so it can be resumed or found again."""
+    save_artifact(run_id, "run", {"pdf_path": pdf_path, "doc_id": doc_id, "chunking_method": chunking_method})
+
+
+def load_manifest(run_id: str) -> Dict:
+    """
+    Read the manifest of a run.
+
+    Raises:
+        ValueError: If the run_id is malformed
+        FileNotFoundError: If the run does not exist or predates checkpoints
+    """
+    return load_artifact(run_id, "run")
+
+
+def latest_run(doc_id: str, runs_dir: str = RUNS_DIR) -> Optional[str]:
+    """Return the most recent run with a checkpoint for a document, or None."""
+    try:
+        run_ids = sorted(os.listdir(runs_dir), reverse=True)
+    except OSError:
+        return None
+    for run_id in run_ids:
+        if not os.path.exists(os.path.join(runs_dir, run_id, CHECKPOINT_FILE)):
+            continue
+        try:
+            if load_manifest(run_id)["doc_id"] == doc_id:
+                return run_id
+        except (OSError, ValueError, KeyError):
+            continue
+    return None
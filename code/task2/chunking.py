@@ -0,0 +1,428 @@
+"""
+Semantic chunking for summarize_pdf.
+
+FastSemanticChunker follows the percentile algorithm of LangChain's
+SemanticChunker (sentence windows, adjacent cosine distances, split where the
+distance exceeds a percentile) and keeps its create_documents/split_text
+interface, but:
+
+- encodes all sentence windows in a single SentenceTransformer call with a
+  tuned batch size and normalized embeddings,
+- computes every adjacent cosine distance in one NumPy operation (a row-wise
+  dot product of unit vectors) instead of a Python loop,
+- enforces optional min/max chunk sizes, merging small chunks into their
+  neighbours and splitting large ones at sentence boundaries.
+
+Sizes can be measured in tokens with TokenCounter; bound_chunks applies the
+same min/max rules to chunks from any splitter.
+
+structural_chunks is the embedding-free alternative: it packs PyMuPDF text
+blocks into chunks, breaking at headings (detected from font size/weight) and
+otherwise at paragraph and page boundaries. It needs no model and runs in
+milliseconds.
+"""
+
+import re
+import sys
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from lazy_imports import lazy_import
+
+# Same sentence boundary rule as LangChain's SemanticChunker
+SENTENCE_SPLIT_REGEX = r"(?<=[.?!])\s+"
+# Fallback token pattern: words and individual punctuation marks
+_TOKEN_REGEX = re.compile(r"\w+|[^\w\s]")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into non-empty sentences."""
+    return [s for s in re.split(SENTENCE_SPLIT_REGEX, text) if s.strip()]
+
+
+class TokenCounter:
+    """
+    Count tokens with a HuggingFace `tokenizers` tokenizer, loaded on first use.
+
+    If the tokenizer cannot be loaded (package missing, no network and no
+    cache), a regex word/punctuation count is used instead; `method` reports
+    which one is active.
+
+    Args:
+        tokenizer_name: HuggingFace Hub name of the tokenizer
+    """
+
+    def __init__(self, tokenizer_name: str):
+        self.tokenizer_name = tokenizer_name
+        self._tokenizer = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _get_tokenizer(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    try:
+                        tokenizer = lazy_import("tokenizers").Tokenizer.from_pretrained(self.tokenizer_name)
+                        # Count whole texts: no truncation at the model's max sequence length
+                        tokenizer.no_truncation()
+                        tokenizer.no_padding()
+                        self._tokenizer = tokenizer
+                    except Exception as e:
+                        print(f"TokenCounter: tokenizer '{self.tokenizer_name}' unavailable ({e}), "
+                              f"using regex token estimate", file=sys.stderr)
+                    self._loaded = True
+        return self._tokenizer
+
+    @property
+    def method(self) -> str:
+        return "tokenizers" if self._get_tokenizer() is not None else "regex"
+
+    def __call__(self, text: str) -> int:
+        tokenizer = self._get_tokenizer()
+        if tokenizer is None:
+            return len(_TOKEN_REGEX.findall(text))
+        return len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+    def count_batch(self, texts: List[str]) -> List[int]:
+        """Count tokens of many texts in one (parallel) tokenizer call."""
+        tokenizer = self._get_tokenizer()
+        if tokenizer is None:
+            return [len(_TOKEN_REGEX.findall(text)) for text in texts]
+        return [len(encoding.ids) for encoding in tokenizer.encode_batch(texts, add_special_tokens=False)]
+
+
+def split_to_budget(sentences: List[str], max_size: int,
+                    length_function: Callable[[str], int] = len) -> List[List[str]]:
+    """Group consecutive sentences so no group exceeds max_size (a single long sentence stays whole)."""
+    separator_size = length_function(" ")
+    pieces, current, current_size = [], [], 0
+    for sentence in sentences:
+        size = length_function(sentence)
+        if current and current_size + separator_size + size > max_size:
+            pieces.append(current)
+            current, current_size = [], 0
+        current_size += size + (separator_size if current else 0)
+        current.append(sentence)
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def merge_small_chunks(chunks: List[str], min_size: int, max_size: Optional[int] = None,
+                       length_function: Callable[[str], int] = len) -> List[str]:
+    """
+    Merge chunks below min_size into the following chunk, or else the
+    previous one, without exceeding max_size.
+    """
+    def fits(text):
+        return max_size is None or length_function(text) <= max_size
+
+    merged: List[str] = []
+    carry = ""
+    for chunk in chunks:
+        if carry:
+            if fits(f"{carry} {chunk}"):
+                chunk = f"{carry} {chunk}"
+            elif merged and fits(f"{merged[-1]} {carry}"):
+                merged[-1] = f"{merged[-1]} {carry}"
+            else:
+                merged.append(carry)
+            carry = ""
+        if length_function(chunk) < min_size:
+            carry = chunk
+        else:
+            merged.append(chunk)
+    if carry:
+        if merged and fits(f"{merged[-1]} {carry}"):
+            merged[-1] = f"{merged[-1]} {carry}"
+        else:
+            merged.append(carry)
+    return merged
+
+
+def bound_chunks(chunks: List[str], min_size: int = 0, max_size: Optional[int] = None,
+                 length_function: Callable[[str], int] = len) -> List[str]:
+    """
+    Bring chunks from any splitter within [min_size, max_size].
+
+    Oversized chunks are split at sentence boundaries, then chunks below
+    min_size are merged into a neighbour. Only a single sentence longer than
+    max_size, or a small chunk with no neighbour it fits into, stays out of bounds.
+    """
+    if max_size:
+        bounded = []
+        for chunk in chunks:
+            if length_function(chunk) <= max_size:
+                bounded.append(chunk)
+            else:
+                bounded.extend(" ".join(group) for group in
+                               split_to_budget(split_sentences(chunk), max_size, length_function))
+        chunks = bounded
+    if min_size:
+        chunks = merge_small_chunks(chunks, min_size, max_size, length_function)
+    return chunks
+
+
+@dataclass
+class Chunk:
+    """A text chunk; mirrors the page_content/metadata shape of a LangChain Document."""
+    page_content: str
+    metadata: Dict = field(default_factory=dict)
+
+
+class FastSemanticChunker:
+    """
+    Split text where the meaning shifts between adjacent sentences.
+
+    Args:
+        model: Loaded sentence_transformers.SentenceTransformer
+        breakpoint_percentile: Split where the distance exceeds this percentile
+        buffer_size: Sentences on each side combined into a window before encoding
+        batch_size: Encoding batch size
+        min_chunk_size: Chunks smaller than this are merged into a neighbour (0 disables)
+        max_chunk_size: Chunks larger than this are split at sentence boundaries (None disables)
+        length_function: Measures chunk size (characters by default; pass a
+                         TokenCounter to bound chunks in tokens)
+    """
+
+    def __init__(self, model, breakpoint_percentile: float = 95.0, buffer_size: int = 1,
+                 batch_size: int = 64, min_chunk_size: int = 0, max_chunk_size: Optional[int] = None,
+                 length_function: Callable[[str], int] = len):
+        self.model = model
+        self.breakpoint_percentile = breakpoint_percentile
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.length_function = length_function
+
+    def _windows(self, sentences: List[str]) -> List[str]:
+        """Combine each sentence with `buffer_size` neighbours on both sides."""
+        n = len(sentences)
+        return [
+            " ".join(sentences[max(0, i - self.buffer_size):min(n, i + self.buffer_size + 1)])
+            for i in range(n)
+        ]
+
+    def encode_windows(self, sentences: List[str]) -> np.ndarray:
+        """Normalized embeddings of each sentence window, in one batched call."""
+        return self.model.encode(
+            self._windows(sentences),
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+
+    def breakpoint_distances(self, sentences: List[str], embeddings: Optional[np.ndarray] = None) -> np.ndarray:
+        """Cosine distance between each pair of adjacent sentence windows."""
+        if embeddings is None:
+            embeddings = self.encode_windows(sentences)
+        # Unit vectors: cosine similarity is the row-wise dot product
+        return 1.0 - np.einsum("ij,ij->i", embeddings[:-1], embeddings[1:])
+
+    def _semantic_groups(self, sentences: List[str], embeddings: Optional[np.ndarray] = None) -> List[List[str]]:
+        if len(sentences) < 2:
+            return [sentences]
+        distances = self.breakpoint_distances(sentences, embeddings)
+        threshold = np.percentile(distances, self.breakpoint_percentile)
+        # A breakpoint after sentence i starts a new group at i + 1
+        starts = [0] + (np.flatnonzero(distances > threshold) + 1).tolist() + [len(sentences)]
+        return [sentences[a:b] for a, b in zip(starts[:-1], starts[1:]) if b > a]
+
+    def _chunks_from_groups(self, groups: List[List[str]]) -> List[str]:
+        if self.max_chunk_size:
+            groups = [piece for group in groups
+                      for piece in split_to_budget(group, self.max_chunk_size, self.length_function)]
+        chunks = [" ".join(group) for group in groups]
+        if self.min_chunk_size:
+            chunks = merge_small_chunks(chunks, self.min_chunk_size, self.max_chunk_size, self.length_function)
+        return chunks
+
+    def split_text(self, text: str) -> List[str]:
+        """Split a text into semantic chunks."""
+        sentences = split_sentences(text)
+        if not sentences:
+            return []
+        return self._chunks_from_groups(self._semantic_groups(sentences))
+
+    def split_text_with_embeddings(self, text: str) -> Tuple[List[str], np.ndarray]:
+        """
+        Split a text into semantic chunks and return one embedding per chunk.
+
+        Chunk embeddings are the normalized mean of the sentence-window
+        embeddings already computed for the breakpoints, so no extra encoding
+        is needed (e.g. for a search index).
+
+        Returns:
+            tuple: (chunks, float32 array of shape (num_chunks, dim))
+        """
+        sentences = split_sentences(text)
+        if not sentences:
+            return [], np.zeros((0, 0), dtype=np.float32)
+        embeddings = self.encode_windows(sentences)
+        chunks = self._chunks_from_groups(self._semantic_groups(sentences, embeddings))
+
+        # Every chunk is " ".join of consecutive sentences: count them by length
+        counts, position = [], 0
+        for chunk in chunks:
+            length, count = -1, 0
+            while position < len(sentences) and length < len(chunk):
+                length += len(sentences[position]) + 1
+                position += 1
+                count += 1
+            counts.append(count)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+        pooled = np.add.reduceat(embeddings.astype(np.float32), starts, axis=0)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return chunks, pooled / np.where(norms == 0, 1, norms)
+
+    def create_documents(self, texts: List[str]) -> List[Chunk]:
+        """LangChain-compatible entry point: one Chunk per chunk of every text."""
+        return [Chunk(page_content=chunk) for text in texts for chunk in self.split_text(text)]
+
+
+# A block is a heading if its font is this much larger than the body text...
+HEADING_SIZE_RATIO = 1.15
+# ...or if it is a short, all-bold line
+HEADING_MAX_CHARS = 120
+
+
+def pdf_blocks(doc, ocr_texts: Optional[Dict[int, str]] = None) -> List[Dict]:
+    """
+    Read the text blocks of an open PyMuPDF document in reading order.
+
+    Args:
+        doc: Open fitz.Document
+        ocr_texts: {page index: OCR text} for scanned pages; their paragraphs
+                   become blocks without font information (size 0, never headings)
+
+    Returns:
+        list[dict]: {"page" (1-based), "text", "size" (largest font size), "bold"}
+    """
+    blocks = []
+    for page_number, page in enumerate(doc, 1):
+        if ocr_texts and page_number - 1 in ocr_texts:
+            for paragraph in re.split(r"\n\s*\n", ocr_texts[page_number - 1]):
+                if paragraph.strip():
+                    blocks.append({"page": page_number, "text": paragraph.strip(), "size": 0.0, "bold": False})
+            continue
+        for block in page.get_text("dict", sort=True)["blocks"]:
+            if block.get("type") != 0:  # Skip image blocks
+                continue
+            spans = [span for line in block["lines"] for span in line["spans"] if span["text"].strip()]
+            if not spans:
+                continue
+            text = "\n".join(
+                "".join(span["text"] for span in line["spans"]).strip() for line in block["lines"]
+            ).strip()
+            blocks.append({
+                "page": page_number,
+                "text": text,
+                "size": max(span["size"] for span in spans),
+                "bold": all(span["flags"] & 16 for span in spans),  # Bit 4: bold
+            })
+    return blocks
+
+
+def _body_font_size(blocks: List[Dict]) -> float:
+    """Font size covering the most characters, i.e. the body text size."""
+    weights: Dict[float, int] = {}
+    for block in blocks:
+        if not block["size"]:  # OCR blocks carry no font size
+            continue
+        size = round(block["size"], 1)
+        weights[size] = weights.get(size, 0) + len(block["text"])
+    return max(weights, key=weights.get) if weights else 0.0
+
+
+def structural_chunks(blocks: List[Dict], max_size: Optional[int] = None, min_size: int = 0,
+                      length_function: Callable[[str], int] = len) -> List[Dict]:
+    """
+    Pack PDF text blocks into chunks along the document layout.
+
+    A heading always starts a new chunk once the current one reaches min_size;
+    otherwise blocks (paragraphs) are added until the next one would exceed
+    max_size. Single blocks above max_size are split at sentence boundaries.
+
+    Args:
+        blocks: Output of pdf_blocks
+        max_size: Maximum chunk size (None: one chunk per heading section)
+        min_size: A heading does not close a chunk smaller than this
+        length_function: Measures chunk size (characters by default)
+
+    Returns:
+        list[dict]: {"text", "pages": [first_page, last_page]}
+    """
+    body_size = _body_font_size(blocks)
+    separator_size = length_function("\n\n")
+    chunks: List[Dict] = []
+    current: List[str] = []
+    current_size = 0
+    first_page = last_page = None
+
+    def close():
+        nonlocal current, current_size, first_page
+        if current:
+            chunks.append({"text": "\n\n".join(current), "pages": [first_page, last_page]})
+        current, current_size, first_page = [], 0, None
+
+    for block in blocks:
+        text = block["text"]
+        size = length_function(text)
+        is_heading = body_size and (
+            block["size"] >= body_size * HEADING_SIZE_RATIO
+            or (block["bold"] and len(text) <= HEADING_MAX_CHARS and "\n" not in text)
+        )
+        if current and is_heading and current_size >= min_size:
+            close()
+
+        if max_size and size > max_size:
+            # One oversized paragraph: emit sentence-bounded pieces; the last
+            # piece stays open so the following blocks can join it
+            start_page = block["page"]
+            if current and current_size < min_size:
+                # Too small to stand alone: split it together with this block
+                text = "\n\n".join(current + [text])
+                start_page = first_page
+                current, current_size, first_page = [], 0, None
+            close()
+            pieces = bound_chunks([text], max_size=max_size, length_function=length_function)
+            for piece in pieces[:-1]:
+                chunks.append({"text": piece, "pages": [start_page, block["page"]]})
+                start_page = block["page"]
+            text = pieces[-1]
+            size = length_function(text)
+        elif current and max_size and current_size + separator_size + size > max_size:
+            close()
+
+        if first_page is None:
+            first_page = block["page"]
+        last_page = block["page"]
+        current_size += size + (separator_size if current else 0)
+        current.append(text)
+    close()
+
+    if min_size and len(chunks) > 1:
+        chunks = _merge_small_structural(chunks, min_size, max_size, length_function)
+    return chunks
+
+
+def _merge_small_structural(chunks: List[Dict], min_size: int, max_size: Optional[int],
+                            length_function: Callable[[str], int]) -> List[Dict]:
+    """merge_small_chunks for structural chunks, keeping their page ranges."""
+    merged: List[Dict] = []
+    for chunk in chunks:
+        if merged:
+            previous = merged[-1]
+            combined = f"{previous['text']}\n\n{chunk['text']}"
+            small = length_function(previous["text"]) < min_size or length_function(chunk["text"]) < min_size
+            if small and (max_size is None or length_function(combined) <= max_size):
+                merged[-1] = {"text": combined, "pages": [previous["pages"][0], chunk["pages"][1]]}
+                continue
+        merged.append(chunk)
+    return merged
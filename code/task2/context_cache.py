@@ -0,0 +1,228 @@
+"""
+Prompt-prefix caching for LLM calls that resend the same long document.
+
+The hallucination judge sends the whole source document with every
+evaluation, and the evaluation agent repeats the call when it retries or
+re-evaluates a document; summarize_text does the same when the agent
+summarizes a full document. Input tokens dominate the latency and cost of
+those calls, so the document is uploaded once as a cached prefix
+(Gemini cached content) and later calls only send their own instructions
+plus a reference to the cache.
+
+The cached prefix is the document text alone, with no system instruction,
+and a cache is keyed by (model, document): it is only reused by calls that
+send the same text to the same model. The judge and the summary calls use
+different models and the summary pipeline only sends chunks, so in practice
+each side reuses its own caches (the judge on repeated evaluations of one
+document, summarize_text when the same text is summarized again). Cache
+names are kept in a registry file (output/context_caches.json) that the
+summarization and evaluation servers both read, with the expiry time of each
+cache.
+
+Explicit caches are billed for their storage, so caching is opt-in: it is
+off unless CONTEXT_CACHE_BACKEND is set, and summarize_text only caches
+when the caller asks for it (cache_context).
+
+Two backends share the same create / build interface:
+
+- GeminiContextBackend: client.caches (explicit context caching),
+- LocalContextBackend: an in-process simulation that keeps the prefix and
+  sends it inline again, for tests, offline development and models without
+  caching (CONTEXT_CACHE_BACKEND=local).
+
+Documents shorter than CONTEXT_CACHE_MIN_TOKENS are never cached: Gemini
+rejects caches below a model-dependent minimum, and short prefixes are
+already covered by the provider's implicit caching.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from typing import Dict, Optional, Tuple
+
+CONTEXT_CACHE_BACKEND = os.getenv("CONTEXT_CACHE_BACKEND", "off")  # 'gemini', 'local' or 'off'
+CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("CONTEXT_CACHE_TTL_SECONDS", "3600"))
+# Roughly the largest minimum cache size of the Gemini models in use
+CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("CONTEXT_CACHE_MIN_TOKENS", "2048"))
+CONTEXT_CACHE_REGISTRY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "context_caches.json")
+
+# Caches closer than this to their expiry are recreated instead of used
+EXPIRY_MARGIN_SECONDS = 60
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (about four characters per token)."""
+    return len(text) // 4
+
+
+def prefix_key(model: str, document: str) -> str:
+    """Registry key of a cached document prefix for one model."""
+    digest = hashlib.sha256()
+    digest.update(model.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(document.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+class GeminiContextBackend:
+    """
+    Gemini explicit context caching.
+
+    Args:
+        client: A google.genai Client
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def create(self, model: str, document: str, ttl_seconds: int, display_name: str) -> str:
+        """Upload the document as cached content and return the cache name."""
+        cache = self.client.caches.create(model=model, config={
+            "contents": [{"role": "user", "parts": [{"text": document}]}],
+            "ttl": f"{ttl_seconds}s",
+            "display_name": display_name,
+        })
+        return cache.name
+
+    def build(self, name: str, prompt: str) -> Tuple[str, Dict]:
+        """Return (contents, config) of a request that continues the cached prefix."""
+        return prompt, {"cached_content": name}
+
+
+# Prefixes of the local backend, shared by every instance of the process like
+# server-side caches are shared by every client
+_LOCAL_PREFIXES: Dict[str, str] = {}
+
+
+class LocalContextBackend:
+    """In-process simulation: the prefix is stored locally and sent inline with each request."""
+
+    def create(self, model: str, document: str, ttl_seconds: int, display_name: str) -> str:
+        name = f"cachedContents/local-{uuid.uuid4().hex[:12]}"
+        _LOCAL_PREFIXES[name] = document
+        return name
+
+    def build(self, name: str, prompt: str) -> Tuple[str, Dict]:
+        """
+        Raises:
+            KeyError: If the prefix belongs to another process
+        """
+        return f"{_LOCAL_PREFIXES[name]}\n\n{prompt}", {}
+
+
+class ContextCache:
+    """
+    Registry of cached document prefixes.
+
+    Args:
+        backend: GeminiContextBackend or LocalContextBackend
+        registry_path: JSON file of the cache names and expiry times
+        ttl_seconds: Lifetime of new caches
+        min_tokens: Documents with fewer (estimated) tokens are not cached
+    """
+
+    def __init__(self, backend, registry_path: str = CONTEXT_CACHE_REGISTRY,
+                 ttl_seconds: int = CONTEXT_CACHE_TTL_SECONDS, min_tokens: int = CONTEXT_CACHE_MIN_TOKENS):
+        self.backend = backend
+        self.registry_path = registry_path
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self._lock = threading.Lock()
+        # Prefixes whose cache could not be created (e.g. unsupported model)
+        self._failed = set()
+        self.stats = {"hits": 0, "created": 0, "skipped": 0, "failures": 0}
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.registry_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        now = time.time()
+        return {key: entry for key, entry in entries.items() if entry["expires_at"] > now}
+
+    def _save(self, entries: Dict[str, Dict]) -> None:
+        os.makedirs(os.path.dirname(self.registry_path), exist_ok=True)
+        temp_path = f"{self.registry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=2)
+        os.replace(temp_path, self.registry_path)
+
+    def lookup(self, model: str, document: str, display_name: str = "document") -> Tuple[Optional[str], bool]:
+        """
+        Return the cache of a document prefix, creating it if needed.
+
+        Returns:
+            tuple: (cache name or None if the document is not cached, whether it already existed)
+        """
+        if estimate_tokens(document) < self.min_tokens:
+            with self._lock:
+                self.stats["skipped"] += 1
+            return None, False
+        key = prefix_key(model, document)
+        with self._lock:
+            if key in self._failed:
+                return None, False
+            entry = self._load().get(key)
+            if entry and entry["expires_at"] - time.time() > EXPIRY_MARGIN_SECONDS:
+                self.stats["hits"] += 1
+                return entry["name"], True
+            try:
+                name = self.backend.create(model, document, self.ttl_seconds, display_name)
+            except Exception as e:
+                print(f"✗ Could not cache the document prefix ({model}): {str(e)}", file=sys.stderr)
+                self._failed.add(key)
+                self.stats["failures"] += 1
+                return None, False
+            entries = self._load()
+            entries[key] = {"name": name, "model": model, "tokens": estimate_tokens(document),
+                            "expires_at": time.time() + self.ttl_seconds}
+            self._save(entries)
+            self.stats["created"] += 1
+        print(f"✓ Cached {estimate_tokens(document)} document tokens as {name} ({model})", file=sys.stderr)
+        return name, False
+
+    def invalidate(self, model: str, document: str) -> None:
+        """Forget the cache of a document (e.g. after the provider reports it missing)."""
+        key = prefix_key(model, document)
+        with self._lock:
+            entries = self._load()
+            if entries.pop(key, None) is not None:
+                self._save(entries)
+
+    def request(self, model: str, document: str, prompt: str,
+                display_name: str = "document") -> Optional[Dict]:
+        """
+        Build a request that sends the document as a cached prefix followed by the prompt.
+
+        Returns:
+            dict: {"contents", "config", "cache", "hit"}, or None if the document
+                  is not cached (send the usual uncached request instead)
+        """
+        name, hit = self.lookup(model, document, display_name)
+        if name is None:
+            return None
+        try:
+            contents, config = self.backend.build(name, prompt)
+        except KeyError:
+            # Created by another process of the local backend
+            self.invalidate(model, document)
+            name, hit = self.lookup(model, document, display_name)
+            if name is None:
+                return None
+            contents, config = self.backend.build(name, prompt)
+        return {"contents": contents, "config": config, "cache": name, "hit": hit}
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return dict(self.stats)
+
+
+def is_cache_error(error: Exception) -> bool:
+    """True if a request failed because its cached content expired or is missing."""
+    message = str(error)
+    return "cachedContent" in message or "cached_content" in message or "CachedContent" in message
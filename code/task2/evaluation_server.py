@@ -1,23 +1,72 @@
 import sys
 import json
 import os
+import threading
 from typing import Dict, Any, Optional
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
-import numpy as np
-from google import genai
 from dotenv import load_dotenv
 # FastMCP Import
 from mcp.server.fastmcp import FastMCP
-mcp = FastMCP("evaluation-mcp-server")
+# sentence-transformers/torch, sklearn and genai are imported on first use
+from lazy_imports import lazy_import, warm_up_lifespan, import_time_report as build_import_time_report
+# server_cli.py lives in code/common, shared with the task3 server
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+from server_cli import run_server, http_app
+from artifacts import dumps
+from schemas import HallucinationJudgment
+from pydantic import ValidationError
+from context_cache import (ContextCache, GeminiContextBackend, LocalContextBackend, CONTEXT_CACHE_BACKEND,
+                           is_cache_error)
 # Load environment variables
 load_dotenv()
 
-# Configure Gemini API
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+EMBEDDING_MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+_client = None
+_embedding_model = None
+_model_lock = threading.Lock()
+# Cached source documents of the judge, reused across evaluations (see context_cache.py)
+_context_cache = None
+_context_cache_lock = threading.Lock()
 
-# Initialize embedding model for similarity calculation
-embedding_model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+
+def _get_client():
+    """Create the Gemini client on first use."""
+    global _client
+    if _client is None:
+        _client = lazy_import("google.genai").Client(api_key=os.getenv("GEMINI_API_KEY"))
+    return _client
+
+
+def _get_context_cache():
+    """Return the context cache selected by CONTEXT_CACHE_BACKEND (None if 'off'), created on first use."""
+    global _context_cache
+    if CONTEXT_CACHE_BACKEND == "off":
+        return None
+    with _context_cache_lock:
+        if _context_cache is None:
+            if CONTEXT_CACHE_BACKEND == "local":
+                _context_cache = ContextCache(LocalContextBackend())
+            else:
+                _context_cache = ContextCache(GeminiContextBackend(_get_client()))
+    return _context_cache
+
+
+def _get_embedding_model():
+    """Load the embedding model for similarity calculation once, on first use."""
+    global _embedding_model
+    if _embedding_model is None:
+        with _model_lock:
+            if _embedding_model is None:
+                sentence_transformers = lazy_import("sentence_transformers")
+                _embedding_model = sentence_transformers.SentenceTransformer(EMBEDDING_MODEL_NAME)
+    return _embedding_model
+
+
+# torch + MiniLM are loaded in the background once the transport is up
+mcp = FastMCP("evaluation-mcp-server", lifespan=warm_up_lifespan({
+    "embedding_model": _get_embedding_model,
+    "sklearn": lambda: lazy_import("sklearn.metrics.pairwise"),
+    "gemini_client": _get_client,
+}))
 
 
 def evaluate_llm_responses(response: str, ground_truth: str, threshold: float = 0.7) -> Dict[str, Any]:
@@ -50,10 +99,12 @@ def evaluate_llm_responses(response: str, ground_truth: str, threshold: float =
             raise ValueError("Ground truth text is empty or contains only whitespace")
         
         # Generate embeddings for both texts
+        embedding_model = _get_embedding_model()
         response_embedding = embedding_model.encode([response])
         ground_truth_embedding = embedding_model.encode([ground_truth])
         
         # Calculate cosine similarity
+        cosine_similarity = lazy_import("sklearn.metrics.pairwise").cosine_similarity
         similarity_score = cosine_similarity(response_embedding, ground_truth_embedding)[0][0]
         
         # Determine verdict
@@ -73,6 +124,80 @@ def evaluate_llm_responses(response: str, ground_truth: str, threshold: float =
         raise Exception(f"Error in similarity evaluation: {str(e)}")
 
 
+# Schema-constrained judge output (the SDK returns it as response.parsed)
+JUDGE_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": HallucinationJudgment,
+}
+
+
+def _judge_prompt(response: str, ground_truth: Optional[str] = None) -> str:
+    """
+    Build the judge prompt.
+
+    Without ground_truth the prompt refers to the source text sent before it
+    as a cached prefix.
+    """
+    if ground_truth is None:
+        source = "The SOURCE TEXT is the document provided above."
+    else:
+        source = f"""**SOURCE TEXT**:
+{ground_truth}"""
+    return f"""You are an expert fact-checker evaluating whether a summary contains hallucinations.
+
+**Task**: Determine if the SUMMARY contains any information that cannot be found or reasonably inferred from the SOURCE TEXT.
+
+{source}
+
+**SUMMARY**:
+{response}
+
+**Instructions**:
+1. Carefully read both the source text and the summary
+2. Identify any claims, facts, or details in the summary that are NOT present in the source
+3. Distinguish between:
+   - Valid abstractions/generalizations (acceptable)
+   - Information that can be reasonably inferred (acceptable)
+   - Fabricated or added information (hallucination)
+
+**Response Format**: The response schema defines the fields: has_hallucination, confidence (high/medium/low),
+hallucinated_claims (the unsupported statements, empty if none) and explanation (detailed reasoning for your decision)."""
+
+
+def _parse_judgment(judge_response, model_name: str) -> HallucinationJudgment:
+    """
+    Validate the judge's structured output, with one repair call if it is malformed.
+    
+    The repair call sends only the malformed output and the validation error,
+    not the source text, so it costs far less than repeating the judgment.
+    
+    Raises:
+        ValidationError: If the repaired output is still invalid
+    """
+    parsed = getattr(judge_response, "parsed", None)
+    if isinstance(parsed, HallucinationJudgment):
+        return parsed
+    raw_output = judge_response.text or ""
+    try:
+        return HallucinationJudgment.model_validate_json(raw_output)
+    except ValidationError as e:
+        print(f"Judge output does not match the schema, repairing it: {e.error_count()} error(s)", file=sys.stderr)
+        repair_prompt = (
+            "Rewrite the following output as a JSON object that matches the response schema. "
+            "Keep its verdict, claims and reasoning; only fix the format.\n\n"
+            f"**Validation errors**:\n{str(e)}\n\n**Output**:\n{raw_output}"
+        )
+    repair_response = _get_client().models.generate_content(
+        model=model_name,
+        contents=repair_prompt,
+        config=JUDGE_CONFIG
+    )
+    parsed = getattr(repair_response, "parsed", None)
+    if isinstance(parsed, HallucinationJudgment):
+        return parsed
+    return HallucinationJudgment.model_validate_json(repair_response.text or "")
+
+
 def hallucination_checker(response: str, ground_truth: str, model_name: str = "gemini-3-flash-preview") -> Dict[str, Any]:
     """
     Check for hallucinations in the LLM-generated response using an LLM-as-a-judge approach.
@@ -93,6 +218,8 @@ def hallucination_checker(response: str, ground_truth: str, model_name: str = "g
             - hallucinated_claims (list): List of specific hallucinated statements (if any)
             - explanation (str): Detailed reasoning from the judge
             - judge_model (str): The model used for judgment
+            - context_cache (dict): Cache name and whether it was reused, if the
+              source text was sent as a cached prefix
             
     Raises:
         ValueError: If response or ground_truth is empty
@@ -105,72 +232,63 @@ def hallucination_checker(response: str, ground_truth: str, model_name: str = "g
         if not ground_truth or not ground_truth.strip():
             raise ValueError("Ground truth text is empty or contains only whitespace")
         
-        # Create the judge prompt
-        judge_prompt = f"""You are an expert fact-checker evaluating whether a summary contains hallucinations.
-
-**Task**: Determine if the SUMMARY contains any information that cannot be found or reasonably inferred from the SOURCE TEXT.
-
-**SOURCE TEXT**:
-{ground_truth}
-
-**SUMMARY**:
-{response}
-
-**Instructions**:
-1. Carefully read both the source text and the summary
-2. Identify any claims, facts, or details in the summary that are NOT present in the source
-3. Distinguish between:
-   - Valid abstractions/generalizations (acceptable)
-   - Information that can be reasonably inferred (acceptable)
-   - Fabricated or added information (hallucination)
-
-**Response Format** (JSON):
-{{
-  "has_hallucination": true/false,
-  "confidence": "high/medium/low",
-  "hallucinated_claims": ["claim 1", "claim 2", ...],
-  "explanation": "Detailed reasoning for your decision"
-}}
-
-Respond ONLY with valid JSON, no additional text."""
-
-        # Call Gemini API for judgment
-        judge_response = client.models.generate_content(
-            model=model_name,
-            contents=judge_prompt
-        )
-        
-        # Parse the JSON response
-        response_text = judge_response.text.strip()
-        
-        # Extract JSON from markdown code blocks if present
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0].strip()
+        # The source document is sent as a cached prefix when it is long enough, so
+        # re-evaluating the same document only sends the summary and instructions
+        context_cache = _get_context_cache()
+        cached = None
+        if context_cache is not None:
+            cached = context_cache.request(model_name, ground_truth, _judge_prompt(response),
+                                           display_name="hallucination_checker")
         
-        judgment = json.loads(response_text)
+        # Call Gemini API for judgment
+        try:
+            if cached is not None:
+                judge_response = _get_client().models.generate_content(
+                    model=model_name,
+                    contents=cached["contents"],
+                    config={**cached["config"], **JUDGE_CONFIG}
+                )
+            else:
+                judge_response = _get_client().models.generate_content(
+                    model=model_name,
+                    contents=_judge_prompt(response, ground_truth),
+                    config=JUDGE_CONFIG
+                )
+        except Exception as e:
+            if cached is None or not is_cache_error(e):
+                raise
+            # The cache expired or was deleted: drop it and send the document inline
+            print(f"Context cache {cached['cache']} unavailable, retrying without it", file=sys.stderr)
+            context_cache.invalidate(model_name, ground_truth)
+            cached = None
+            judge_response = _get_client().models.generate_content(
+                model=model_name,
+                contents=_judge_prompt(response, ground_truth),
+                config=JUDGE_CONFIG
+            )
         
-        # Validate judgment structure
-        has_hallucination = judgment.get("has_hallucination", False)
+        # Validate the structured judgment (one cheap repair call if it is malformed)
+        judgment = _parse_judgment(judge_response, model_name)
         
         # Determine verdict
-        verdict = "FAIL" if has_hallucination else "PASS"
+        verdict = "FAIL" if judgment.has_hallucination else "PASS"
         
         # Create evaluation result
         result = {
-            "has_hallucination": has_hallucination,
+            "has_hallucination": judgment.has_hallucination,
             "verdict": verdict,
-            "confidence": judgment.get("confidence", "unknown"),
-            "hallucinated_claims": judgment.get("hallucinated_claims", []),
-            "explanation": judgment.get("explanation", "No explanation provided"),
+            "confidence": judgment.confidence,
+            "hallucinated_claims": judgment.hallucinated_claims,
+            "explanation": judgment.explanation,
             "judge_model": model_name
         }
+        if cached is not None:
+            result["context_cache"] = {"cache": cached["cache"], "hit": cached["hit"]}
         
         return result
     
-    except json.JSONDecodeError as e:
-        raise Exception(f"Failed to parse judge response as JSON: {str(e)}")
+    except ValidationError as e:
+        raise Exception(f"Judge response does not match the schema after one repair attempt: {str(e)}")
     except Exception as e:
         raise Exception(f"Error in hallucination check: {str(e)}")
 
@@ -301,12 +419,37 @@ def evaluate_summarization_agent(summary_file_path: Optional[str] = None,
             "evaluated_summary": data["combined_summary"][:200] + "..." if len(data["combined_summary"]) > 200 else data["combined_summary"]
         }
         
-        return json.dumps(result, indent=2)
+        return dumps(result)
+    
+    except Exception as e:
+        return dumps({"error": f"Error in complete evaluation: {str(e)}"})
+
+
+@mcp.tool()
+def import_time_report(modules: str = "sentence_transformers,sklearn,google.genai", top: int = 15) -> str:
+    """
+    Diagnostic: report import/cold-start cost of this server's dependencies.
     
+    Args:
+        modules: Comma-separated modules to time in a fresh `python -X importtime` interpreter
+                 (pass an empty string to skip the subprocess and only report in-process timings)
+        top: Number of slowest imports to list
+        
+    Returns:
+        JSON string with slowest imports, per-module cold import times, and warm-up status
+    """
+    try:
+        module_list = [m.strip() for m in modules.split(",") if m.strip()]
+        return dumps(build_import_time_report(module_list, top=top))
     except Exception as e:
-        return json.dumps({"error": f"Error in complete evaluation: {str(e)}"})
+        return dumps({"error": f"Error building import time report: {str(e)}"})
+
+
+def create_http_app():
+    """ASGI app factory used by uvicorn worker processes in HTTP mode."""
+    return http_app(mcp)
 
 
 if __name__ == "__main__":
-    print("Launching Evaluation MCP Server via stdio...", file=sys.stderr)
-    mcp.run()
+    # stdio by default; --transport streamable-http/sse --host --port --workers to share one server
+    run_server(mcp, "evaluation_server", default_port=8003, description="Evaluation MCP server")
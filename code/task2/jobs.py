@@ -0,0 +1,286 @@
+"""
+In-process job queue for long-running tool calls.
+
+summarize_pdf blocks its tool call until every chunk is summarized, so a
+large PDF can outlive the client's tool timeout and lose all its work.
+submit_summarize_pdf queues the same pipeline as a job instead and returns a
+job_id at once; the agent polls get_job_status / get_job_result (or does
+other work meanwhile) and can cancel the job with cancel_job.
+
+Jobs run on a small thread pool (JOB_WORKERS). Their state is durable: every
+progress update rewrites output/jobs/<job_id>/job.json, and each finished
+chunk summary is appended to partial.jsonl, so status and partial summaries
+survive a server restart.
+
+A job runs in the process that accepted it, but with several HTTP workers
+(server_cli --workers N) the status and cancel calls can reach any worker.
+job.json therefore records the owner (host and pid) and a heartbeat that the
+owner refreshes every JOB_HEARTBEAT_SECONDS. Other workers read the state
+from disk, and a queued or running job is only reported as 'interrupted'
+once its owner process is gone or its heartbeat is older than
+JOB_STALE_SECONDS. cancel_job on another worker writes a cancel flag file
+that the owner picks up at its next heartbeat.
+"""
+
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+JOB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "jobs")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "5"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", str(6 * JOB_HEARTBEAT_SECONDS)))
+CANCEL_FLAG = "cancel"
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED, INTERRUPTED = (
+    "queued", "running", "succeeded", "failed", "cancelled", "interrupted"
+)
+FINAL_STATES = (SUCCEEDED, FAILED, CANCELLED, INTERRUPTED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job once cancel_job has been called for it."""
+
+
+class Job:
+    """
+    State of one queued tool call.
+
+    Args:
+        job_id: Job identifier
+        kind: Tool name, e.g. 'summarize_pdf'
+        params: Tool arguments
+    """
+
+    def __init__(self, job_id: str, kind: str, params: Dict):
+        self.job_id = job_id
+        self.kind = kind
+        self.params = params
+        self.status = QUEUED
+        self.stage = None
+        self.run_id = None
+        self.chunks_done = 0
+        self.chunks_total = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.owner_host = socket.gethostname()
+        self.owner_pid = os.getpid()
+        self.heartbeat_at = None
+        self.cancel_event = threading.Event()
+
+    def check_cancelled(self) -> None:
+        """Raise JobCancelled if the job has been cancelled."""
+        if self.cancel_event.is_set():
+            raise JobCancelled(f"Job {self.job_id} was cancelled")
+
+    def to_dict(self) -> Dict:
+        elapsed_end = self.finished_at or time.time()
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "stage": self.stage,
+            "run_id": self.run_id,
+            "chunks_done": self.chunks_done,
+            "chunks_total": self.chunks_total,
+            "progress": round(self.chunks_done / self.chunks_total, 3) if self.chunks_total else None,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_seconds": round(elapsed_end - self.started_at, 3) if self.started_at else None,
+            "owner_host": self.owner_host,
+            "owner_pid": self.owner_pid,
+            "heartbeat_at": self.heartbeat_at
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Job":
+        job = cls(data["job_id"], data["kind"], data["params"])
+        for field in ("status", "stage", "run_id", "chunks_done", "chunks_total", "error",
+                      "created_at", "started_at", "finished_at", "owner_host", "owner_pid", "heartbeat_at"):
+            setattr(job, field, data.get(field))
+        return job
+
+    def owner_alive(self) -> bool:
+        """True if the process that runs the job still exists and keeps its heartbeat fresh."""
+        if self.owner_host == socket.gethostname() and self.owner_pid:
+            if self.owner_pid == os.getpid():
+                # Not in this process's memory: a previous server with the same pid
+                return False
+            try:
+                os.kill(self.owner_pid, 0)
+            except ProcessLookupError:
+                return False
+            except OSError:
+                pass  # Exists, owned by another user
+        last_seen = self.heartbeat_at or self.created_at or 0
+        return time.time() - last_seen < JOB_STALE_SECONDS
+
+
+class JobQueue:
+    """
+    Thread-pool job runner with job state persisted under job_dir.
+
+    Args:
+        job_dir: Directory of the job state files
+        max_workers: Jobs running at the same time (later jobs wait queued)
+    """
+
+    def __init__(self, job_dir: str = JOB_DIR, max_workers: int = JOB_WORKERS):
+        self.job_dir = job_dir
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._heartbeat = None
+
+    def _path(self, job_id: str, name: str) -> str:
+        return os.path.join(self.job_dir, job_id, name)
+
+    def _save(self, job: Job) -> None:
+        job.heartbeat_at = time.time()
+        path = self._path(job.job_id, "job.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(job.to_dict(), f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def submit(self, kind: str, params: Dict, fn: Callable[[Job], Dict]) -> Job:
+        """
+        Queue fn(job) and return the job at once.
+
+        fn reports progress with update() / add_partial() and should call
+        job.check_cancelled() between steps; its return value is stored as the
+        job result.
+        """
+        job = Job(time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:8], kind, params)
+        with self._lock:
+            self._jobs[job.job_id] = job
+        self._save(job)
+        self._executor.submit(self._run, job, fn)
+        self._start_heartbeat()
+        return job
+
+    def _start_heartbeat(self) -> None:
+        with self._lock:
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(target=self._beat, daemon=True, name="job-heartbeat")
+                self._heartbeat.start()
+
+    def _beat(self) -> None:
+        """Refresh the heartbeat of this process's active jobs and apply cancel flags from other workers."""
+        while True:
+            time.sleep(JOB_HEARTBEAT_SECONDS)
+            with self._lock:
+                active = [job for job in self._jobs.values() if job.status not in FINAL_STATES]
+            for job in active:
+                try:
+                    if os.path.exists(self._path(job.job_id, CANCEL_FLAG)) and not job.cancel_event.is_set():
+                        print(f"Job {job.job_id}: cancel requested by another worker", file=sys.stderr)
+                        self.cancel(job.job_id)
+                    if job.status not in FINAL_STATES:
+                        self._save(job)
+                except Exception as e:
+                    print(f"✗ Job heartbeat failed for {job.job_id}: {str(e)}", file=sys.stderr)
+
+    def _run(self, job: Job, fn: Callable[[Job], Dict]) -> None:
+        if job.cancel_event.is_set():
+            return
+        job.status, job.started_at = RUNNING, time.time()
+        self._save(job)
+        try:
+            result = fn(job)
+            with open(self._path(job.job_id, "result.json"), "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False)
+            job.status = SUCCEEDED
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            print(f"✗ Job {job.job_id} failed: {str(e)}", file=sys.stderr)
+            job.status, job.error = FAILED, str(e)
+        job.stage, job.finished_at = None, time.time()
+        self._save(job)
+
+    def update(self, job: Job, **fields) -> None:
+        """Set progress fields (stage, run_id, chunks_done, chunks_total) and persist them."""
+        for field, value in fields.items():
+            setattr(job, field, value)
+        self._save(job)
+
+    def add_partial(self, job: Job, chunk_summary: Dict) -> None:
+        """Append a finished chunk summary to the job's partial results."""
+        with open(self._path(job.job_id, "partial.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(chunk_summary, ensure_ascii=False) + "\n")
+
+    def get(self, job_id: str) -> Job:
+        """
+        Return a job of this process or a persisted one from an earlier run.
+
+        Raises:
+            ValueError: If job_id is malformed
+            FileNotFoundError: If there is no such job
+        """
+        if not job_id or not all(c.isalnum() or c == "-" for c in job_id):
+            raise ValueError(f"Invalid job_id: {job_id}")
+        with self._lock:
+            if job_id in self._jobs:
+                return self._jobs[job_id]
+        try:
+            with open(self._path(job_id, "job.json"), "r", encoding="utf-8") as f:
+                job = Job.from_dict(json.load(f))
+        except OSError:
+            raise FileNotFoundError(f"No job with job_id {job_id}")
+        if job.status not in FINAL_STATES and not job.owner_alive():
+            # The process that ran it has stopped
+            job.status, job.stage = INTERRUPTED, None
+        return job
+
+    def cancel(self, job_id: str) -> Job:
+        """
+        Request cancellation; queued jobs are cancelled at once, running ones at their next check.
+
+        A job owned by another worker process gets a cancel flag file instead,
+        which its owner applies within JOB_HEARTBEAT_SECONDS.
+        """
+        job = self.get(job_id)
+        if job.status in FINAL_STATES:
+            return job
+        with self._lock:
+            local = job_id in self._jobs
+        if not local:
+            with open(self._path(job_id, CANCEL_FLAG), "w", encoding="utf-8") as f:
+                f.write(str(time.time()))
+            job.cancel_event.set()
+            return job
+        job.cancel_event.set()
+        if job.status == QUEUED:
+            job.status, job.finished_at = CANCELLED, time.time()
+            self._save(job)
+        return job
+
+    def partial(self, job_id: str, offset: int = 0, limit: int = 50) -> List[Dict]:
+        """Return finished chunk summaries of a job, in completion order."""
+        try:
+            with open(self._path(job_id, "partial.jsonl"), "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            return []
+        return [json.loads(line) for line in lines[offset:offset + limit] if line.strip()]
+
+    def result(self, job_id: str) -> Optional[Dict]:
+        """Return the stored result of a succeeded job, or None."""
+        try:
+            with open(self._path(job_id, "result.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except OSError:
+            return None
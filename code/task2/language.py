@@ -0,0 +1,212 @@
+"""
+Sampled language detection.
+
+langdetect builds n-gram profiles for the whole input, so detecting the
+language of a long document costs time linear in its size, while the answer
+stabilizes after a few KB. detect_sampled runs `detect_langs` on a few fixed
+windows (start, middle, end), aggregates their probabilities, and flags
+documents whose windows disagree as mixed-language.
+
+For multilingual PDFs, detect_many labels pages or chunks in parallel with a
+content-hash cache, and PageLanguageDetector runs page detection on a thread
+pool while the PDF is still being extracted.
+"""
+
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from lazy_imports import lazy_import
+
+WINDOW_CHARS = 2000
+NUM_WINDOWS = 3
+# A document is mixed if a second language holds at least this share of the
+# aggregated probability, or if confident windows disagree
+MIXED_LANGUAGE_SHARE = 0.2
+CONFIDENT_WINDOW = 0.8
+# Texts shorter than this are labeled "unknown" rather than guessed
+MIN_DETECT_CHARS = 20
+DETECT_WORKERS = 4
+CACHE_SIZE = 4096
+
+_cache: "OrderedDict[str, str]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+_factory_lock = threading.Lock()
+_factory_ready = False
+
+
+def _langdetect():
+    """Return langdetect, seeded for consistent results, with its profiles loaded."""
+    global _factory_ready
+    langdetect = lazy_import("langdetect")
+    if not _factory_ready:
+        # langdetect loads its profiles lazily and not thread-safely; load them once here
+        with _factory_lock:
+            if not _factory_ready:
+                langdetect.DetectorFactory.seed = 0
+                lazy_import("langdetect.detector_factory").init_factory()
+                _factory_ready = True
+    return langdetect
+
+
+def sample_windows(text: str, num_windows: int = NUM_WINDOWS,
+                   window_chars: int = WINDOW_CHARS) -> List[Tuple[int, str]]:
+    """
+    Pick evenly spaced windows from start to end of the text.
+
+    Windows are widened to the nearest whitespace so words are not cut. Texts
+    shorter than all windows together are returned as one window.
+
+    Returns:
+        list[tuple[int, str]]: (character offset, window text)
+    """
+    if len(text) <= num_windows * window_chars or num_windows < 2:
+        return [(0, text)]
+    windows = []
+    step = (len(text) - window_chars) / (num_windows - 1)
+    for i in range(num_windows):
+        start = int(i * step)
+        end = start + window_chars
+        if start > 0:
+            space = text.find(" ", start)
+            start = space + 1 if 0 <= space < end else start
+        space = text.rfind(" ", start, end)
+        end = space if space > start else end
+        windows.append((start, text[start:end]))
+    return windows
+
+
+def _probabilities(snippet: str) -> List[Dict]:
+    try:
+        return [{"lang": result.lang, "prob": round(result.prob, 4)}
+                for result in _langdetect().detect_langs(snippet)]
+    except Exception as e:  # LangDetectException: no features in text (digits, symbols only)
+        print(f"Language detection skipped a window: {e}", file=sys.stderr)
+        return []
+
+
+def detect_sampled(text: str, num_windows: int = NUM_WINDOWS, window_chars: int = WINDOW_CHARS) -> Dict:
+    """
+    Detect the language of a text from sampled windows.
+
+    Args:
+        text: Text to analyze
+        num_windows: Windows to sample (start, middle(s), end)
+        window_chars: Characters per window
+
+    Returns:
+        dict: {"language_code", "confidence", "mixed", "languages" (aggregated
+               probabilities), "windows" (per-window results)}
+
+    Raises:
+        ValueError: If text is empty or no window has detectable language
+    """
+    if not text or not text.strip():
+        raise ValueError("Text is empty or contains only whitespace")
+
+    windows = []
+    totals: Dict[str, float] = {}
+    for offset, snippet in sample_windows(text, num_windows, window_chars):
+        languages = _probabilities(snippet)
+        windows.append({"offset": offset, "length": len(snippet), "languages": languages})
+        for language in languages:
+            totals[language["lang"]] = totals.get(language["lang"], 0.0) + language["prob"]
+
+    if not totals:
+        raise ValueError("No detectable language features in text")
+
+    total = sum(totals.values())
+    aggregated = sorted(((lang, prob / total) for lang, prob in totals.items()), key=lambda item: -item[1])
+    confident_tops = {window["languages"][0]["lang"] for window in windows
+                      if window["languages"] and window["languages"][0]["prob"] >= CONFIDENT_WINDOW}
+    mixed = len(confident_tops) > 1 or (len(aggregated) > 1 and aggregated[1][1] >= MIXED_LANGUAGE_SHARE)
+
+    return {
+        "language_code": aggregated[0][0],
+        "confidence": round(aggregated[0][1], 4),
+        "mixed": mixed,
+        "languages": {lang: round(share, 4) for lang, share in aggregated},
+        "windows": windows,
+    }
+
+
+def detect_cached(text: str) -> str:
+    """
+    Language code of a text, cached by content hash ("unknown" if undetectable).
+
+    Repeated pages (headers, boilerplate, re-processed documents) are only
+    analyzed once per server process.
+    """
+    if not text or len(text.strip()) < MIN_DETECT_CHARS:
+        return "unknown"
+    key = hashlib.sha1(text.encode("utf-8", "surrogatepass")).hexdigest()
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    try:
+        language = detect_sampled(text)["language_code"]
+    except ValueError:
+        language = "unknown"
+    with _cache_lock:
+        _cache[key] = language
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return language
+
+
+def detect_many(texts: List[str], max_workers: int = DETECT_WORKERS) -> List[str]:
+    """Detect the language of each text on a thread pool, in input order."""
+    if len(texts) < 2:
+        return [detect_cached(text) for text in texts]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(detect_cached, texts))
+
+
+class PageLanguageDetector:
+    """
+    Detect page languages in the background while pages are being extracted.
+
+    Usage:
+        detector = PageLanguageDetector()
+        for page in doc:
+            text = page.get_text()
+            detector.submit(text)
+        page_languages = detector.results()
+    """
+
+    def __init__(self, max_workers: int = DETECT_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._futures = []
+
+    def submit(self, text: str) -> None:
+        self._futures.append(self._executor.submit(detect_cached, text))
+
+    def results(self) -> List[str]:
+        """Language code of every submitted page, in submission order."""
+        try:
+            return [future.result() for future in self._futures]
+        finally:
+            self._executor.shutdown(wait=False)
+
+
+def majority_language(languages: List[str], weights: Optional[List[int]] = None) -> str:
+    """Most common known language, optionally weighted (e.g. by page length)."""
+    totals: Dict[str, int] = {}
+    for i, language in enumerate(languages):
+        if language != "unknown":
+            totals[language] = totals.get(language, 0) + (weights[i] if weights else 1)
+    return max(totals, key=totals.get) if totals else "unknown"
+
+
+def group_by_language(languages: List[str]) -> "OrderedDict[str, List[int]]":
+    """Indices grouped by language, groups ordered by first appearance."""
+    groups: "OrderedDict[str, List[int]]" = OrderedDict()
+    for i, language in enumerate(languages):
+        groups.setdefault(language, []).append(i)
+    return groups
@@ -0,0 +1,179 @@
+"""
+Deferred imports and background warm-up for the MCP servers.
+
+The servers are spawned over stdio by the MCP client, which waits for
+`initialize` / `list_tools` before it can do anything else. Heavy libraries
+(torch, sentence-transformers, LangChain, PyMuPDF, google-genai) are therefore
+imported on first use through `lazy_import`, and `warm_up_lifespan` pre-loads
+them on a daemon thread while the server is already answering the handshake.
+"""
+
+import contextlib
+import importlib
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+# Seconds spent importing each module through lazy_import (first import only)
+_import_timings: Dict[str, float] = {}
+
+# Warm-up progress: step name -> {"status": ..., "seconds": ...}
+_warm_up_status: Dict[str, Dict] = {}
+_warm_up_thread: Optional[threading.Thread] = None
+
+# Dotted module names accepted by import_time_report
+_MODULE_NAME_REGEX = re.compile(r"^[A-Za-z_]\w*(\.[A-Za-z_]\w*)*$")
+
+# Child of import_time_report: imports each module named in argv (__import__
+# goes through the same import path as an import statement, which -X importtime
+# reports; importlib.import_module does not report the top-level module)
+_IMPORT_MODULES_SCRIPT = "import sys\nfor name in sys.argv[1:]:\n    __import__(name)"
+
+
+def lazy_import(module_name: str):
+    """
+    Import a module on first use and record how long the import took.
+
+    stdout is redirected to stderr during the import so that libraries which
+    print on import cannot corrupt the MCP stdio stream.
+
+    Args:
+        module_name: Dotted module name (e.g., 'fitz', 'langchain_huggingface')
+
+    Returns:
+        The imported module
+    """
+    # Only trust sys.modules once an import has completed: while the warm-up
+    # thread is still importing a module, sys.modules holds a partially
+    # initialized one, and import_module waits on the module's import lock
+    if module_name in _import_timings:
+        return sys.modules[module_name]
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stderr):
+        module = importlib.import_module(module_name)
+    _import_timings.setdefault(module_name, round(time.perf_counter() - start, 3))
+    return module
+
+
+def start_warm_up(steps: Dict[str, Callable[[], object]]) -> Optional[threading.Thread]:
+    """
+    Run the given loaders on a background daemon thread.
+
+    Each step is typically a lazy import or a cached model loader, so the first
+    real tool call finds everything already in memory. Failures are recorded
+    and otherwise ignored; the tool that needs the dependency reports the error.
+
+    Args:
+        steps: Ordered mapping of step name -> zero-argument loader
+
+    Returns:
+        The started thread, or None if a warm-up was already started
+    """
+    global _warm_up_thread
+    if _warm_up_thread is not None:
+        return None
+
+    for name in steps:
+        _warm_up_status[name] = {"status": "pending", "seconds": None}
+
+    def _run():
+        for name, loader in steps.items():
+            _warm_up_status[name]["status"] = "running"
+            start = time.perf_counter()
+            try:
+                loader()
+                _warm_up_status[name]["status"] = "done"
+            except Exception as e:
+                _warm_up_status[name]["status"] = f"failed: {str(e)}"
+            _warm_up_status[name]["seconds"] = round(time.perf_counter() - start, 3)
+            print(f"Warm-up: {name} {_warm_up_status[name]['status']} "
+                  f"({_warm_up_status[name]['seconds']}s)", file=sys.stderr)
+
+    _warm_up_thread = threading.Thread(target=_run, name="mcp-warm-up", daemon=True)
+    _warm_up_thread.start()
+    return _warm_up_thread
+
+
+def warm_up_lifespan(steps: Dict[str, Callable[[], object]]):
+    """
+    Build a FastMCP lifespan that starts the background warm-up.
+
+    The lifespan runs after the stdio transport has wrapped the real stdout, so
+    the stdout redirection in lazy_import cannot leak protocol messages to
+    stderr. Set MCP_WARM_UP=0 to disable the warm-up.
+
+    Args:
+        steps: Ordered mapping of step name -> zero-argument loader
+
+    Returns:
+        An async context manager factory suitable for FastMCP(lifespan=...)
+    """
+    @contextlib.asynccontextmanager
+    async def lifespan(server):
+        if os.getenv("MCP_WARM_UP", "1") != "0":
+            start_warm_up(steps)
+        yield {}
+
+    return lifespan
+
+
+def import_time_report(modules: List[str], top: int = 15, timeout: int = 120) -> Dict:
+    """
+    Build an `-X importtime` style report for the given modules.
+
+    The modules are imported in a fresh interpreter started with
+    `python -X importtime`, so the numbers reflect a true cold start regardless
+    of what this process has already loaded. The in-process lazy import timings
+    and warm-up progress are included alongside.
+
+    Args:
+        modules: Top-level modules to import in the child interpreter
+        top: Number of slowest imports (by cumulative time) to return
+        timeout: Seconds to wait for the child interpreter
+
+    Returns:
+        Dict with the slowest imports, per-module cumulative times, and the
+        in-process timings and warm-up status
+
+    Raises:
+        ValueError: If a name is not a dotted module name
+    """
+    invalid = [name for name in modules if not _MODULE_NAME_REGEX.match(name)]
+    if invalid:
+        raise ValueError(f"Invalid module names: {invalid}")
+    report = {
+        "in_process_imports_seconds": dict(_import_timings),
+        "warm_up": {name: dict(state) for name, state in _warm_up_status.items()},
+    }
+    if not modules:
+        return report
+
+    # Names go in argv, never into the child's source code
+    command = [sys.executable, "-X", "importtime", "-c", _IMPORT_MODULES_SCRIPT, *modules]
+    completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+
+    # Lines look like: "import time:  self [us] | cumulative | imported package"
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        entries.append({
+            "module": fields[2].strip(),
+            "self_ms": int(fields[0]) / 1000,
+            "cumulative_ms": int(fields[1]) / 1000,
+        })
+
+    cumulative = {entry["module"]: entry["cumulative_ms"] for entry in entries}
+    report["cold_import_ms"] = {name: cumulative.get(name) for name in modules}
+    report["slowest_imports"] = sorted(entries, key=lambda e: e["cumulative_ms"], reverse=True)[:top]
+    if completed.returncode != 0:
+        report["import_error"] = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "unknown error"
+    return report
@@ -0,0 +1,350 @@
+"""
+Batch execution backend for non-interactive summarization.
+
+Interactive calls send one generate_content request per chunk. For
+overnight corpus runs, summarize_pdf with execution='batch' collects the
+chunk requests of a document instead, submits them as one batch job, polls
+until it completes and maps the responses back to the chunks in request
+order. summarize_pdfs pools the chunk requests of a whole group of documents
+(BatchCollector), so a corpus run submits a few large jobs rather than one
+job per document. Batch jobs trade latency (minutes to hours) for much
+higher throughput and a separate, cheaper quota.
+
+Two backends share the same create / get / cancel interface:
+
+- GeminiBatchBackend: the Gemini Batch API (client.batches) with inline
+  requests,
+- LocalBatchBackend: an in-process stand-in with the same job states, for
+  tests and offline development (LLM_BATCH_BACKEND=local). By default it
+  answers with the first sentences of each request's text.
+
+Requests are grouped per model (a batch job has one model) and split so that
+no job exceeds BATCH_MAX_REQUESTS requests or BATCH_MAX_INLINE_BYTES of
+inline payload.
+"""
+
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+LLM_BATCH_BACKEND = os.getenv("LLM_BATCH_BACKEND", "gemini")  # 'gemini' or 'local'
+BATCH_POLL_SECONDS = float(os.getenv("BATCH_POLL_SECONDS", "30"))
+BATCH_TIMEOUT_SECONDS = float(os.getenv("BATCH_TIMEOUT_SECONDS", str(24 * 3600)))
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "1000"))
+# Inline batch requests are limited to 20 MB; larger jobs are split
+BATCH_MAX_INLINE_BYTES = int(os.getenv("BATCH_MAX_INLINE_BYTES", str(18 * 1024 * 1024)))
+# summarize_pdfs: documents whose chunk requests are pooled into shared jobs,
+# and the longest wait for more documents once a request is pooled
+BATCH_GROUP_DOCUMENTS = int(os.getenv("BATCH_GROUP_DOCUMENTS", "100"))
+BATCH_COLLECT_SECONDS = float(os.getenv("BATCH_COLLECT_SECONDS", "60"))
+
+SUCCEEDED = "JOB_STATE_SUCCEEDED"
+FINAL_STATES = (SUCCEEDED, "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED")
+
+
+class BatchCancelled(Exception):
+    """Raised when the caller cancels while batch jobs are running."""
+
+
+class GeminiBatchBackend:
+    """
+    Gemini Batch API backend.
+
+    Args:
+        client: A google.genai Client
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def create(self, model: str, requests: List[Dict], display_name: str) -> str:
+        """Submit inline requests as one batch job and return its name."""
+        inline_requests = [{
+            "contents": [{"parts": [{"text": request["user_prompt"]}], "role": "user"}],
+            "config": {
+                "system_instruction": request["system_prompt"],
+                "temperature": request.get("temperature", 0.7),
+            },
+        } for request in requests]
+        job = self.client.batches.create(model=model, src=inline_requests, config={"display_name": display_name})
+        return job.name
+
+    def get(self, name: str) -> Tuple[str, Optional[List]]:
+        """Return (state, responses); responses are texts or exceptions, in request order, once finished."""
+        job = self.client.batches.get(name=name)
+        state = job.state.name if hasattr(job.state, "name") else str(job.state)
+        if state != SUCCEEDED:
+            return state, None
+        responses = []
+        for inline_response in job.dest.inlined_responses:
+            if inline_response.response is not None:
+                responses.append(inline_response.response.text or "")
+            else:
+                responses.append(RuntimeError(f"Batch request failed: {inline_response.error}"))
+        return state, responses
+
+    def cancel(self, name: str) -> None:
+        self.client.batches.cancel(name=name)
+
+
+def _leading_sentences(request: Dict, count: int = 3) -> str:
+    """Offline stand-in answer: the first sentences of the request's input text."""
+    text = request["user_prompt"].split("\n\n", 1)[-1]
+    return " ".join(re.split(r"(?<=[.?!])\s+", text.strip())[:count])
+
+
+class LocalBatchBackend:
+    """
+    In-process stand-in for the batch service.
+
+    Jobs go through the same states as Gemini batch jobs
+    (PENDING -> RUNNING -> SUCCEEDED) on a background thread.
+
+    Args:
+        generate: Answers one request dict (default: its first sentences);
+                  an exception marks that request as failed
+        latency: Seconds a job stays pending before it runs
+    """
+
+    def __init__(self, generate: Callable[[Dict], str] = _leading_sentences, latency: float = 0.0):
+        self.generate = generate
+        self.latency = latency
+        self._jobs: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def create(self, model: str, requests: List[Dict], display_name: str) -> str:
+        name = f"batches/local-{uuid.uuid4().hex[:12]}"
+        with self._lock:
+            self._jobs[name] = {"state": "JOB_STATE_PENDING", "responses": None, "cancelled": False}
+        threading.Thread(target=self._run, args=(name, requests), daemon=True, name="local-batch").start()
+        return name
+
+    def _run(self, name: str, requests: List[Dict]) -> None:
+        time.sleep(self.latency)
+        job = self._jobs[name]
+        if job["cancelled"]:
+            return
+        job["state"] = "JOB_STATE_RUNNING"
+        responses = []
+        for request in requests:
+            try:
+                responses.append(self.generate(request))
+            except Exception as e:
+                responses.append(RuntimeError(f"Batch request failed: {str(e)}"))
+        with self._lock:
+            if not job["cancelled"]:
+                job["state"], job["responses"] = SUCCEEDED, responses
+
+    def get(self, name: str) -> Tuple[str, Optional[List]]:
+        with self._lock:
+            job = self._jobs[name]
+            return job["state"], job["responses"]
+
+    def cancel(self, name: str) -> None:
+        with self._lock:
+            self._jobs[name]["cancelled"] = True
+            self._jobs[name]["state"] = "JOB_STATE_CANCELLED"
+
+
+def _split(requests: List[Tuple[int, Dict]]) -> List[List[Tuple[int, Dict]]]:
+    """Split (position, request) pairs into jobs within the request and payload limits."""
+    jobs, current, size = [], [], 0
+    for item in requests:
+        request_size = len(item[1]["user_prompt"].encode("utf-8")) + len(item[1]["system_prompt"].encode("utf-8"))
+        if current and (len(current) >= BATCH_MAX_REQUESTS or size + request_size > BATCH_MAX_INLINE_BYTES):
+            jobs.append(current)
+            current, size = [], 0
+        current.append(item)
+        size += request_size
+    if current:
+        jobs.append(current)
+    return jobs
+
+
+def run_batch_requests(backend, requests: List[Dict], display_name: str = "summarize",
+                       poll_seconds: float = BATCH_POLL_SECONDS, timeout: float = BATCH_TIMEOUT_SECONDS,
+                       cancel_event: threading.Event = None) -> List:
+    """
+    Run requests as batch jobs and return their responses in request order.
+
+    Args:
+        backend: GeminiBatchBackend or LocalBatchBackend
+        requests: Dicts with model, system_prompt, user_prompt (and optional temperature)
+        display_name: Prefix of the batch job names
+        poll_seconds: Interval between job status checks
+        timeout: Seconds before unfinished jobs are cancelled
+        cancel_event: Set it to cancel the jobs and stop waiting
+
+    Returns:
+        list: Response text, or an exception for a failed request, per request
+
+    Raises:
+        BatchCancelled: If cancel_event is set before the jobs finish
+    """
+    responses: List = [None] * len(requests)
+    by_model = itertools.groupby(sorted(enumerate(requests), key=lambda item: item[1]["model"]),
+                                 key=lambda item: item[1]["model"])
+    jobs = {}
+    for model, items in by_model:
+        for part, job_items in enumerate(_split(list(items))):
+            name = backend.create(model, [request for _, request in job_items], f"{display_name}-{part + 1}")
+            jobs[name] = [position for position, _ in job_items]
+            print(f"Batch job {name}: {len(job_items)} requests ({model})", file=sys.stderr)
+
+    deadline = time.monotonic() + timeout
+    while jobs:
+        for name in list(jobs):
+            state, job_responses = backend.get(name)
+            if state not in FINAL_STATES:
+                continue
+            positions = jobs.pop(name)
+            if state == SUCCEEDED and job_responses is not None and len(job_responses) == len(positions):
+                for position, response in zip(positions, job_responses):
+                    responses[position] = response
+            else:
+                for position in positions:
+                    responses[position] = RuntimeError(f"Batch job {name} ended with {state}")
+            print(f"Batch job {name} finished: {state}", file=sys.stderr)
+        if not jobs:
+            break
+        cancelled = cancel_event is not None and cancel_event.is_set()
+        if cancelled or time.monotonic() > deadline:
+            for name in jobs:
+                backend.cancel(name)
+            if cancelled:
+                raise BatchCancelled("Batch jobs were cancelled")
+            for name, positions in jobs.items():
+                for position in positions:
+                    responses[position] = RuntimeError(f"Batch job {name} timed out")
+            break
+        if cancel_event is not None:
+            cancel_event.wait(poll_seconds)
+        else:
+            time.sleep(poll_seconds)
+    return responses
+
+
+class BatchCollector:
+    """
+    Pools the batch requests of many documents into shared batch jobs.
+
+    Each document hands its requests to run() and waits for the responses.
+    The pooled requests are submitted together with run_batch_requests
+    (which still splits them per model and size limit) as soon as every
+    expected document has handed in its requests or called done(), once
+    max_documents documents or max_requests requests are pooled, or
+    linger_seconds after the first request was pooled.
+
+    Args:
+        backend: GeminiBatchBackend or LocalBatchBackend
+        documents: Keys of the documents that may hand in requests
+        max_documents: Pooled documents that trigger a submission (at most the
+                       number of documents waiting at the same time)
+        max_requests: Pooled requests that trigger a submission
+        linger_seconds: Longest wait for more documents once a request is pooled
+        display_name: Prefix of the batch job names
+        **run_options: poll_seconds / timeout for run_batch_requests
+    """
+
+    def __init__(self, backend, documents: List[str], max_documents: int = BATCH_GROUP_DOCUMENTS,
+                 max_requests: int = BATCH_MAX_REQUESTS, linger_seconds: float = BATCH_COLLECT_SECONDS,
+                 display_name: str = "summarize", **run_options):
+        self.backend = backend
+        self.max_documents = max(1, max_documents)
+        self.max_requests = max(1, max_requests)
+        self.linger_seconds = linger_seconds
+        self.display_name = display_name
+        self.run_options = run_options
+        self._expected = set(documents)
+        # Pooled (requests, slot) pairs; a slot receives one document's responses
+        self._pooled: List[Tuple[List[Dict], Dict]] = []
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self.stats = {"submissions": 0, "documents": 0, "requests": 0}
+
+    def run(self, key: str, requests: List[Dict]) -> List:
+        """
+        Pool one document's requests and wait for their responses.
+
+        Returns:
+            list: Response text, or an exception for a failed request, per request
+        """
+        if not requests:
+            self.done(key)
+            return []
+        slot = {"responses": None, "event": threading.Event()}
+        with self._lock:
+            self._expected.discard(key)
+            self._pooled.append((requests, slot))
+            ready = self._take_if_ready()
+            if ready is None and self._timer is None:
+                self._timer = threading.Timer(self.linger_seconds, self._linger_expired)
+                self._timer.daemon = True
+                self._timer.start()
+        if ready is not None:
+            self._submit(ready)
+        slot["event"].wait()
+        return slot["responses"]
+
+    def done(self, key: str) -> None:
+        """Mark a document that will not hand in (more) requests."""
+        with self._lock:
+            self._expected.discard(key)
+            ready = self._take_if_ready()
+        if ready is not None:
+            self._submit(ready)
+
+    def _take_if_ready(self) -> Optional[List[Tuple[List[Dict], Dict]]]:
+        """Take the pool if it should be submitted now (the caller holds the lock)."""
+        pooled_requests = sum(len(requests) for requests, _ in self._pooled)
+        if self._pooled and (not self._expected or len(self._pooled) >= self.max_documents
+                             or pooled_requests >= self.max_requests):
+            return self._take()
+        return None
+
+    def _take(self) -> List[Tuple[List[Dict], Dict]]:
+        pooled, self._pooled = self._pooled, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return pooled
+
+    def _linger_expired(self) -> None:
+        with self._lock:
+            self._timer = None
+            pooled = self._take() if self._pooled else None
+        if pooled is not None:
+            self._submit(pooled)
+
+    def _submit(self, pooled: List[Tuple[List[Dict], Dict]]) -> None:
+        """Run the pooled requests as batch jobs on a background thread and fill the slots."""
+        requests = [request for document_requests, _ in pooled for request in document_requests]
+        with self._lock:
+            self.stats["submissions"] += 1
+            self.stats["documents"] += len(pooled)
+            self.stats["requests"] += len(requests)
+        print(f"Batch: submitting {len(requests)} requests of {len(pooled)} document(s)", file=sys.stderr)
+
+        def run():
+            try:
+                responses = run_batch_requests(self.backend, requests, display_name=self.display_name,
+                                               **self.run_options)
+            except Exception as e:
+                responses = [e] * len(requests)
+            position = 0
+            for document_requests, slot in pooled:
+                slot["responses"] = responses[position:position + len(document_requests)]
+                position += len(document_requests)
+                slot["event"].set()
+
+        threading.Thread(target=run, daemon=True, name="batch-collector").start()
+
+    def snapshot(self) -> Dict:
+        """Submissions so far and the documents and requests they covered."""
+        with self._lock:
+            return dict(self.stats)
@@ -0,0 +1,110 @@
+"""
+OCR fallback for scanned (image-only) PDF pages.
+
+Only pages without a text layer that contain images are OCRed. Each such page
+is rasterized with PyMuPDF and recognized with PyMuPDF's built-in Tesseract
+binding (`Pixmap.pdfocr_tobytes`), so everything runs offline on the CPU.
+Pages are processed in a spawned process pool (not forked: the caller is a
+multithreaded server with torch and the tokenizers loaded), and results are
+cached on disk by a hash of the page content, so re-processing a document
+skips the pages already recognized.
+
+Requires a local Tesseract installation (tessdata found via TESSDATA_PREFIX
+or the tesseract binary); without it, `ocr_available()` is False and the
+caller keeps its no-text behavior.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+from lazy_imports import lazy_import
+
+OCR_ENABLED = os.getenv("PDF_OCR", "1") != "0"
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+OCR_LANGUAGE = os.getenv("OCR_LANGUAGE", "eng")  # Tesseract language codes, e.g. "eng+fra"
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+OCR_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "ocr_cache")
+
+
+def ocr_available() -> bool:
+    """True if OCR is enabled and PyMuPDF can find Tesseract's language data."""
+    if not OCR_ENABLED:
+        return False
+    try:
+        return bool(lazy_import("fitz").get_tessdata())
+    except Exception:
+        return False
+
+
+def needs_ocr(page, page_text: str) -> bool:
+    """A page needs OCR if it has no text layer but does contain images."""
+    return not page_text.strip() and bool(page.get_images(full=False))
+
+
+def page_hash(doc, page, dpi: int = OCR_DPI, language: str = OCR_LANGUAGE) -> str:
+    """
+    Content hash of a page: its content streams and image streams plus OCR settings.
+
+    Identical scans in different files (or the same file re-uploaded) share a hash.
+    """
+    digest = hashlib.sha256(f"{dpi}:{language}:{page.rect}".encode("utf-8"))
+    digest.update(page.read_contents() or b"")
+    for image in page.get_images(full=False):
+        digest.update(doc.xref_stream_raw(image[0]) or b"")
+    return digest.hexdigest()
+
+
+def _ocr_page(pdf_path: str, page_number: int, dpi: int, language: str) -> str:
+    """Worker: rasterize one page and return its recognized text."""
+    fitz = lazy_import("fitz")
+    with fitz.open(pdf_path) as doc:
+        pixmap = doc[page_number].get_pixmap(dpi=dpi)
+    ocr_pdf = pixmap.pdfocr_tobytes(language=language)
+    with fitz.open("pdf", ocr_pdf) as ocr_doc:
+        return ocr_doc[0].get_text()
+
+
+def ocr_pages(pdf_path: str, doc, page_numbers: List[int]) -> Dict[int, str]:
+    """
+    OCR the given pages (0-based) of an open document, using the page cache.
+
+    Args:
+        pdf_path: Path of the PDF on disk (workers reopen it)
+        doc: The open fitz.Document, used to hash pages
+        page_numbers: Pages to recognize
+
+    Returns:
+        dict: {page_number: recognized text}
+    """
+    os.makedirs(OCR_CACHE_DIR, exist_ok=True)
+    results: Dict[int, str] = {}
+    pending: Dict[int, str] = {}
+    for page_number in page_numbers:
+        key = page_hash(doc, doc[page_number])
+        cache_file = os.path.join(OCR_CACHE_DIR, f"{key}.txt")
+        if os.path.exists(cache_file):
+            with open(cache_file, "r", encoding="utf-8") as f:
+                results[page_number] = f.read()
+        else:
+            pending[page_number] = cache_file
+
+    if pending:
+        print(f"OCR: recognizing {len(pending)} page(s) ({len(results)} cached) "
+              f"with {min(OCR_WORKERS, len(pending))} worker(s)...", file=sys.stderr)
+        # Forking a multithreaded process can deadlock the child on locks held by other threads
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(OCR_WORKERS, len(pending)), mp_context=context) as executor:
+            futures = {
+                page_number: executor.submit(_ocr_page, pdf_path, page_number, OCR_DPI, OCR_LANGUAGE)
+                for page_number in pending
+            }
+            for page_number, future in futures.items():
+                text = future.result()
+                results[page_number] = text
+                with open(pending[page_number], "w", encoding="utf-8") as f:
+                    f.write(text)
+    return results
@@ -0,0 +1,140 @@
+"""
+Prompt templates used by the summarization server's LLM calls.
+
+Results reference a prompt by template ID and version hash instead of echoing
+the rendered prompt (which contains the whole input text). The version changes
+whenever the template text changes, so stored results stay traceable; the
+get_prompt tool renders the full prompt on demand.
+"""
+
+import hashlib
+from typing import Dict, Optional, Tuple
+
+# Length guidelines for the summarize_text template
+LENGTH_GUIDE = {
+    "short": "in 2-3 sentences",
+    "medium": "in 1-2 paragraphs",
+    "long": "in 3-4 paragraphs with detailed key points"
+}
+
+PROMPT_TEMPLATES = {
+    "summarize_text": {
+        "system_prompt": (
+            "You are a professional text summarization assistant. "
+            "Your task is to create clear, concise, and accurate summaries. "
+            "Focus on the main ideas, key points, and essential information. "
+            "Maintain objectivity and do not add information not present in the original text."
+        ),
+        "user_template": "Please summarize the following text {length_instruction}:\n\n{text}",
+        # Follows the text when it is sent as a cached prefix (see context_cache.py)
+        "context_template": "Please summarize the text above {length_instruction}.",
+    },
+    # Non-English chunks: summarize in the source language instead of
+    # translating and summarizing in one pass
+    "summarize_text_native": {
+        "system_prompt": (
+            "You are a professional text summarization assistant. "
+            "Your task is to create clear, concise, and accurate summaries. "
+            "Focus on the main ideas, key points, and essential information. "
+            "Maintain objectivity and do not add information not present in the original text. "
+            "Write the summary in {language_name}, the language of the text; do not translate it."
+        ),
+        "user_template": "Please summarize the following {language_name} text {length_instruction}, in {language_name}:\n\n{text}",
+        "context_template": "Please summarize the {language_name} text above {length_instruction}, in {language_name}.",
+    },
+}
+
+# Names used in the native-language prompts (ISO 639-1 codes as returned by langdetect)
+LANGUAGE_NAMES = {
+    "ar": "Arabic", "de": "German", "es": "Spanish", "fr": "French", "hi": "Hindi",
+    "it": "Italian", "ja": "Japanese", "ko": "Korean", "nl": "Dutch", "pl": "Polish",
+    "pt": "Portuguese", "ru": "Russian", "sv": "Swedish", "tr": "Turkish",
+    "zh-cn": "Chinese", "zh-tw": "Chinese",
+}
+
+
+def template_for_language(language: Optional[str]) -> str:
+    """Prompt template for text in the given language (English and unknown text use the default)."""
+    if language in LANGUAGE_NAMES:
+        return "summarize_text_native"
+    return "summarize_text"
+
+
+def template_version(template_id: str) -> str:
+    """
+    Short content hash of a template (system prompt, user templates and length guide).
+
+    Raises:
+        KeyError: If the template does not exist
+    """
+    template = PROMPT_TEMPLATES[template_id]
+    digest = hashlib.sha256()
+    digest.update(template["system_prompt"].encode("utf-8"))
+    digest.update(template["user_template"].encode("utf-8"))
+    digest.update(template["context_template"].encode("utf-8"))
+    digest.update(repr(sorted(LENGTH_GUIDE.items())).encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def render_prompt(template_id: str, text: str, max_length: str = "medium",
+                  language: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Render the system and user prompts of a template.
+
+    Args:
+        template_id: Key of PROMPT_TEMPLATES
+        text: Input text inserted into the user prompt
+        max_length: 'short', 'medium', or 'long' (unknown values fall back to 'medium')
+        language: ISO 639-1 code for native-language templates
+
+    Returns:
+        tuple[str, str]: (system_prompt, user_prompt)
+    """
+    template = PROMPT_TEMPLATES[template_id]
+    language_name = LANGUAGE_NAMES.get(language, language or "the original language")
+    system_prompt = template["system_prompt"].replace("{language_name}", language_name)
+    user_prompt = template["user_template"].format(
+        length_instruction=LENGTH_GUIDE.get(max_length, LENGTH_GUIDE["medium"]),
+        language_name=language_name,
+        text=text,
+    )
+    return system_prompt, user_prompt
+
+
+def render_context_prompt(template_id: str, max_length: str = "medium",
+                          language: Optional[str] = None) -> str:
+    """
+    Render the prompt that follows a text sent as a cached prefix.
+
+    A cached prefix cannot be combined with a per-request system instruction,
+    so the system prompt leads the returned prompt.
+
+    Args:
+        template_id: Key of PROMPT_TEMPLATES
+        max_length: 'short', 'medium', or 'long' (unknown values fall back to 'medium')
+        language: ISO 639-1 code for native-language templates
+
+    Returns:
+        str: System prompt followed by the summarization instruction
+    """
+    template = PROMPT_TEMPLATES[template_id]
+    language_name = LANGUAGE_NAMES.get(language, language or "the original language")
+    system_prompt = template["system_prompt"].replace("{language_name}", language_name)
+    instruction = template["context_template"].format(
+        length_instruction=LENGTH_GUIDE.get(max_length, LENGTH_GUIDE["medium"]),
+        language_name=language_name,
+    )
+    return f"{system_prompt}\n\n{instruction}"
+
+
+def prompt_reference(template_id: str, max_length: str = "medium",
+                     language: Optional[str] = None) -> Dict[str, str]:
+    """Identify the prompt used for a result without repeating the input text."""
+    reference = {
+        "template_id": template_id,
+        "version": template_version(template_id),
+        "max_length": max_length,
+    }
+    if language and template_id != "summarize_text":
+        reference["language"] = language
+    return reference
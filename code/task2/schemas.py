@@ -0,0 +1,19 @@
+"""
+Response schemas for structured LLM output.
+
+hallucination_checker passes HallucinationJudgment as the response schema,
+so the judge answers with JSON that is validated instead of parsed from
+free text.
+"""
+
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class HallucinationJudgment(BaseModel):
+    """Structured verdict of the hallucination judge."""
+    has_hallucination: bool = Field(description="True if the summary contains information not found in or inferable from the source text")
+    confidence: str = Field(description="Confidence in the verdict: high, medium or low")
+    hallucinated_claims: List[str] = Field(description="Statements of the summary that are not supported by the source text (empty if none)")
+    explanation: str = Field(description="Detailed reasoning for the decision")
@@ -5,6 +5,7 @@ import os
 import time
 import datetime
 import threading
+from concurrent.futures import Future
 
 # Suppress stdout during imports to avoid polluting MCP protocol
 _original_stdout = sys.stdout
@@ -14,14 +15,28 @@ from dotenv import load_dotenv
 
 # FastMCP Import
 from mcp.server.fastmcp import FastMCP
-from langchain_experimental.text_splitter import SemanticChunker
-from langchain_huggingface import HuggingFaceEmbeddings
-# PDF and Language Detection Imports (lightweight)
-import fitz  # PyMuPDF
-from langdetect import detect, DetectorFactory
 
-# Gemini API Import
-from google import genai
+# Heavy imports (SentenceTransformers, PyMuPDF, langdetect, genai) are deferred
+# so initialize/list_tools are answered before they load
+from lazy_imports import lazy_import, warm_up_lifespan, import_time_report as build_import_time_report
+# server_cli.py lives in code/common, shared with the task3 server
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+from server_cli import run_server, http_app
+from artifacts import dumps, new_run_id, run_dir, save_artifact, load_artifact, text_reference, is_large
+from prompts import render_prompt, render_context_prompt, prompt_reference, template_version, template_for_language
+from chunking import FastSemanticChunker, TokenCounter, pdf_blocks, structural_chunks
+from language import detect_sampled, detect_many, PageLanguageDetector, majority_language, group_by_language
+from ocr import needs_ocr, ocr_available, ocr_pages
+from pdf_pages import parse_page_range, iter_pages, read_outline
+from vector_index import DocumentIndex, document_id, embed_chunks
+from summary_cache import SummaryCache, SUMMARY_CACHE_ENABLED, content_key, hierarchical_reduce
+from batch import LLMExecutor, expand_paths, run_batch
+from jobs import Job, JobQueue, SUCCEEDED
+from checkpoints import RunCheckpoint, latest_run, load_manifest, save_manifest
+from llm_backends import (BatchCancelled, BatchCollector, GeminiBatchBackend, LocalBatchBackend, LLM_BATCH_BACKEND,
+                          run_batch_requests)
+from context_cache import (ContextCache, GeminiContextBackend, LocalContextBackend, CONTEXT_CACHE_BACKEND,
+                           is_cache_error)
 
 # Restore stdout
 sys.stdout = _original_stdout
@@ -29,414 +44,1640 @@ sys.stdout = _original_stdout
 # --- Load Environment Variables ---
 load_dotenv()
 
-# Set seed for consistent language detection results
-DetectorFactory.seed = 0
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+_embeddings = None
+_embeddings_lock = threading.Lock()
+
+# Semantic chunker settings (sizes in tokens)
+CHUNK_BREAKPOINT_PERCENTILE = float(os.getenv("CHUNK_BREAKPOINT_PERCENTILE", "95"))
+CHUNK_BATCH_SIZE = int(os.getenv("CHUNK_BATCH_SIZE", "64"))
+CHUNK_MIN_TOKENS = int(os.getenv("CHUNK_MIN_TOKENS", "64"))
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "1500"))
+CHUNK_TOKENIZER = os.getenv("CHUNK_TOKENIZER", EMBEDDING_MODEL_NAME)
+_token_counter = TokenCounter(CHUNK_TOKENIZER)
+# 'semantic_embeddings' (embedding breakpoints) or 'structural' (PDF layout, no model)
+CHUNKING_METHODS = ("semantic_embeddings", "structural")
+DEFAULT_CHUNKING_METHOD = os.getenv("CHUNKING_METHOD", "semantic_embeddings")
+
+SUMMARY_MODEL = "gemini-2.5-flash-lite"
+# Optional per-language model routing, e.g. LANGUAGE_MODELS='{"ja": "gemini-2.5-flash"}'
+LANGUAGE_MODELS = json.loads(os.getenv("LANGUAGE_MODELS", "{}"))
+
+# One LLM executor for every tool, so single and batch runs share the rate limit
+_llm_executor = LLMExecutor()
+# Background jobs of submit_summarize_pdf
+_job_queue = JobQueue()
+# Serializes writes to the shared output/*.json files, which summarize_pdf and
+# its background jobs write together so they always describe the same document
+_output_lock = threading.Lock()
+# 'interactive' (one streamed call per chunk) or 'batch' (chunk summaries via batch jobs)
+EXECUTION_MODES = ("interactive", "batch")
+DEFAULT_EXECUTION = os.getenv("LLM_EXECUTION", "interactive")
+_batch_backend = None
+_batch_backend_lock = threading.Lock()
+# Cached document prefixes of summarize_text (see context_cache.py)
+_context_cache = None
+_context_cache_lock = threading.Lock()
+# Failed chunks are retried by a background job (CHUNK_RETRY=0 disables it)
+CHUNK_RETRY_ENABLED = os.getenv("CHUNK_RETRY", "1") != "0"
+CHUNK_RETRY_DELAY = float(os.getenv("CHUNK_RETRY_DELAY", "30"))
+CHUNK_RETRY_ATTEMPTS = int(os.getenv("CHUNK_RETRY_ATTEMPTS", "3"))
+# summarize_pdfs inlines the combined summaries of batches up to this size
+BATCH_INLINE_SUMMARIES = int(os.getenv("BATCH_INLINE_SUMMARIES", "20"))
+
+
+def _get_fitz():
+    """Return the PyMuPDF module, importing it on first use."""
+    return lazy_import("fitz")
+
+
+def _get_langdetect():
+    """Return the langdetect module, seeding it on first use for consistent results."""
+    langdetect = lazy_import("langdetect")
+    langdetect.DetectorFactory.seed = 0
+    return langdetect
+
+
+def _get_genai():
+    """Return the google.genai module, importing it on first use."""
+    return lazy_import("google.genai")
+
+
+def _get_embeddings():
+    """Load the SentenceTransformer embedding model once and reuse it across calls."""
+    global _embeddings
+    if _embeddings is None:
+        with _embeddings_lock:
+            if _embeddings is None:
+                sentence_transformers = lazy_import("sentence_transformers")
+                _embeddings = sentence_transformers.SentenceTransformer(EMBEDDING_MODEL_NAME)
+    return _embeddings
 
 
 # --- Initialize FastMCP Server ---
 print("Creating FastMCP Server instance...", file=sys.stderr)
-mcp = FastMCP("summarization-mcp-server")
+# Heavy dependencies are pre-loaded in the background once the transport is up
+mcp = FastMCP("summarization-mcp-server", lifespan=warm_up_lifespan({
+    "fitz": _get_fitz,
+    "langdetect": _get_langdetect,
+    "google.genai": _get_genai,
+    "embedding_model": _get_embeddings,
+    "tokenizer": lambda: _token_counter.method,
+}))
 
 
 # --- Define MCP Tools using FastMCP decorator ---
 
 
-@mcp.tool()
-def extract_pdf(pdf_path: str) -> str:
+def _extract_pdf_text(pdf_path: str, detect_page_languages: bool = False, pages: str = "",
+                      save_raw: bool = True) -> dict:
     """
-    Extract text content from a PDF file using PyMuPDF.
+    Extract text content from a PDF file using PyMuPDF and save the raw data file.
     
     Args:
         pdf_path: Path to the PDF file
+        detect_page_languages: Also detect each page's language, on a thread pool
+                               while the remaining pages are extracted
+        pages: 1-based page-range spec such as "1-5,10" (default: all pages);
+               only these pages are read
+        save_raw: Write output/raw_extracted_data.json (summarize_pdf writes it
+                  later, together with its summary; batch runs and index_pdf
+                  skip this shared file)
         
     Returns:
-        JSON string containing extracted_text, num_pages, and metadata
+        dict containing extracted_text, num_pages, pages (1-based numbers read),
+        page_offsets ({page, start, end} character ranges in extracted_text),
+        output_file, and ocr_texts ({page index: OCR text} for scanned pages
+        without a text layer) (plus page_languages and page_lengths if requested)
+        
+    Raises:
+        FileNotFoundError: If the PDF file doesn't exist
+        ValueError: If the PDF is empty, the page range is invalid, or there is no extractable text
     """
-    print(f"MCP Server: Received extract_pdf request for: {pdf_path}", file=sys.stderr)
+    # Open the PDF file
+    doc = _get_fitz().open(pdf_path)
+    num_pages = len(doc)
+    
+    # Check if PDF is empty (0 pages)
+    if num_pages == 0:
+        doc.close()
+        raise ValueError("PDF file is empty (0 pages)")
     try:
-        # Open the PDF file
-        doc = fitz.open(pdf_path)
-        num_pages = len(doc)
-        
-        # Check if PDF is empty (0 pages)
-        if num_pages == 0:
-            doc.close()
-            return json.dumps({"error": "PDF file is empty (0 pages)"})
-        
-        # Extract text from all pages
-        text = ""
-        for page_num in range(num_pages):
-            page = doc[page_num]
-            text += page.get_text()
-        
-        # Close the document
+        selected_pages = parse_page_range(pages, num_pages)
+    except ValueError:
         doc.close()
+        raise
+    
+    # Extract text from the selected pages, one page at a time
+    page_texts = []
+    scanned_pages = []
+    page_detector = PageLanguageDetector() if detect_page_languages else None
+    for position, page_data in enumerate(iter_pages(doc, selected_pages)):
+        page_text = page_data["text"]
+        page_texts.append(page_text)
+        if needs_ocr(doc[selected_pages[position]], page_text):
+            scanned_pages.append(selected_pages[position])
+        if page_detector:
+            page_detector.submit(page_text)
+    
+    # OCR only the pages without a text layer (scans), in a process pool
+    ocr_texts = {}
+    if scanned_pages:
+        if ocr_available():
+            ocr_texts = ocr_pages(pdf_path, doc, scanned_pages)
+            for page_num, page_text in ocr_texts.items():
+                page_texts[selected_pages.index(page_num)] = page_text
+        else:
+            print(f"MCP Server: {len(scanned_pages)} page(s) have no text layer; OCR skipped "
+                  f"(Tesseract not found or PDF_OCR=0)", file=sys.stderr)
+    text = "".join(page_texts)
+    
+    # Close the document
+    doc.close()
+    page_languages = page_detector.results() if page_detector else None
+    page_lengths = [len(page_text) for page_text in page_texts]
+    if page_languages is not None and ocr_texts:
+        ocr_languages = detect_many(list(ocr_texts.values()))
+        for page_num, page_language in zip(ocr_texts, ocr_languages):
+            page_languages[selected_pages.index(page_num)] = page_language
+    
+    # Check if PDF has no extractable text
+    extracted_text = text.strip()
+    if not extracted_text:
+        if len(selected_pages) < num_pages:
+            raise ValueError(f"Pages {pages} of the PDF have no extractable text (might be scanned images; OCR needs a local Tesseract install)")
+        raise ValueError(f"PDF has {num_pages} page(s) but no extractable text (might be scanned images, binary data, or images without OCR; OCR needs a local Tesseract install)")
+    
+    print(f"MCP Server: Extracted {len(extracted_text)} chars from {len(selected_pages)} of {num_pages} pages", file=sys.stderr)
+    
+    # Page offsets index into extracted_text, i.e. after leading whitespace is stripped
+    leading = len(text) - len(text.lstrip())
+    page_offsets = []
+    offset = 0
+    for page_num, page_text in zip(selected_pages, page_texts):
+        start = min(max(offset - leading, 0), len(extracted_text))
+        end = min(max(offset + len(page_text) - leading, 0), len(extracted_text))
+        page_offsets.append({"page": page_num + 1, "start": start, "end": end})
+        offset += len(page_text)
+    
+    result = {
+        "extracted_text": extracted_text,
+        "num_pages": num_pages,
+        "pages": [page_num + 1 for page_num in selected_pages],
+        "page_offsets": page_offsets,
+        "output_file": None,
+        "ocr_texts": ocr_texts
+    }
+    if page_languages is not None:
+        result["page_languages"] = page_languages
+        result["page_lengths"] = page_lengths
+    
+    # Save extracted data to JSON file
+    if save_raw:
+        with _output_lock:
+            result["output_file"] = _save_raw_data(pdf_path, result)
+    return result
+
+
+def _save_raw_data(pdf_path: str, extract_result: dict) -> str:
+    """Write output/raw_extracted_data.json (the caller holds _output_lock) and return its path."""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    output_dir = os.path.join(script_dir, "output")
+    os.makedirs(output_dir, exist_ok=True)
+    
+    raw_data = {
+        "pdf_path": pdf_path,
+        "extracted_text": extract_result["extracted_text"],
+        "num_pages": extract_result["num_pages"],
+        "pages": extract_result["pages"],
+        "ocr_pages": [page_num + 1 for page_num in extract_result["ocr_texts"]],
+        "extraction_timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+    }
+    
+    output_path = os.path.join(output_dir, "raw_extracted_data.json")
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(raw_data, f, indent=2, ensure_ascii=False)
+    return output_path
+
+
+@mcp.tool()
+def extract_pdf(pdf_path: str, pages: str = "") -> str:
+    """
+    Extract text content from a PDF file using PyMuPDF.
+    
+    Large texts are not inlined: the result then carries `extracted_text_ref`
+    (run_id, length, preview) and the text can be paged with get_text(run_id, offset, length).
+    For large PDFs, call get_pdf_outline first and extract only the pages needed.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        pages: 1-based page range such as "1-5,10,20-" (default: all pages)
         
-        # Check if PDF has no extractable text
-        extracted_text = text.strip()
-        if not extracted_text:
-            return json.dumps({
-                "error": f"PDF has {num_pages} page(s) but no extractable text (might be scanned images, binary data, or images without OCR)"
-            })
-        
-        # Save extracted data to JSON file
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        output_dir = os.path.join(script_dir, "output")
-        os.makedirs(output_dir, exist_ok=True)
+    Returns:
+        JSON string containing extracted_text (or extracted_text_ref), num_pages,
+        pages, page_offsets ({page, start, end} ranges in the text), and metadata
+    """
+    print(f"MCP Server: Received extract_pdf request for: {pdf_path}" + (f" (pages {pages})" if pages else ""), file=sys.stderr)
+    try:
+        result = _extract_pdf_text(pdf_path, pages=pages)
+        # OCR text is already part of extracted_text; report which pages it came from
+        result["ocr_pages"] = [page_num + 1 for page_num in result.pop("ocr_texts")]
         
-        raw_data = {
-            "pdf_path": pdf_path,
-            "extracted_text": extracted_text,
-            "num_pages": num_pages,
-            "extraction_timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
-        }
+        extracted_text = result["extracted_text"]
+        if is_large(extracted_text):
+            run_id = new_run_id()
+            save_artifact(run_id, "extracted_text", {"pdf_path": pdf_path, "text": extracted_text})
+            del result["extracted_text"]
+            result["extracted_text_ref"] = text_reference(
+                run_id, "extracted_text", extracted_text, "get_text(run_id, offset, length)"
+            )
         
-        output_path = os.path.join(output_dir, "raw_extracted_data.json")
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(raw_data, f, indent=2, ensure_ascii=False)
+        return dumps(result)
         
-        print(f"MCP Server: Extracted {len(extracted_text)} chars from {num_pages} pages", file=sys.stderr)
+    except FileNotFoundError:
+        return dumps({"error": f"PDF file not found: {pdf_path}"})
+    except ValueError as e:
+        return dumps({"error": str(e)})
+    except Exception as e:
+        return dumps({"error": f"Error extracting PDF: {str(e)}"})
+
+
+@mcp.tool()
+def get_pdf_outline(pdf_path: str) -> str:
+    """
+    Get a PDF's page count and table of contents without extracting any text.
+    
+    Fast even for very large PDFs. Use the page numbers of the relevant entries
+    with extract_pdf(pdf_path, pages="...") to read only those pages.
+    
+    Args:
+        pdf_path: Path to the PDF file
         
-        return json.dumps({
-            "extracted_text": extracted_text,
-            "num_pages": num_pages,
-            "output_file": output_path
-        }, indent=2)
+    Returns:
+        JSON string containing num_pages, has_outline, outline ({level, title,
+        page, end_page} per entry), and document metadata (title, author, ...)
+    """
+    print(f"MCP Server: Received get_pdf_outline request for: {pdf_path}", file=sys.stderr)
+    try:
+        doc = _get_fitz().open(pdf_path)
+        try:
+            outline = read_outline(doc)
+            result = {
+                "num_pages": len(doc),
+                "has_outline": bool(outline),
+                "outline": outline,
+                "metadata": {key: value for key, value in (doc.metadata or {}).items() if value},
+            }
+        finally:
+            doc.close()
+        if not outline:
+            result["note"] = "The PDF has no outline; use extract_pdf with a small page range to inspect it"
+        return dumps(result)
         
     except FileNotFoundError:
-        return json.dumps({"error": f"PDF file not found: {pdf_path}"})
+        return dumps({"error": f"PDF file not found: {pdf_path}"})
     except Exception as e:
-        return json.dumps({"error": f"Error extracting PDF: {str(e)}"})
+        return dumps({"error": f"Error reading PDF outline: {str(e)}"})
 
 
 @mcp.tool()
-def detect_language(text: str) -> str:
+def detect_language(text: str, mode: str = "sampled") -> str:
     """
     Detect the language of the given text using langdetect.
     
     Args:
         text: Text to detect language for
+        mode: 'sampled' (default) analyzes windows from the start, middle and end
+              and reports per-window confidence and mixed-language documents;
+              'full' runs langdetect on the whole text
         
     Returns:
         JSON string containing the ISO 639-1 language code (e.g., 'en', 'fr', 'es')
     """
-    print(f"MCP Server: Received detect_language request", file=sys.stderr)
+    print(f"MCP Server: Received detect_language request (mode={mode})", file=sys.stderr)
     try:
         if not text or not text.strip():
-            return json.dumps({"error": "Text is empty or contains only whitespace"})
+            return dumps({"error": "Text is empty or contains only whitespace"})
         
         # Detect language
-        language_code = detect(text)
+        if mode == "full":
+            result = {"language_code": _get_langdetect().detect(text)}
+        else:
+            result = detect_sampled(text)
         
-        print(f"MCP Server: Detected language: {language_code}", file=sys.stderr)
-        return json.dumps({
-            "language_code": language_code,
+        print(f"MCP Server: Detected language: {result['language_code']}", file=sys.stderr)
+        return dumps({
+            **result,
+            "mode": "full" if mode == "full" else "sampled",
             "text_length": len(text)
-        }, indent=2)
+        })
         
     except Exception as e:
-        return json.dumps({"error": f"Error detecting language: {str(e)}"})
+        return dumps({"error": f"Error detecting language: {str(e)}"})
 
 
-@mcp.tool()
-def summarize_text(text: str, max_length: str = "medium") -> str:
+def _summarize_text(text: str, max_length: str = "medium", include_prompt: bool = False,
+                    language: str = None, cache_context: bool = False) -> dict:
     """
     Summarize text using Gemini LLM.
     
     Args:
         text: Text to summarize
         max_length: Desired summary length - 'short', 'medium', or 'long'
+        include_prompt: Return the full rendered prompts instead of a template reference
+        language: Known language of the text; non-English text gets a native-language
+                  prompt template and, if configured, a language-specific model
+        cache_context: Send a long text as a cached prefix that later calls on the
+                       same text and model reuse (needs CONTEXT_CACHE_BACKEND)
         
     Returns:
-        JSON string containing summary, prompts used, and metadata
-    """
-    print(f"MCP Server: Received summarize_text request (max_length={max_length})", file=sys.stderr)
-    try:
-        # Validate input
-        if not text or not text.strip():
-            return json.dumps({"error": "Text is empty or contains only whitespace"})
+        dict containing summary, prompt (reference or full prompts), and metadata
         
-        # Define length guidelines
-        length_guide = {
-            "short": "in 2-3 sentences",
-            "medium": "in 1-2 paragraphs",
-            "long": "in 3-4 paragraphs with detailed key points"
+    Raises:
+        ValueError: If text is empty or the API key is missing
+        RuntimeError: If the LLM call fails or the rate limit persists after retries
+    """
+    request = _summary_request(text, max_length, language)
+    system_prompt, user_prompt, model_name = request["system_prompt"], request["user_prompt"], request["model"]
+    client = _get_genai().Client(api_key=_api_key())
+    context_cache = _get_context_cache() if cache_context else None
+    cached = None
+    
+    # Retry logic for rate limiting
+    max_retries = 3
+    retry_delay = 30  # seconds
+    summary = None
+    
+    for attempt in range(max_retries):
+        if context_cache is not None and cached is None:
+            cached = context_cache.request(
+                model_name, text,
+                render_context_prompt(request["template_id"], max_length, language),
+                display_name="summarize_text"
+            )
+        try:
+            if cached is not None:
+                contents = cached["contents"]
+                config = {**cached["config"], 'temperature': 0.7}
+            else:
+                contents = user_prompt
+                config = {
+                    'system_instruction': system_prompt,
+                    'temperature': 0.7,
+                }
+            # Use streaming for real-time feedback in terminal
+            response = client.models.generate_content_stream(
+                model=model_name,
+                contents=contents,
+                config=config
+            )
+            
+            full_summary = []
+            sys.stderr.write("\n[STREAMING SUMMARY]: ")
+            sys.stderr.flush()
+            
+            for chunk in response:
+                if chunk.text:
+                    text_chunk = chunk.text
+                    full_summary.append(text_chunk)
+                    
+                    # Print word by word for natural pacing
+                    words = text_chunk.split(' ')
+                    for i, word in enumerate(words):
+                        sys.stderr.write(word + (" " if i < len(words) - 1 else ""))
+                        sys.stderr.flush()
+                        time.sleep(0.05) # Slightly faster for MCP
+            
+            sys.stderr.write("\n[STREAMING COMPLETE]\n")
+            sys.stderr.flush()
+            
+            summary = "".join(full_summary).strip()
+            break  # Success, exit retry loop
+            
+        except Exception as e:
+            if cached is not None and is_cache_error(e) and attempt < max_retries - 1:
+                # The cache expired or was deleted: drop it and send the text inline
+                print(f"Context cache {cached['cache']} unavailable, retrying without it", file=sys.stderr)
+                context_cache.invalidate(model_name, text)
+                context_cache, cached = None, None
+            elif "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e):
+                if attempt < max_retries - 1:
+                    wait_time = retry_delay * (2 ** attempt)  # Exponential backoff
+                    print(f"Rate limit hit. Waiting {wait_time} seconds before retry {attempt + 2}/{max_retries}...", file=sys.stderr)
+                    time.sleep(wait_time)
+                else:
+                    raise RuntimeError(f"Rate limit exceeded after {max_retries} retries")
+            else:
+                raise RuntimeError(f"LLM API error: {str(e)}")
+    
+    print(f"MCP Server: Summarized {len(text)} chars to {len(summary)} chars", file=sys.stderr)
+    result = _summary_result(text, summary, request, include_prompt)
+    if cached is not None:
+        result["metadata"]["context_cache"] = {"cache": cached["cache"], "hit": cached["hit"]}
+    return result
+
+
+def _api_key() -> str:
+    """Return GOOGLE_API_KEY or raise ValueError."""
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        raise ValueError("GOOGLE_API_KEY not found in environment variables")
+    return api_key
+
+
+def _summary_request(text: str, max_length: str, language: str = None) -> dict:
+    """
+    Render the prompts and pick the model for one summary request.
+    
+    Raises:
+        ValueError: If text is empty
+    """
+    # Validate input
+    if not text or not text.strip():
+        raise ValueError("Text is empty or contains only whitespace")
+    
+    # Create system and user prompts
+    template_id = template_for_language(language)
+    system_prompt, user_prompt = render_prompt(template_id, text, max_length, language)
+    return {
+        "template_id": template_id,
+        "max_length": max_length,
+        "language": language,
+        "model": LANGUAGE_MODELS.get(language, SUMMARY_MODEL),
+        "system_prompt": system_prompt,
+        "user_prompt": user_prompt,
+        "temperature": 0.7
+    }
+
+
+def _summary_result(text: str, summary: str, request: dict, include_prompt: bool = False) -> dict:
+    """Package a summary the way summarize_text returns it."""
+    # The rendered user prompt repeats the whole input, so by default only a reference is returned
+    if include_prompt:
+        prompt = {"system_prompt": request["system_prompt"], "user_prompt": request["user_prompt"]}
+    else:
+        prompt = prompt_reference(request["template_id"], request["max_length"], request["language"])
+    
+    # Prepare structured response
+    return {
+        "summary": summary,
+        "prompt": prompt,
+        "metadata": {
+            "input_length": len(text),
+            "summary_length": len(summary),
+            "model": request["model"],
+            "max_length": request["max_length"],
+            "timestamp": datetime.datetime.now().isoformat()
         }
+    }
+
+
+def _get_context_cache():
+    """Return the context cache selected by CONTEXT_CACHE_BACKEND (None if 'off'), created on first use."""
+    global _context_cache
+    if CONTEXT_CACHE_BACKEND == "off":
+        return None
+    with _context_cache_lock:
+        if _context_cache is None:
+            if CONTEXT_CACHE_BACKEND == "local":
+                _context_cache = ContextCache(LocalContextBackend())
+            else:
+                _context_cache = ContextCache(GeminiContextBackend(_get_genai().Client(api_key=_api_key())))
+    return _context_cache
+
+
+def _get_batch_backend():
+    """Return the batch backend selected by LLM_BATCH_BACKEND, created on first use."""
+    global _batch_backend
+    with _batch_backend_lock:
+        if _batch_backend is None:
+            if LLM_BATCH_BACKEND == "local":
+                _batch_backend = LocalBatchBackend()
+            else:
+                _batch_backend = GeminiBatchBackend(_get_genai().Client(api_key=_api_key()))
+    return _batch_backend
+
+
+def _summarize_texts_batch(texts: list, max_length: str = "medium", languages: list = None,
+                           cancel_event: threading.Event = None, include_prompt: bool = False,
+                           collector: BatchCollector = None, collector_key: str = None) -> list:
+    """
+    Summarize many texts through one batch job per model instead of one call each.
+    
+    Args:
+        texts: Texts to summarize
+        max_length: Desired summary length for every text
+        languages: Known language per text (None entries use the default template)
+        cancel_event: Set it to cancel the batch jobs
+        include_prompt: Return the full rendered prompts instead of a template reference
+        collector: Pool the requests with other documents' (summarize_pdfs) instead
+                   of submitting them alone; cancel_event does not apply then
+        collector_key: Key of the document in the collector
         
-        # Create system and user prompts
-        system_prompt = (
-            "You are a professional text summarization assistant. "
-            "Your task is to create clear, concise, and accurate summaries. "
-            "Focus on the main ideas, key points, and essential information. "
-            "Maintain objectivity and do not add information not present in the original text."
-        )
+    Returns:
+        list: summarize_text-style result dict, or the exception of a failed request, per text
+        
+    Raises:
+        BatchCancelled: If cancel_event is set before the jobs finish
+    """
+    languages = languages or [None] * len(texts)
+    requests = [_summary_request(text, max_length, language) for text, language in zip(texts, languages)]
+    if collector is not None:
+        responses = collector.run(collector_key, requests)
+    else:
+        responses = run_batch_requests(_get_batch_backend(), requests, display_name=f"summarize-{max_length}",
+                                       cancel_event=cancel_event)
+    results = []
+    for text, request, response in zip(texts, requests, responses):
+        if isinstance(response, Exception):
+            results.append(response)
+        else:
+            results.append(_summary_result(text, response.strip(), request, include_prompt))
+    print(f"MCP Server: Batch-summarized {len(texts)} texts", file=sys.stderr)
+    return results
+
+
+@mcp.tool()
+def summarize_text(text: str, max_length: str = "medium", include_prompt: bool = True,
+                   cache_context: bool = False, execution: str = "interactive") -> str:
+    """
+    Summarize text using Gemini LLM.
+    
+    Args:
+        text: Text to summarize
+        max_length: Desired summary length - 'short', 'medium', or 'long'
+        include_prompt: Include the full system/user prompts (the user prompt repeats the input);
+                        pass false to get a template_id/version reference instead (see get_prompt)
+        cache_context: Send a long text as a cached prefix, so summarizing the same text
+                       again does not resend it (metadata.context_cache); only worth it
+                       when the text will be summarized more than once
+        execution: 'interactive' (default), or 'batch': the text is summarized by a
+                   batch job, which can take hours, so a background job_id is returned
+                   instead (poll get_job_status, read get_job_result)
+        
+    Returns:
+        JSON string containing summary, prompts used (or a prompt reference), and metadata,
+        or job_id and status for execution='batch'
+    """
+    print(f"MCP Server: Received summarize_text request (max_length={max_length}, execution={execution})", file=sys.stderr)
+    if execution not in EXECUTION_MODES:
+        return dumps({"error": f"Unknown execution '{execution}', expected one of {list(EXECUTION_MODES)}"})
+    try:
+        if execution == "batch":
+            _summary_request(text, max_length)  # Reject empty text now rather than in the job
+            
+            def run(job: Job) -> dict:
+                _report(job, stage="summarizing", chunks_total=1)
+                try:
+                    result = _summarize_texts_batch([text], max_length, cancel_event=job.cancel_event,
+                                                    include_prompt=include_prompt)[0]
+                except BatchCancelled:
+                    job.check_cancelled()
+                    raise
+                if isinstance(result, Exception):
+                    raise result
+                _report(job, chunks_done=1)
+                return result
+            
+            job = _job_queue.submit("summarize_text", {"max_length": max_length, "text_length": len(text)}, run)
+            return dumps({"job_id": job.job_id, "status": job.status, "poll_with": "get_job_status(job_id)"})
+        return dumps(_summarize_text(text, max_length, include_prompt=include_prompt,
+                                     cache_context=cache_context))
+    except (ValueError, RuntimeError) as e:
+        return dumps({"error": str(e)})
+    except Exception as e:
+        return dumps({"error": f"Error during text summarization: {str(e)}"})
+
+
+@mcp.tool()
+def get_prompt(template_id: str = "summarize_text", max_length: str = "medium", text: str = "", language: str = "") -> str:
+    """
+    Debug tool: render the full prompt behind a prompt reference.
+    
+    Args:
+        template_id: template_id from a result's prompt reference
+        max_length: max_length from the prompt reference
+        text: Optional input text; if empty, a '{text}' placeholder is shown
+        language: language from the prompt reference (native-language templates)
         
-        user_prompt = (
-            f"Please summarize the following text {length_guide.get(max_length, length_guide['medium'])}:\n\n"
-            f"{text}"
+    Returns:
+        JSON string containing template_id, version, system_prompt, and user_prompt
+    """
+    print(f"MCP Server: Received get_prompt request for: {template_id}", file=sys.stderr)
+    try:
+        system_prompt, user_prompt = render_prompt(template_id, text or "{text}", max_length, language or None)
+        return dumps({
+            "template_id": template_id,
+            "version": template_version(template_id),
+            "system_prompt": system_prompt,
+            "user_prompt": user_prompt
+        })
+    except KeyError:
+        return dumps({"error": f"Unknown prompt template: {template_id}"})
+    except Exception as e:
+        return dumps({"error": f"Error rendering prompt: {str(e)}"})
+
+
+def _chunk_pdf(pdf_path: str, extract_result: dict, chunking_method: str) -> tuple:
+    """
+    Chunk an extracted PDF with the given chunking method.
+    
+    Returns:
+        tuple: (chunks, chunk_pages or None, chunk embeddings or None); structural
+        chunks have pages but no embeddings, semantic chunks the reverse
+    """
+    if chunking_method == "structural":
+        # Chunk along the PDF layout (headings, paragraphs, pages) - no embeddings
+        print(f"Performing structural chunking from PDF blocks...", file=sys.stderr)
+        doc = _get_fitz().open(pdf_path)
+        try:
+            blocks = pdf_blocks(doc, ocr_texts=extract_result["ocr_texts"])
+        finally:
+            doc.close()
+        structural = structural_chunks(
+            blocks,
+            max_size=CHUNK_MAX_TOKENS,
+            min_size=CHUNK_MIN_TOKENS,
+            length_function=_token_counter
         )
+        return [chunk["text"] for chunk in structural], [chunk["pages"] for chunk in structural], None
+    
+    # Perform semantic chunking using embeddings (FREE HuggingFace model)
+    print(f"Performing semantic chunking with embeddings...", file=sys.stderr)
+    print("Loading embedding model (already warm unless the server just started)...", file=sys.stderr)
+    
+    # Create semantic chunker that groups similar content together
+    # (percentile breakpoints, batched normalized embeddings, bounded chunk sizes)
+    text_splitter = FastSemanticChunker(
+        model=_get_embeddings(),
+        breakpoint_percentile=CHUNK_BREAKPOINT_PERCENTILE,
+        batch_size=CHUNK_BATCH_SIZE,
+        min_chunk_size=CHUNK_MIN_TOKENS,
+        max_chunk_size=CHUNK_MAX_TOKENS,
+        length_function=_token_counter
+    )
+    
+    # Split text into semantic chunks; the sentence embeddings are pooled per chunk for the search index
+    chunks, chunk_vectors = text_splitter.split_text_with_embeddings(extract_result["extracted_text"])
+    return chunks, None, chunk_vectors
+
+
+def _encode(texts: list):
+    """Normalized embeddings of texts with the shared embedding model."""
+    return _get_embeddings().encode(texts, batch_size=CHUNK_BATCH_SIZE, normalize_embeddings=True,
+                                    convert_to_numpy=True, show_progress_bar=False)
+
+
+def _index_document(doc_id: str, pdf_path: str, chunks: list, chunk_info: list,
+                    chunk_vectors=None, chunking_method: str = "") -> str:
+    """
+    Build and save the search index of a chunked document.
+    
+    Chunks without precomputed embeddings (structural chunking) are embedded
+    from their sentences.
+    
+    Returns:
+        Directory of the saved index
+    """
+    if chunk_vectors is None:
+        print(f"Embedding {len(chunks)} chunks for the search index...", file=sys.stderr)
+        chunk_vectors = embed_chunks(_encode, chunks)
+    metadata = [{key: info[key] for key in ("pages", "language", "tokens") if key in info} for info in chunk_info]
+    index = DocumentIndex(doc_id, chunk_vectors, chunks, metadata, info={
+        "pdf_path": pdf_path,
+        "chunking_method": chunking_method,
+        "embedding_model": EMBEDDING_MODEL_NAME,
+        "indexed_at": datetime.datetime.now().isoformat()
+    })
+    path = index.save()
+    print(f"✓ Indexed {len(chunks)} chunks as doc_id {doc_id}", file=sys.stderr)
+    return path
+
+
+def _report(job: Job, **fields) -> None:
+    """Record progress fields on a job (no-op for synchronous calls)."""
+    if job is not None:
+        _job_queue.update(job, **fields)
+
+
+def _compact_summary(result: dict) -> dict:
+    """Replace the inline chunk summaries of a summary result by a get_chunk reference."""
+    chunk_summaries = result.pop("chunk_summaries")
+    result["failed_chunks"] = [
+        s["chunk_number"] for s in chunk_summaries if s["summary"].startswith("Error:")
+    ]
+    result["chunk_summaries_ref"] = {
+        "run_id": result["run_id"],
+        "count": len(chunk_summaries),
+        "fetch_with": "get_chunk(run_id, n)"
+    }
+    return result
+
+
+def _summarize_document(pdf_path: str, extract_result: dict, chunking_method: str,
+                        reuse_summaries: bool = True, save_outputs: bool = True, job: Job = None,
+                        resume_run_id: str = None, retry_failed: bool = CHUNK_RETRY_ENABLED,
+                        execution: str = "interactive", batch_collector: BatchCollector = None) -> dict:
+    """
+    Chunk, index and summarize one extracted PDF (steps 2-8 of summarize_pdf).
+    
+    Shared by summarize_pdf and summarize_pdfs; every LLM call goes through the
+    shared LLM executor, so concurrent documents respect one rate limit.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        extract_result: Result of _extract_pdf_text with page languages
+        chunking_method: 'semantic_embeddings' or 'structural'
+        reuse_summaries: Reuse cached summaries of unchanged chunks
+        save_outputs: Also write the shared output/*.json files, all together
+                      once the summary is complete (batch runs only keep the
+                      per-run artifacts)
+        job: Job of submit_summarize_pdf, which receives the progress and
+             partial summaries and is checked for cancellation
+        resume_run_id: Continue this run: chunks with a checkpoint entry are not
+                       summarized again (see _resolve_resume)
+        retry_failed: Schedule a background job that retries failed chunks
+        execution: 'interactive' summarizes chunks with concurrent calls; 'batch'
+                   submits them as batch jobs and waits for the results (the
+                   reduce step stays interactive)
+        batch_collector: With execution='batch', pool the chunk requests with the
+                         other documents of summarize_pdfs (keyed by pdf_path)
         
-        # Get API key
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            return json.dumps({"error": "GOOGLE_API_KEY not found in environment variables"})
-        
-        client = genai.Client(api_key=api_key)
-        
-        # Retry logic for rate limiting
-        max_retries = 3
-        retry_delay = 30  # seconds
-        summary = None
-        model_name = "gemini-2.5-flash-lite"
-        
-        for attempt in range(max_retries):
-            try:
-                # Use streaming for real-time feedback in terminal
-                response = client.models.generate_content_stream(
-                    model=model_name,
-                    contents=user_prompt,
-                    config={
-                        'system_instruction': system_prompt,
-                        'temperature': 0.7,
-                    }
-                )
-                
-                full_summary = []
-                sys.stderr.write("\n[STREAMING SUMMARY]: ")
-                sys.stderr.flush()
-                
-                for chunk in response:
-                    if chunk.text:
-                        text_chunk = chunk.text
-                        full_summary.append(text_chunk)
-                        
-                        # Print word by word for natural pacing
-                        words = text_chunk.split(' ')
-                        for i, word in enumerate(words):
-                            sys.stderr.write(word + (" " if i < len(words) - 1 else ""))
-                            sys.stderr.flush()
-                            time.sleep(0.05) # Slightly faster for MCP
-                
-                sys.stderr.write("\n[STREAMING COMPLETE]\n")
-                sys.stderr.flush()
-                
-                summary = "".join(full_summary).strip()
-                break  # Success, exit retry loop
-                
-            except Exception as e:
-                if "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e):
-                    if attempt < max_retries - 1:
-                        wait_time = retry_delay * (2 ** attempt)  # Exponential backoff
-                        print(f"Rate limit hit. Waiting {wait_time} seconds before retry {attempt + 2}/{max_retries}...", file=sys.stderr)
-                        time.sleep(wait_time)
-                    else:
-                        return json.dumps({"error": f"Rate limit exceeded after {max_retries} retries"})
-                else:
-                    return json.dumps({"error": f"LLM API error: {str(e)}"})
+    Returns:
+        dict: The full summary result with run_id, doc_id and output_files
         
-        # Prepare structured response
-        result = {
-            "summary": summary,
-            "prompt": {
-                "system_prompt": system_prompt,
-                "user_prompt": user_prompt
-            },
-            "metadata": {
-                "input_length": len(text),
-                "summary_length": len(summary),
-                "model": model_name,
-                "max_length": max_length,
-                "timestamp": datetime.datetime.now().isoformat()
-            }
+    Raises:
+        JobCancelled: If job is cancelled before the summary is complete
+    """
+    # Determine output directory (relative to this script)
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    output_dir = os.path.join(script_dir, "output")
+    
+    # Create output directory if it doesn't exist
+    os.makedirs(output_dir, exist_ok=True)
+    
+    extracted_text = extract_result["extracted_text"]
+    num_pages = extract_result["num_pages"]
+    print(f"✓ Extracted {len(extracted_text)} characters from {num_pages} pages", file=sys.stderr)
+    
+    # Large bodies are kept as run artifacts instead of being returned inline
+    run_id = resume_run_id or new_run_id()
+    save_artifact(run_id, "extracted_text", {"pdf_path": pdf_path, "text": extracted_text})
+    _report(job, stage="chunking", run_id=run_id)
+    # Every finished chunk summary is checkpointed, so a failed or interrupted run can be resumed
+    checkpoint = RunCheckpoint(run_id)
+    checkpointed_summaries = checkpoint.load() if resume_run_id else {}
+    
+    # Step 2: Detect language
+    try:
+        language_result = detect_sampled(extracted_text)
+        language = language_result["language_code"]
+        mixed_language = language_result["mixed"]
+    except Exception:
+        language = "unknown"
+        mixed_language = False
+    # Page languages were detected in the background during extraction
+    page_languages = extract_result["page_languages"]
+    page_lengths = extract_result["page_lengths"]
+    page_language_counts = {}
+    for page_language in page_languages:
+        page_language_counts[page_language] = page_language_counts.get(page_language, 0) + 1
+    mixed_language = mixed_language or len(set(page_languages) - {"unknown"}) > 1
+    print(f"✓ Detected language: {language}" + (" (mixed-language document)" if mixed_language else ""), file=sys.stderr)
+    
+    # Step 3: Chunk the document (semantic chunks come with their embeddings)
+    chunks, chunk_pages, chunk_vectors = _chunk_pdf(pdf_path, extract_result, chunking_method)
+    
+    # Step 4: Prepare results
+    chunk_tokens = _token_counter.count_batch(chunks)
+    if chunk_pages:
+        # Structural chunks know their pages: reuse the page languages
+        chunk_languages = [
+            majority_language(page_languages[first - 1:last], page_lengths[first - 1:last])
+            for first, last in chunk_pages
+        ]
+    elif len(set(page_languages) - {"unknown"}) > 1:
+        chunk_languages = detect_many(chunks)
+    else:
+        # Single-language document: no need to analyze every chunk
+        chunk_languages = [language] * len(chunks)
+    chunk_info = []
+    for i, (chunk, tokens) in enumerate(zip(chunks, chunk_tokens), 1):
+        info = {
+            "chunk_number": i,
+            "length": len(chunk),
+            "tokens": tokens,
+            "language": chunk_languages[i - 1],
+            "preview": chunk[:100] + "..." if len(chunk) > 100 else chunk
+        }
+        if chunk_pages:
+            info["pages"] = chunk_pages[i - 1]
+        chunk_info.append(info)
+    
+    result = {
+        "pdf_path": pdf_path,
+        "num_pages": num_pages,
+        "language": language,
+        "mixed_language": mixed_language,
+        "total_characters": len(extracted_text),
+        "num_chunks": len(chunks),
+        "chunks": chunks,
+        "chunk_info": chunk_info,
+        "chunking_method": chunking_method,
+        "embedding_model": EMBEDDING_MODEL_NAME if chunking_method == "semantic_embeddings" else None,
+        "chunk_token_bounds": {"min": CHUNK_MIN_TOKENS, "max": CHUNK_MAX_TOKENS},
+        "token_counter": _token_counter.method,
+        "timestamp": datetime.datetime.now().isoformat()
+    }
+    
+    save_artifact(run_id, "chunks", {"chunks": chunks, "chunk_info": chunk_info, "page_languages": page_languages})
+    
+    print(f"✓ Created {len(chunks)} {chunking_method} chunks "
+          f"({min(chunk_tokens, default=0)}-{max(chunk_tokens, default=0)} tokens each)", file=sys.stderr)
+    
+    # The semantic chunk embeddings are already computed: keep them as a
+    # search index so later questions can use search_document
+    doc_id = document_id(pdf_path)
+    save_manifest(run_id, pdf_path, doc_id, chunking_method)
+    indexed = False
+    if chunk_vectors is not None and len(chunks):
+        try:
+            _index_document(doc_id, pdf_path, chunks, chunk_info, chunk_vectors, chunking_method)
+            indexed = True
+        except Exception as e:
+            print(f"✗ Could not save the search index: {str(e)}", file=sys.stderr)
+    
+    # Step 5: Summarize each chunk, grouped by language so each group uses
+    # one prompt template and model
+    print("SUMMARIZING CHUNKS...", file=sys.stderr)
+    
+    language_groups = {}
+    summaries_by_index = {}
+    summary_cache = SummaryCache(enabled=SUMMARY_CACHE_ENABLED and reuse_summaries)
+    resumed_chunks = []
+    pending = []
+    batch_requests = []
+    for chunk_language, indices in group_by_language(chunk_languages).items():
+        routed_language = None if chunk_language == "unknown" else chunk_language
+        chunk_prompt = prompt_reference(template_for_language(routed_language), "medium", routed_language)
+        chunk_model = LANGUAGE_MODELS.get(routed_language, SUMMARY_MODEL)
+        language_groups[chunk_language] = {
+            "chunks": [index + 1 for index in indices],
+            "prompt": chunk_prompt,
+            "model": chunk_model
         }
+        for index in indices:
+            i, chunk = index + 1, chunks[index]
+            # Unchanged chunks (e.g. of a revised PDF) reuse their stored summary
+            cache_key = content_key(chunk, prompt=chunk_prompt, model=chunk_model)
+            # A resumed run first takes the chunks it already finished
+            cached = checkpointed_summaries.get(cache_key)
+            if cached is not None:
+                resumed_chunks.append(i)
+            else:
+                cached = summary_cache.get(cache_key)
+            if cached is not None:
+                summaries_by_index[index] = {
+                    "chunk_number": i,
+                    "chunk_length": len(chunk),
+                    "language": chunk_language,
+                    "summary": cached["summary"],
+                    "summary_length": len(cached["summary"]),
+                    "reused": True
+                }
+                if cache_key not in checkpointed_summaries:
+                    checkpoint.record(cache_key, summaries_by_index[index])
+                print(f"✓ Chunk {i}/{len(chunks)} unchanged, summary reused", file=sys.stderr)
+                continue
+            print(f"Summarizing chunk {i}/{len(chunks)} ({chunk_language})...", file=sys.stderr)
+            if execution == "batch":
+                # Resolved below, once the batch jobs of all remaining chunks finish
+                future = Future()
+                batch_requests.append((chunk, routed_language, future))
+            else:
+                # Chunks are summarized concurrently through the shared, rate-limited executor
+                future = _llm_executor.submit(_summarize_text, chunk, max_length="medium", language=routed_language)
+            pending.append((index, chunk_language, cache_key, future))
+    if job is not None:
+        for index in sorted(summaries_by_index):
+            _job_queue.add_partial(job, summaries_by_index[index])
+    _report(job, stage="summarizing", chunks_done=len(summaries_by_index), chunks_total=len(chunks))
+    if batch_requests:
+        try:
+            batch_results = _summarize_texts_batch(
+                [chunk for chunk, _, _ in batch_requests], "medium",
+                [language for _, language, _ in batch_requests],
+                cancel_event=job.cancel_event if job is not None else None,
+                collector=batch_collector, collector_key=pdf_path
+            )
+        except BatchCancelled:
+            job.check_cancelled()
+            raise
+        except Exception as e:
+            batch_results = [e] * len(batch_requests)
+        for (_, _, future), batch_result in zip(batch_requests, batch_results):
+            if isinstance(batch_result, Exception):
+                future.set_exception(batch_result)
+            else:
+                future.set_result(batch_result)
+    elif batch_collector is not None:
+        # Nothing to summarize: do not hold back the other documents' batch jobs
+        batch_collector.done(pdf_path)
+    for position, (index, chunk_language, cache_key, future) in enumerate(pending):
+        if job is not None and job.cancel_event.is_set():
+            # Drop the chunks that have not reached the LLM yet
+            for *_, remaining in pending[position:]:
+                remaining.cancel()
+            job.check_cancelled()
+        i, chunk = index + 1, chunks[index]
+        try:
+            summary_result = future.result()
+            summaries_by_index[index] = {
+                "chunk_number": i,
+                "chunk_length": len(chunk),
+                "language": chunk_language,
+                "summary": summary_result["summary"],
+                "summary_length": summary_result["metadata"]["summary_length"],
+                "reused": False
+            }
+            summary_cache.put(cache_key, {"summary": summary_result["summary"]})
+            checkpoint.record(cache_key, summaries_by_index[index])
+            print(f"✓ Chunk {i} summarized: {len(chunk)} chars → {len(summary_result['summary'])} chars", file=sys.stderr)
+        except Exception as e:
+            print(f"✗ Error summarizing chunk {i}: {str(e)}", file=sys.stderr)
+            summaries_by_index[index] = {
+                "chunk_number": i,
+                "chunk_length": len(chunk),
+                "language": chunk_language,
+                "summary": f"Error: {str(e)}",
+                "summary_length": 0,
+                "reused": False
+            }
+        if job is not None:
+            _job_queue.add_partial(job, summaries_by_index[index])
+            _report(job, chunks_done=job.chunks_done + 1)
+    chunk_summaries = [summaries_by_index[index] for index in range(len(chunks))]
+    reused_chunks = [s["chunk_number"] for s in chunk_summaries if s["reused"]]
+    print(f"✓ Reused {len(reused_chunks)}/{len(chunks)} chunk summaries", file=sys.stderr)
+    
+    # Step 6: Combine the chunk summaries through a tree of cached reduce nodes;
+    # only the branches above new or changed chunks are recomputed
+    if job is not None:
+        job.check_cancelled()
+    _report(job, stage="combining")
+    print("CREATING COMBINED SUMMARY...", file=sys.stderr)
+    print(f"Combining {len(chunk_summaries)} chunk summaries...", file=sys.stderr)
+    
+    # A single-language document is summarized in its own language
+    combine_language = None if mixed_language or language == "unknown" else language
+    
+    def combine(text, final):
+        return _llm_executor.call(_summarize_text, text, max_length="short" if final else "medium",
+                                  language=combine_language)["summary"]
+    
+    try:
+        combined_summary, reduce_stats = hierarchical_reduce(
+            [(str(s["chunk_number"]), s["summary"], not s["summary"].startswith("Error:")) for s in chunk_summaries],
+            combine, summary_cache,
+            prompt=prompt_reference(template_for_language(combine_language), "short", combine_language),
+            model=LANGUAGE_MODELS.get(combine_language, SUMMARY_MODEL)
+        )
+        print(f"✓ Combined summary created: {len(combined_summary)} characters "
+              f"({reduce_stats['reused_nodes']}/{reduce_stats['nodes']} reduce nodes reused)", file=sys.stderr)
+    except Exception as e:
+        print(f"✗ Error creating combined summary: {str(e)}", file=sys.stderr)
+        combined_summary = f"Error creating combined summary: {str(e)}"
+        reduce_stats = None
+    
+    # Step 7: Prepare final output
+    summarize_after_chunks = {
+        "pdf_path": pdf_path,
+        "num_pages": num_pages,
+        "language": language,
+        "mixed_language": mixed_language,
+        "total_characters": len(extracted_text),
+        "num_chunks": len(chunks),
+        "chunking_method": chunking_method,
+        "embedding_model": EMBEDDING_MODEL_NAME if chunking_method == "semantic_embeddings" else None,
+        "prompt": prompt_reference("summarize_text", "medium"),
+        "execution": execution,
+        "page_languages": page_language_counts,
+        "language_groups": language_groups,
+        "chunk_summaries": chunk_summaries,
+        "reused_chunks": reused_chunks,
+        "resumed_chunks": resumed_chunks,
+        "resummarized_chunks": [s["chunk_number"] for s in chunk_summaries if not s["reused"]],
+        "reduce": reduce_stats,
+        "combined_summary": combined_summary,
+        "timestamp": datetime.datetime.now().isoformat()
+    }
+    
+    # Step 8: Save the raw text, chunking output and final summary to JSON files,
+    # together, so concurrent runs cannot leave a mixed set of documents behind
+    raw_data_file, chunking_output_file, final_summary_file = extract_result["output_file"], None, None
+    if save_outputs:
+        with _output_lock:
+            raw_data_file = _save_raw_data(pdf_path, extract_result)
+            chunking_output_file = os.path.join(output_dir, "pdf_chunking_output.json")
+            with open(chunking_output_file, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2, ensure_ascii=False)
+            final_summary_file = os.path.join(output_dir, "summarize_after_chunks.json")
+            with open(final_summary_file, 'w', encoding='utf-8') as f:
+                json.dump(summarize_after_chunks, f, indent=2, ensure_ascii=False)
+        print(f"✓ Chunking output saved to: {chunking_output_file}", file=sys.stderr)
+        print(f"✓ Final summary saved to: {final_summary_file}", file=sys.stderr)
+    
+    save_artifact(run_id, "chunk_summaries", chunk_summaries)
+    
+    # Return result with file paths
+    summarize_after_chunks["run_id"] = run_id
+    summarize_after_chunks["doc_id"] = doc_id
+    summarize_after_chunks["search_index"] = indexed
+    summarize_after_chunks["output_files"] = {
+        "raw_data": raw_data_file,
+        "chunking_output": chunking_output_file,
+        "final_summary": final_summary_file,
+        "artifacts": run_dir(run_id)
+    }
+    
+    failed_chunks = [s["chunk_number"] for s in chunk_summaries if s["summary"].startswith("Error:")]
+    if failed_chunks and retry_failed:
+        summarize_after_chunks["retry_job_id"] = _schedule_retry(pdf_path, run_id, chunking_method)
+        print(f"Retrying {len(failed_chunks)} failed chunk(s) in background job "
+              f"{summarize_after_chunks['retry_job_id']}", file=sys.stderr)
+    return summarize_after_chunks
+
+
+def _schedule_retry(pdf_path: str, run_id: str, chunking_method: str) -> str:
+    """
+    Queue a job that resumes a run until its failed chunks succeed.
+    
+    Each pass waits CHUNK_RETRY_DELAY seconds (doubling per pass), resumes
+    the run so only the failed chunks go to the LLM, and rebuilds the combined
+    summary. The job result is the updated compact summary.
+    
+    Returns:
+        str: job_id of the retry job
+    """
+    def run(job: Job) -> dict:
+        result = None
+        for attempt in range(max(1, CHUNK_RETRY_ATTEMPTS)):
+            # Back off before each pass; cancel_job wakes the job up early
+            _report(job, stage="waiting")
+            job.cancel_event.wait(CHUNK_RETRY_DELAY * (2 ** attempt))
+            job.check_cancelled()
+            _report(job, stage="extracting")
+            extract_result = _extract_pdf_text(pdf_path, detect_page_languages=True, save_raw=False)
+            result = _compact_summary(_summarize_document(
+                pdf_path, extract_result, chunking_method, save_outputs=False, job=job,
+                resume_run_id=run_id, retry_failed=False
+            ))
+            if not result["failed_chunks"]:
+                break
+        return result
+    
+    return _job_queue.submit("retry_failed_chunks", {"pdf_path": pdf_path, "run_id": run_id}, run).job_id
+
+
+def _resolve_resume(pdf_path: str, chunking_method: str, resume_run_id: str) -> tuple:
+    """
+    Find the run to resume and check that it belongs to the same PDF.
+    
+    Args:
+        pdf_path: Path to the PDF file (may be empty when resume_run_id is a run_id)
+        chunking_method: Requested chunking method (a resumed run keeps its own)
+        resume_run_id: A run_id, or 'latest' for the most recent checkpointed
+                       run of this PDF (a fresh run if there is none)
         
-        print(f"MCP Server: Summarized {len(text)} chars to {len(summary)} chars", file=sys.stderr)
-        return json.dumps(result, indent=2)
+    Returns:
+        tuple: (pdf_path, chunking_method, run_id or None)
         
-    except Exception as e:
-        return json.dumps({"error": f"Error during text summarization: {str(e)}"})
+    Raises:
+        ValueError: If the run_id is malformed or the PDF changed since that run
+        FileNotFoundError: If the run or the PDF does not exist
+    """
+    if resume_run_id == "latest":
+        run_id = latest_run(document_id(pdf_path))
+        if run_id is None:
+            print(f"No checkpointed run for {pdf_path}; starting a new run", file=sys.stderr)
+            return pdf_path, chunking_method, None
+    else:
+        run_id = resume_run_id
+    manifest = load_manifest(run_id)
+    pdf_path = pdf_path or manifest["pdf_path"]
+    if document_id(pdf_path) != manifest["doc_id"]:
+        raise ValueError(f"{pdf_path} has changed since run {run_id}; summarize it without resume_run_id")
+    print(f"Resuming run {run_id} ({manifest['chunking_method']} chunks)", file=sys.stderr)
+    return pdf_path, manifest["chunking_method"], run_id
+
 
 @mcp.tool()
-def summarize_pdf(pdf_path: str) -> str:
+def summarize_pdf(pdf_path: str, detail: str = "compact", chunking_method: str = DEFAULT_CHUNKING_METHOD,
+                  reuse_summaries: bool = True, resume_run_id: str = "", execution: str = DEFAULT_EXECUTION) -> str:
     """
     Extract text from PDF and perform semantic chunking using embeddings.
     Automatically saves chunking output and final summary to files.
     
+    With chunking_method='structural' the chunks follow the PDF layout
+    (headings, paragraphs, pages) instead, with no embedding model.
+    
+    The extracted text, chunks and chunk summaries are stored as artifacts of the
+    returned run_id; use get_chunk(run_id, n) and get_text(run_id, offset, length)
+    to page through them.
+    
+    Chunk summaries and reduce steps are cached by content hash: when a revised
+    version of a PDF is summarized, only new or changed chunks are sent to the
+    LLM, and reused_chunks lists the chunks whose summaries were reused.
+    
+    Every finished chunk summary is checkpointed in the run. If chunks fail,
+    the result lists them in failed_chunks and a background job
+    (retry_job_id, see get_job_status) retries them and rebuilds the combined
+    summary. resume_run_id continues an earlier run, e.g. after a crash, and
+    only summarizes the chunks it had not finished (resumed_chunks lists the
+    others).
+    
     Args:
-        pdf_path: Path to the PDF file
+        pdf_path: Path to the PDF file (optional when resume_run_id is a run_id)
+        detail: 'compact' (default) returns the combined summary and chunk metadata;
+                'full' also inlines every chunk summary
+        chunking_method: 'semantic_embeddings' (default) or 'structural'
+        reuse_summaries: Reuse cached summaries of unchanged chunks (False re-summarizes everything)
+        resume_run_id: run_id of an earlier run of the same PDF to continue, or
+                       'latest' for its most recent run
+        execution: 'interactive' (default) or 'batch', which summarizes the chunks
+                   through batch jobs: much higher throughput, but the call waits
+                   until the jobs finish (use submit_summarize_pdf)
         
     Returns:
-        JSON string containing chunks, chunk_summaries, and combined_summary
+        JSON string containing run_id, combined_summary, reused_chunks, and chunk summaries (inline or by reference)
     """
-    print(f"MCP Server: Received summarize_pdf request for: {pdf_path}", file=sys.stderr)
+    print(f"MCP Server: Received summarize_pdf request for: {pdf_path} (chunking_method={chunking_method})", file=sys.stderr)
+    if chunking_method not in CHUNKING_METHODS:
+        return dumps({"error": f"Unknown chunking_method '{chunking_method}', expected one of {list(CHUNKING_METHODS)}"})
+    if execution not in EXECUTION_MODES:
+        return dumps({"error": f"Unknown execution '{execution}', expected one of {list(EXECUTION_MODES)}"})
+    run_id = None
+    if resume_run_id:
+        try:
+            pdf_path, chunking_method, run_id = _resolve_resume(pdf_path, chunking_method, resume_run_id)
+        except (ValueError, FileNotFoundError) as e:
+            return dumps({"error": f"Cannot resume run: {str(e)}"})
     try:
-        # Determine output directory (relative to this script)
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        output_dir = os.path.join(script_dir, "output")
-        
-        # Create output directory if it doesn't exist
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Step 1: Extract text from PDF (returns JSON string, need to parse)
+        # Step 1: Extract text from PDF
         print(f"Extracting text from PDF: {pdf_path}", file=sys.stderr)
-        extract_result_json = extract_pdf(pdf_path)
-        extract_result = json.loads(extract_result_json)
-        
-        if "error" in extract_result:
-            return json.dumps({"error": f"PDF extraction failed: {extract_result['error']}"})
-        
-        extracted_text = extract_result["extracted_text"]
-        num_pages = extract_result["num_pages"]
-        print(f"✓ Extracted {len(extracted_text)} characters from {num_pages} pages", file=sys.stderr)
-        
-        # Step 2: Detect language (returns JSON string, need to parse)
-        language_result_json = detect_language(extracted_text)
-        language_result = json.loads(language_result_json)
-        
-        if "error" in language_result:
-            language = "unknown"
-        else:
-            language = language_result["language_code"]
-        print(f"✓ Detected language: {language}", file=sys.stderr)
+        try:
+            extract_result = _extract_pdf_text(pdf_path, detect_page_languages=True, save_raw=False)
+        except ValueError as e:
+            return dumps({"error": f"PDF extraction failed: {str(e)}"})
         
-        # Step 3: Perform semantic chunking using embeddings (FREE HuggingFace model)
-        print(f"Performing semantic chunking with embeddings...", file=sys.stderr)
-        print("Loading embedding model (this may take a moment on first run)...", file=sys.stderr)
+        summarize_after_chunks = _summarize_document(pdf_path, extract_result, chunking_method, reuse_summaries,
+                                                     resume_run_id=run_id, execution=execution)
         
-        # Use free HuggingFace embeddings model
-        embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
-        )
+        if detail != "full":
+            # Chunk summaries can be paged with get_chunk instead of being inlined
+            summarize_after_chunks = _compact_summary(summarize_after_chunks)
         
-        # Create semantic chunker that groups similar content together
-        text_splitter = SemanticChunker(
-            embeddings=embeddings,
-            breakpoint_threshold_type="percentile"
-        )
+        return dumps(summarize_after_chunks)
         
-        # Split text into semantic chunks
-        docs = text_splitter.create_documents([extracted_text])
-        chunks = [doc.page_content for doc in docs]
-        
-        # Step 4: Prepare results
-        chunk_info = []
-        for i, chunk in enumerate(chunks, 1):
-            chunk_info.append({
-                "chunk_number": i,
-                "length": len(chunk),
-                "preview": chunk[:100] + "..." if len(chunk) > 100 else chunk
-            })
+    except FileNotFoundError:
+        return dumps({"error": f"PDF file not found: {pdf_path}"})
+    except Exception as e:
+        return dumps({"error": f"Error in summarize_pdf: {str(e)}"})
+
+
+def _extract_for_batch(pdf_path: str) -> dict:
+    """Extraction step of summarize_pdfs (top level, so spawned worker processes can run it)."""
+    if not os.path.isfile(pdf_path):
+        raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+    return _extract_pdf_text(pdf_path, detect_page_languages=True, save_raw=False)
+
+
+@mcp.tool()
+def summarize_pdfs(paths: str, chunking_method: str = DEFAULT_CHUNKING_METHOD, reuse_summaries: bool = True,
+                   execution: str = DEFAULT_EXECUTION) -> str:
+    """
+    Summarize many PDFs in one call.
+    
+    PDFs are extracted in a process pool and summarized as soon as they are
+    extracted; all LLM calls share one concurrency and rate limit
+    (LLM_CONCURRENCY, LLM_REQUESTS_PER_MINUTE). A failing document does not stop
+    the batch: its entry carries an error instead.
+    
+    Every document gets its own run_id (use get_chunk / get_text on it), and the
+    whole batch result is stored under batch_run_id. Combined summaries are
+    inlined for batches of up to BATCH_INLINE_SUMMARIES documents; larger
+    batches return them by reference (get_chunk(run_id, n) on each run_id, or
+    the batch artifact).
+    
+    Failed chunks are not retried in the background (a large batch would queue
+    one retry job per document): they are listed in each document's
+    failed_chunks, and summarize_pdf(pdf_path, resume_run_id=run_id) retries them.
+    
+    Args:
+        paths: PDF paths or glob patterns, separated by commas or newlines
+               (e.g. "reports/*.pdf, extra/annex.pdf")
+        chunking_method: 'semantic_embeddings' (default) or 'structural'
+        reuse_summaries: Reuse cached summaries of unchanged chunks
+        execution: 'interactive' (default) or 'batch': the chunk summaries go through
+                   batch jobs shared by groups of up to BATCH_GROUP_DOCUMENTS documents,
+                   for overnight corpus runs
         
-        result = {
+    Returns:
+        JSON string containing batch_run_id, per-document results in path order,
+        and stats (documents, pages, chunks, LLM calls, throughput)
+    """
+    print(f"MCP Server: Received summarize_pdfs request for: {paths} (chunking_method={chunking_method})", file=sys.stderr)
+    if chunking_method not in CHUNKING_METHODS:
+        return dumps({"error": f"Unknown chunking_method '{chunking_method}', expected one of {list(CHUNKING_METHODS)}"})
+    if execution not in EXECUTION_MODES:
+        return dumps({"error": f"Unknown execution '{execution}', expected one of {list(EXECUTION_MODES)}"})
+    try:
+        pdf_paths = expand_paths(paths)
+    except ValueError as e:
+        return dumps({"error": str(e)})
+    inline = len(pdf_paths) <= BATCH_INLINE_SUMMARIES
+    batch_collector = None
+    batch_options = {}
+    if execution == "batch":
+        # A group of documents waits for its chunk summaries at the same time,
+        # so their requests go out as a few shared batch jobs
+        batch_collector = BatchCollector(_get_batch_backend(), pdf_paths, display_name="summarize-medium")
+        batch_options["document_workers"] = batch_collector.max_documents
+    
+    def summarize_document(pdf_path: str, extract_result: dict) -> dict:
+        result = _summarize_document(pdf_path, extract_result, chunking_method, reuse_summaries, save_outputs=False,
+                                     retry_failed=False, execution=execution, batch_collector=batch_collector)
+        return {
             "pdf_path": pdf_path,
-            "num_pages": num_pages,
-            "language": language,
-            "total_characters": len(extracted_text),
-            "num_chunks": len(chunks),
-            "chunks": chunks,
-            "chunk_info": chunk_info,
-            "chunking_method": "semantic_embeddings",
-            "embedding_model": "sentence-transformers/all-MiniLM-L6-v2",
-            "timestamp": datetime.datetime.now().isoformat()
+            "run_id": result["run_id"],
+            "doc_id": result["doc_id"],
+            "num_pages": result["num_pages"],
+            "num_chunks": result["num_chunks"],
+            "language": result["language"],
+            "reused_chunks": result["reused_chunks"],
+            "failed_chunks": [
+                s["chunk_number"] for s in result["chunk_summaries"] if s["summary"].startswith("Error:")
+            ],
+            "combined_summary": result["combined_summary"]
         }
+    
+    def finished(document: dict) -> None:
+        if batch_collector is not None:
+            batch_collector.done(document["pdf_path"])
+        status = f"✗ {document['error']}" if document.get("error") else f"✓ {document['num_chunks']} chunks"
+        print(f"Batch: {document['pdf_path']} {status} ({document['seconds']}s)", file=sys.stderr)
+    
+    try:
+        batch = run_batch(pdf_paths, _extract_for_batch, summarize_document, _llm_executor, on_document=finished,
+                          **batch_options)
+    except Exception as e:
+        return dumps({"error": f"Error in summarize_pdfs: {str(e)}"})
+    
+    batch_run_id = new_run_id()
+    stats = batch["stats"]
+    stats["documents_with_failed_chunks"] = sum(1 for document in batch["documents"] if document.get("failed_chunks"))
+    if batch_collector is not None:
+        stats["batch_submissions"] = batch_collector.snapshot()
+    save_artifact(batch_run_id, "batch", batch)
+    print(f"✓ Batch done: {stats['succeeded']}/{stats['documents']} documents in {stats['total_seconds']}s "
+          f"({stats['llm_calls']} LLM calls)", file=sys.stderr)
+    
+    documents = batch["documents"]
+    if not inline:
+        documents = [{k: v for k, v in document.items() if k != "combined_summary"} for document in documents]
+    return dumps({
+        "batch_run_id": batch_run_id,
+        "chunking_method": chunking_method,
+        "summaries_inline": inline,
+        "documents": documents,
+        "stats": stats,
+        "artifacts": run_dir(batch_run_id)
+    })
+
+
+@mcp.tool()
+def submit_summarize_pdf(pdf_path: str, chunking_method: str = DEFAULT_CHUNKING_METHOD,
+                         reuse_summaries: bool = True, resume_run_id: str = "",
+                         execution: str = DEFAULT_EXECUTION) -> str:
+    """
+    Start summarize_pdf as a background job and return its job_id immediately.
+    
+    Use it for large PDFs that would exceed the tool-call timeout. Poll
+    get_job_status(job_id) for progress (chunks done out of chunks total),
+    read finished chunk summaries with get_job_result while the job runs, and
+    stop it with cancel_job(job_id).
+    
+    Args:
+        pdf_path: Path to the PDF file
+        chunking_method: 'semantic_embeddings' (default) or 'structural'
+        reuse_summaries: Reuse cached summaries of unchanged chunks
+        resume_run_id: run_id of an earlier run of the same PDF to continue
+                       (e.g. an interrupted job's run_id), or 'latest'
+        execution: 'interactive' (default) or 'batch' (chunk summaries via batch jobs)
         
-        # Save chunking output to file
-        chunking_output_file = os.path.join(output_dir, "pdf_chunking_output.json")
-        with open(chunking_output_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+    Returns:
+        JSON string containing job_id and status ('queued')
+    """
+    print(f"MCP Server: Received submit_summarize_pdf request for: {pdf_path} (chunking_method={chunking_method})", file=sys.stderr)
+    if chunking_method not in CHUNKING_METHODS:
+        return dumps({"error": f"Unknown chunking_method '{chunking_method}', expected one of {list(CHUNKING_METHODS)}"})
+    if execution not in EXECUTION_MODES:
+        return dumps({"error": f"Unknown execution '{execution}', expected one of {list(EXECUTION_MODES)}"})
+    run_id = None
+    if resume_run_id:
+        try:
+            pdf_path, chunking_method, run_id = _resolve_resume(pdf_path, chunking_method, resume_run_id)
+        except (ValueError, FileNotFoundError) as e:
+            return dumps({"error": f"Cannot resume run: {str(e)}"})
+    if not os.path.isfile(pdf_path):
+        return dumps({"error": f"PDF file not found: {pdf_path}"})
+    
+    def run(job: Job) -> dict:
+        _report(job, stage="extracting")
+        try:
+            extract_result = _extract_pdf_text(pdf_path, detect_page_languages=True, save_raw=False)
+        except ValueError as e:
+            raise ValueError(f"PDF extraction failed: {str(e)}")
+        job.check_cancelled()
+        return _compact_summary(_summarize_document(pdf_path, extract_result, chunking_method, reuse_summaries,
+                                                    job=job, resume_run_id=run_id, execution=execution))
+    
+    job = _job_queue.submit("summarize_pdf", {
+        "pdf_path": pdf_path, "chunking_method": chunking_method, "reuse_summaries": reuse_summaries,
+        "resume_run_id": run_id, "execution": execution
+    }, run)
+    return dumps({
+        "job_id": job.job_id,
+        "status": job.status,
+        "poll_with": "get_job_status(job_id)"
+    })
+
+
+@mcp.tool()
+def get_job_status(job_id: str) -> str:
+    """
+    Get the status and progress of a job started with submit_summarize_pdf.
+    
+    Args:
+        job_id: Job identifier returned by submit_summarize_pdf
         
-        print(f"✓ Created {len(chunks)} semantic chunks", file=sys.stderr)
-        print(f"✓ Chunking output saved to: {chunking_output_file}", file=sys.stderr)
+    Returns:
+        JSON string containing status ('queued', 'running', 'succeeded', 'failed',
+        'cancelled' or 'interrupted'), stage, chunks_done, chunks_total, progress,
+        run_id and error
+    """
+    print(f"MCP Server: Received get_job_status request for: {job_id}", file=sys.stderr)
+    try:
+        return dumps(_job_queue.get(job_id).to_dict())
+    except (ValueError, FileNotFoundError) as e:
+        return dumps({"error": str(e)})
+
+
+@mcp.tool()
+def get_job_result(job_id: str, offset: int = 0, limit: int = 50) -> str:
+    """
+    Get the result of a job, or the chunk summaries finished so far.
+    
+    A succeeded job returns the same result as summarize_pdf. Otherwise the
+    response carries the job status and partial_summaries, the chunk
+    summaries finished so far (also kept for failed, cancelled and
+    interrupted jobs), paged with offset and limit.
+    
+    Args:
+        job_id: Job identifier returned by submit_summarize_pdf
+        offset: First partial summary to return
+        limit: Maximum number of partial summaries to return
         
-        # Step 5: Summarize each chunk (summarize_text returns JSON string)
-        print("SUMMARIZING CHUNKS...", file=sys.stderr)
-        
-        chunk_summaries = []
-        for i, chunk in enumerate(chunks, 1):
-            print(f"Summarizing chunk {i}/{len(chunks)}...", file=sys.stderr)
-            try:
-                summary_result_json = summarize_text(chunk, max_length="medium")
-                summary_result = json.loads(summary_result_json)
-                
-                if "error" in summary_result:
-                    chunk_summaries.append({
-                        "chunk_number": i,
-                        "chunk_length": len(chunk),
-                        "summary": f"Error: {summary_result['error']}",
-                        "summary_length": 0
-                    })
-                else:
-                    chunk_summaries.append({
-                        "chunk_number": i,
-                        "chunk_length": len(chunk),
-                        "summary": summary_result["summary"],
-                        "summary_length": summary_result["metadata"]["summary_length"]
-                    })
-                    print(f"✓ Chunk {i} summarized: {len(chunk)} chars → {len(summary_result['summary'])} chars", file=sys.stderr)
-            except Exception as e:
-                print(f"✗ Error summarizing chunk {i}: {str(e)}", file=sys.stderr)
-                chunk_summaries.append({
-                    "chunk_number": i,
-                    "chunk_length": len(chunk),
-                    "summary": f"Error: {str(e)}",
-                    "summary_length": 0
-                })
+    Returns:
+        JSON string containing the summary result, or status and partial_summaries
+    """
+    print(f"MCP Server: Received get_job_result request for: {job_id}", file=sys.stderr)
+    try:
+        job = _job_queue.get(job_id)
+    except (ValueError, FileNotFoundError) as e:
+        return dumps({"error": str(e)})
+    if job.status == SUCCEEDED:
+        result = _job_queue.result(job_id)
+        if result is not None:
+            return dumps({"job_id": job_id, "status": job.status, "result": result})
+    partial = _job_queue.partial(job_id, offset=max(0, offset), limit=max(1, limit))
+    return dumps({
+        **job.to_dict(),
+        "partial_summaries": partial,
+        "next_offset": max(0, offset) + len(partial) if len(partial) == max(1, limit) else None
+    })
+
+
+@mcp.tool()
+def cancel_job(job_id: str) -> str:
+    """
+    Cancel a queued or running job.
+    
+    A running job stops before its next chunk; summaries finished before that
+    stay available through get_job_result. A job running in another HTTP
+    worker process is cancelled at its owner's next heartbeat.
+    
+    Args:
+        job_id: Job identifier returned by submit_summarize_pdf
         
-        # Step 6: Combine all chunk summaries into one final summary
-        print("CREATING COMBINED SUMMARY...", file=sys.stderr)
+    Returns:
+        JSON string containing job_id and status
+    """
+    print(f"MCP Server: Received cancel_job request for: {job_id}", file=sys.stderr)
+    try:
+        job = _job_queue.cancel(job_id)
+    except (ValueError, FileNotFoundError) as e:
+        return dumps({"error": str(e)})
+    return dumps({"job_id": job_id, "status": job.status, "cancel_requested": job.cancel_event.is_set()})
+
+
+@mcp.tool()
+def index_pdf(pdf_path: str, chunking_method: str = DEFAULT_CHUNKING_METHOD) -> str:
+    """
+    Chunk and embed a PDF for search_document, without summarizing it.
+    
+    Indexes are stored per document content hash (doc_id), so a file already
+    indexed with the same chunking method is not processed again. summarize_pdf also indexes the
+    document when it uses semantic chunking. The output/*.json files of the last
+    summarize_pdf run are left untouched.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        chunking_method: 'semantic_embeddings' (default) or 'structural'
         
-        all_summaries_text = "\n\n".join([f"Section {s['chunk_number']}: {s['summary']}" for s in chunk_summaries])
-        print(f"Combining {len(chunk_summaries)} chunk summaries...", file=sys.stderr)
+    Returns:
+        JSON string containing doc_id, num_chunks, and whether an existing index was reused
+    """
+    print(f"MCP Server: Received index_pdf request for: {pdf_path}", file=sys.stderr)
+    if chunking_method not in CHUNKING_METHODS:
+        return dumps({"error": f"Unknown chunking_method '{chunking_method}', expected one of {list(CHUNKING_METHODS)}"})
+    try:
+        doc_id = document_id(pdf_path)
+        try:
+            index = DocumentIndex.load(doc_id)
+            if index.info.get("chunking_method") == chunking_method:
+                return dumps({"doc_id": doc_id, "num_chunks": len(index.chunks), "reused": True, **index.info})
+        except FileNotFoundError:
+            pass
         
         try:
-            combined_summary_result_json = summarize_text(all_summaries_text, max_length="short")
-            combined_summary_result = json.loads(combined_summary_result_json)
-            
-            if "error" in combined_summary_result:
-                combined_summary = f"Error creating combined summary: {combined_summary_result['error']}"
-            else:
-                combined_summary = combined_summary_result["summary"]
-                print(f"✓ Combined summary created: {len(combined_summary)} characters", file=sys.stderr)
-        except Exception as e:
-            print(f"✗ Error creating combined summary: {str(e)}", file=sys.stderr)
-            combined_summary = f"Error creating combined summary: {str(e)}"
+            extract_result = _extract_pdf_text(pdf_path, detect_page_languages=True, save_raw=False)
+        except ValueError as e:
+            return dumps({"error": f"PDF extraction failed: {str(e)}"})
+        chunks, chunk_pages, chunk_vectors = _chunk_pdf(pdf_path, extract_result, chunking_method)
+        chunk_info = []
+        for i, chunk in enumerate(chunks):
+            info = {}
+            if chunk_pages:
+                first, last = chunk_pages[i]
+                info["pages"] = chunk_pages[i]
+                info["language"] = majority_language(extract_result["page_languages"][first - 1:last],
+                                                     extract_result["page_lengths"][first - 1:last])
+            chunk_info.append(info)
+        _index_document(doc_id, pdf_path, chunks, chunk_info, chunk_vectors, chunking_method)
+        return dumps({"doc_id": doc_id, "num_chunks": len(chunks), "reused": False,
+                      "pdf_path": pdf_path, "chunking_method": chunking_method})
         
-        # Step 7: Prepare final output
-        summarize_after_chunks = {
-            "pdf_path": pdf_path,
-            "num_pages": num_pages,
-            "language": language,
-            "total_characters": len(extracted_text),
-            "num_chunks": len(chunks),
-            "chunking_method": "semantic_embeddings",
-            "embedding_model": "sentence-transformers/all-MiniLM-L6-v2",
-            "chunk_summaries": chunk_summaries,
-            "combined_summary": combined_summary,
-            "timestamp": datetime.datetime.now().isoformat()
-        }
+    except FileNotFoundError:
+        return dumps({"error": f"PDF file not found: {pdf_path}"})
+    except Exception as e:
+        return dumps({"error": f"Error indexing PDF: {str(e)}"})
+
+
+@mcp.tool()
+def search_document(doc_id: str, query: str, k: int = 5) -> str:
+    """
+    Find the chunks of an indexed PDF that are most relevant to a question.
+    
+    Use it to answer questions about a document from a few passages instead of
+    summarizing the whole document. The doc_id comes from index_pdf or summarize_pdf.
+    
+    Args:
+        doc_id: Document id returned by index_pdf or summarize_pdf
+        query: Question or search text
+        k: Number of chunks to return (default: 5)
         
-        # Step 8: Save final summary to JSON file
-        final_summary_file = os.path.join(output_dir, "summarize_after_chunks.json")
-        with open(final_summary_file, 'w', encoding='utf-8') as f:
-            json.dump(summarize_after_chunks, f, indent=2, ensure_ascii=False)
+    Returns:
+        JSON string containing the top-k chunks (chunk_number, score, text, pages if known)
+    """
+    print(f"MCP Server: Received search_document request for: {doc_id} (k={k})", file=sys.stderr)
+    if not query or not query.strip():
+        return dumps({"error": "Query is empty or contains only whitespace"})
+    try:
+        index = DocumentIndex.load(doc_id)
+        results = index.search(_encode([query])[0], k=max(1, k))
+        return dumps({
+            "doc_id": doc_id,
+            "pdf_path": index.info.get("pdf_path"),
+            "query": query,
+            "num_chunks": len(index.chunks),
+            "search": "ivf" if index.centroids is not None else "exact",
+            "results": results
+        })
+    except FileNotFoundError:
+        return dumps({"error": f"No index for doc_id '{doc_id}'; call index_pdf(pdf_path) first"})
+    except ValueError as e:
+        return dumps({"error": str(e)})
+    except Exception as e:
+        return dumps({"error": f"Error searching document: {str(e)}"})
+
+
+@mcp.tool()
+def get_chunk(run_id: str, n: int) -> str:
+    """
+    Fetch one chunk of a summarize_pdf run, with its summary if available.
+    
+    Args:
+        run_id: The run_id returned by summarize_pdf
+        n: 1-based chunk number
         
-        print(f"✓ Final summary saved to: {final_summary_file}", file=sys.stderr)
+    Returns:
+        JSON string containing the chunk text, chunk_info, summary, and num_chunks
+    """
+    print(f"MCP Server: Received get_chunk request for run {run_id}, chunk {n}", file=sys.stderr)
+    try:
+        chunk_data = load_artifact(run_id, "chunks")
+        chunks = chunk_data["chunks"]
+        if n < 1 or n > len(chunks):
+            return dumps({"error": f"Chunk {n} out of range (1-{len(chunks)})"})
         
-        # Return result with file paths
-        summarize_after_chunks["output_files"] = {
-            "raw_data": os.path.join(output_dir, "raw_extracted_data.json"),
-            "chunking_output": chunking_output_file,
-            "final_summary": final_summary_file
+        result = {
+            "run_id": run_id,
+            "chunk_number": n,
+            "num_chunks": len(chunks),
+            "chunk_info": chunk_data["chunk_info"][n - 1],
+            "text": chunks[n - 1]
         }
+        try:
+            result["summary"] = load_artifact(run_id, "chunk_summaries")[n - 1]["summary"]
+        except FileNotFoundError:
+            result["summary"] = None
+        return dumps(result)
         
-        return json.dumps(summarize_after_chunks, indent=2)
+    except (ValueError, FileNotFoundError) as e:
+        return dumps({"error": str(e)})
+    except Exception as e:
+        return dumps({"error": f"Error fetching chunk: {str(e)}"})
+
+
+@mcp.tool()
+def get_text(run_id: str, offset: int = 0, length: int = 20000) -> str:
+    """
+    Page through the extracted text of an extract_pdf or summarize_pdf run.
+    
+    Args:
+        run_id: The run_id from extracted_text_ref or summarize_pdf
+        offset: Character offset to start from
+        length: Number of characters to return
         
-    except FileNotFoundError:
-        return json.dumps({"error": f"PDF file not found: {pdf_path}"})
+    Returns:
+        JSON string containing the text slice, total length, and next_offset (null at the end)
+    """
+    print(f"MCP Server: Received get_text request for run {run_id} at offset {offset}", file=sys.stderr)
+    try:
+        text = load_artifact(run_id, "extracted_text")["text"]
+        offset = max(0, offset)
+        end = min(len(text), offset + max(1, length))
+        return dumps({
+            "run_id": run_id,
+            "offset": offset,
+            "text": text[offset:end],
+            "total_length": len(text),
+            "next_offset": end if end < len(text) else None
+        })
+        
+    except (ValueError, FileNotFoundError) as e:
+        return dumps({"error": str(e)})
+    except Exception as e:
+        return dumps({"error": f"Error fetching text: {str(e)}"})
+
+@mcp.tool()
+def import_time_report(modules: str = "fitz,langdetect,google.genai,sentence_transformers", top: int = 15) -> str:
+    """
+    Diagnostic: report import/cold-start cost of this server's dependencies.
+    
+    Args:
+        modules: Comma-separated modules to time in a fresh `python -X importtime` interpreter
+                 (pass an empty string to skip the subprocess and only report in-process timings)
+        top: Number of slowest imports to list
+        
+    Returns:
+        JSON string with slowest imports, per-module cold import times, and warm-up status
+    """
+    print(f"MCP Server: Received import_time_report request for: {modules}", file=sys.stderr)
+    try:
+        module_list = [m.strip() for m in modules.split(",") if m.strip()]
+        return dumps(build_import_time_report(module_list, top=top))
     except Exception as e:
-        return json.dumps({"error": f"Error in summarize_pdf: {str(e)}"})
+        return dumps({"error": f"Error building import time report: {str(e)}"})
+
+
+def create_http_app():
+    """ASGI app factory used by uvicorn worker processes in HTTP mode."""
+    return http_app(mcp)
+
 
 if __name__ == "__main__":
-    print("Launching FastMCP Server via stdio...", file=sys.stderr)
-    mcp.run()
+    # stdio by default; --transport streamable-http/sse --host --port --workers to share one server
+    run_server(mcp, "summarization_server", default_port=8001, description="Summarization MCP server")
 # --- End MCP Server ---
\ No newline at end of file
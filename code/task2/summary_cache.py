@@ -0,0 +1,152 @@
+"""
+Content-addressed summary cache for incremental re-summarization.
+
+Every chunk summary is stored under a hash of the chunk text and everything
+that affects its summary (prompt template version, length, language, model).
+When a revised PDF is summarized again, unchanged chunks are looked up instead
+of being sent to the LLM.
+
+The reduce step is a tree: consecutive chunk summaries are combined in small
+groups, and the group summaries are combined again until one summary remains.
+Each node is cached by the hash of its input, so only the branches above
+changed chunks are recomputed. Group boundaries are content-defined (a group
+ends after a summary whose hash hits a boundary value), so inserting or
+removing a chunk only changes the groups around it instead of shifting every
+later group.
+
+Entries are JSON files under output/summary_cache/<key[:2]>/<key>.json.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "summary_cache")
+SUMMARY_CACHE_ENABLED = os.getenv("SUMMARY_CACHE", "1") != "0"
+# Average number of summaries combined by one reduce node
+REDUCE_FAN_IN = int(os.getenv("SUMMARY_REDUCE_FAN_IN", "8"))
+
+
+def content_key(text: str, **params) -> str:
+    """Hash of a text and the parameters that determine its summary."""
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+class SummaryCache:
+    """
+    Persistent key-value store of summaries.
+
+    Args:
+        cache_dir: Directory of the cache files
+        enabled: When False, get() always misses and put() does nothing
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, enabled: bool = SUMMARY_CACHE_ENABLED):
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached entry for a key, or None."""
+        entry = None
+        if self.enabled:
+            try:
+                with open(self._path(key), "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: Dict) -> None:
+        """Store an entry (written atomically, so concurrent readers never see partial files)."""
+        if not self.enabled:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+
+def _group(items: List[Dict], fan_in: int) -> List[List[Dict]]:
+    """Split items into content-defined groups of about fan_in (at most 2 * fan_in)."""
+    groups, current = [], []
+    for item in items:
+        current.append(item)
+        boundary = int(item["key"][:8], 16) % fan_in == 0
+        if boundary or len(current) >= 2 * fan_in:
+            groups.append(current)
+            current = []
+    if current:
+        groups.append(current)
+    return groups
+
+
+def hierarchical_reduce(summaries: List[Tuple[str, str, bool]], combine: Callable[[str, bool], str],
+                        cache: SummaryCache, fan_in: int = REDUCE_FAN_IN, **params) -> Tuple[str, Dict]:
+    """
+    Combine chunk summaries into one summary through a tree of cached reduce nodes.
+
+    Args:
+        summaries: (label, summary, ok) per chunk in document order; ok=False marks
+                   failed chunks, whose ancestors are recomputed next time
+        combine: combine(text, final) summarizes the joined "Section <n>: ..." text
+                 of one node; final is True for the root
+        cache: Summary cache for the reduce nodes
+        fan_in: Average number of inputs per intermediate node
+        **params: Parameters that determine the reduce prompts (part of the keys)
+
+    Returns:
+        tuple: (root summary, {"levels", "nodes", "reused_nodes", "recomputed_nodes"})
+    """
+    fan_in = max(2, fan_in)
+    level = [{"label": label, "summary": summary, "ok": ok, "key": content_key(summary, **params)}
+             for label, summary, ok in summaries]
+    stats = {"levels": 0, "nodes": 0, "reused_nodes": 0, "recomputed_nodes": []}
+
+    def reduce_node(items: List[Dict], final: bool) -> Dict:
+        label = items[0]["label"] if len(items) == 1 else \
+            f"{items[0]['label'].split('-')[0]}-{items[-1]['label'].split('-')[-1]}"
+        # Sections are numbered within the node, so renumbered chunks still hit the cache
+        text = "\n\n".join(f"Section {i}: {item['summary']}" for i, item in enumerate(items, 1))
+        key = content_key(text, final=final, **params)
+        ok = all(item["ok"] for item in items)
+        stats["nodes"] += 1
+        entry = cache.get(key)
+        if entry is not None:
+            stats["reused_nodes"] += 1
+            summary = entry["summary"]
+        else:
+            summary = combine(text, final)
+            stats["recomputed_nodes"].append(label)
+            if ok:
+                # Nodes over failed chunks are recomputed once those chunks succeed
+                cache.put(key, {"summary": summary, "label": label})
+        return {"label": label, "summary": summary, "ok": ok, "key": key}
+
+    while len(level) > fan_in:
+        stats["levels"] += 1
+        groups = _group(level, fan_in)
+        if len(groups) == len(level):
+            # Every summary hit a boundary: fall back to fixed-size groups
+            groups = [level[i:i + fan_in] for i in range(0, len(level), fan_in)]
+        level = [reduce_node(group, final=False) if len(group) > 1 else group[0] for group in groups]
+    stats["levels"] += 1
+    root = reduce_node(level, final=True)
+    return root["summary"], stats
@@ -3,10 +3,22 @@ You are a helpful assistant with access to tools from THREE MCP servers:
 
 === SERVER 1: Summarization Server ===
 Tools for PDF processing and text summarization:
-- 'extract_pdf': Extract text content from a PDF file given its path. Returns the extracted text and number of pages.
-- 'detect_language': Detect the language of a given text. Returns the ISO 639-1 language code (e.g., 'en', 'fr', 'es').
-- 'summarize_text': Summarize text using Gemini LLM. Accepts text and optional max_length ('short', 'medium', 'long').
-- 'summarize_pdf': Full PDF summarization pipeline - extracts text, performs semantic chunking, summarizes each chunk, and creates a combined summary.
+- 'extract_pdf': Extract text content from a PDF file given its path. Returns the extracted text, the number of pages and per-page character offsets. Pass pages (e.g. '1-5,10') to read only some pages.
+- 'get_pdf_outline': Page count and table of contents of a PDF, without extracting text. For large PDFs or questions about one part of a document, call it first and then extract only the relevant pages.
+- 'detect_language': Detect the language of a given text. Returns the ISO 639-1 language code (e.g., 'en', 'fr', 'es'). By default only windows from the start, middle and end are analyzed; the result includes a confidence and a 'mixed' flag for mixed-language documents. Use mode='full' to analyze the whole text.
+- 'summarize_text': Summarize text using Gemini LLM. Accepts text, optional max_length ('short', 'medium', 'long') and include_prompt (set false to get a prompt template reference instead of the full prompts).
+- 'get_prompt': Debug tool that renders the full prompt for a template_id/max_length (and language) reference.
+- 'summarize_pdf': Full PDF summarization pipeline - extracts text, performs semantic chunking, summarizes each chunk, and creates a combined summary. Returns a run_id; chunk summaries are returned by reference unless detail='full'. Pass chunking_method='structural' to chunk along the PDF layout (headings, paragraphs, pages) without the embedding model; this is much faster on well-structured documents.
+- 'summarize_pdfs': Summarize many PDFs in one call (paths: comma- or newline-separated paths or glob patterns such as 'reports/*.pdf'). Returns one entry per document with its own run_id, plus batch stats. Use it instead of calling summarize_pdf once per file. For large non-urgent corpora (e.g. overnight runs), pass execution='batch' to summarize chunks through batch jobs: much higher throughput, but results can take minutes to hours. Batch runs do not write output/summarize_after_chunks.json, so evaluate a single document with summarize_pdf.
+- 'submit_summarize_pdf': Start summarize_pdf as a background job and return a job_id at once. Prefer it over summarize_pdf for large PDFs (more than about 50 pages), which may exceed the tool timeout.
+- 'get_job_status': Status and progress of a job (chunks_done out of chunks_total). Poll it every few seconds, or do other work meanwhile.
+- 'get_job_result': The summarize_pdf result of a finished job, or the chunk summaries finished so far (partial_summaries) while it runs or after it fails.
+- 'cancel_job': Cancel a queued or running job; finished chunk summaries stay available.
+- Checkpoints: every finished chunk summary is saved with its run. If a summarize_pdf result lists failed_chunks, a background retry job (retry_job_id) re-summarizes only those chunks; poll it with get_job_status and read the updated summary with get_job_result. To continue an interrupted run, pass resume_run_id (its run_id, or 'latest' for the PDF's most recent run) to summarize_pdf or submit_summarize_pdf.
+- 'get_chunk': Fetch chunk n (1-based) of a summarize_pdf run, with its text, language and summary. For multilingual PDFs, non-English chunks are summarized in their own language; 'language_groups' in the summarize_pdf result lists the chunks of each language.
+- 'index_pdf': Chunk and embed a PDF for search without summarizing it. Returns a doc_id (a hash of the file; summarize_pdf also returns it and indexes semantic chunks).
+- 'search_document': Return the k chunks of an indexed PDF most relevant to a query (doc_id, query, k). For a specific question about a document, prefer index_pdf + search_document over summarize_pdf, and answer from the returned passages.
+- 'get_text': Page through the extracted text of a run (run_id, offset, length). Use it when extract_pdf returns 'extracted_text_ref' instead of 'extracted_text'.
 
 === SERVER 2: API Fetching Server ===
 Tools for fetching real-time data from external APIs:
@@ -0,0 +1,12 @@
+"""
+Shared setup for the task2 tests.
+
+The task2 modules import each other by their flat names (the servers are
+started from their own directory), so the tests put that directory on the
+path the same way.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
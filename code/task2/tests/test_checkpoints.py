@@ -0,0 +1,61 @@
+"""Tests for the per-chunk run checkpoints (checkpoints.py)."""
+
+import pytest
+
+import artifacts
+from checkpoints import RunCheckpoint, latest_run, load_manifest, save_manifest
+
+
+@pytest.fixture
+def runs_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, "RUNS_DIR", str(tmp_path))
+    return str(tmp_path)
+
+
+def test_record_and_load(runs_dir):
+    checkpoint = RunCheckpoint("20260101-000000-aaaaaaaa")
+    checkpoint.record("key-1", {"chunk_index": 0, "summary": "first"})
+    checkpoint.record("key-2", {"chunk_index": 1, "summary": "second"})
+
+    # A new instance (e.g. a resumed run) sees the same entries
+    entries = RunCheckpoint("20260101-000000-aaaaaaaa").load()
+    assert set(entries) == {"key-1", "key-2"}
+    assert entries["key-2"] == {"key": "key-2", "chunk_index": 1, "summary": "second"}
+
+
+def test_load_ignores_a_torn_last_line(runs_dir):
+    checkpoint = RunCheckpoint("20260101-000000-aaaaaaaa")
+    checkpoint.record("key-1", {"chunk_index": 0, "summary": "first"})
+    with open(checkpoint.path, "a", encoding="utf-8") as f:
+        f.write('{"key": "key-2", "chunk_index": 1, "summ')  # server died mid-write
+
+    assert list(checkpoint.load()) == ["key-1"]
+    # The resumed run's entries start on a new line
+    checkpoint.record("key-2", {"chunk_index": 1, "summary": "second"})
+    assert RunCheckpoint("20260101-000000-aaaaaaaa").load()["key-2"]["summary"] == "second"
+
+
+def test_load_of_a_new_run_is_empty(runs_dir):
+    assert RunCheckpoint("20260101-000000-aaaaaaaa").load() == {}
+
+
+def test_latest_run_finds_the_newest_checkpointed_run_of_a_document(runs_dir):
+    for run_id, doc_id in [("20260101-000000-aaaaaaaa", "doc-a"), ("20260102-000000-bbbbbbbb", "doc-a"),
+                           ("20260103-000000-cccccccc", "doc-b")]:
+        save_manifest(run_id, f"{doc_id}.pdf", doc_id, "semantic")
+        RunCheckpoint(run_id).record("key", {"summary": "s"})
+    # Newer run of doc-a without a checkpoint (e.g. failed during extraction)
+    save_manifest("20260104-000000-dddddddd", "doc-a.pdf", "doc-a", "semantic")
+
+    assert latest_run("doc-a", runs_dir=runs_dir) == "20260102-000000-bbbbbbbb"
+    assert latest_run("doc-b", runs_dir=runs_dir) == "20260103-000000-cccccccc"
+    assert latest_run("doc-c", runs_dir=runs_dir) is None
+    assert load_manifest("20260102-000000-bbbbbbbb") == {"pdf_path": "doc-a.pdf", "doc_id": "doc-a",
+                                                         "chunking_method": "semantic"}
+
+
+def test_load_manifest_rejects_unknown_and_malformed_runs(runs_dir):
+    with pytest.raises(FileNotFoundError):
+        load_manifest("20260101-000000-aaaaaaaa")
+    with pytest.raises(ValueError):
+        load_manifest("../outside")
@@ -0,0 +1,111 @@
+"""Tests for the registry of cached document prefixes with the local backend (context_cache.py)."""
+
+import json
+
+import pytest
+
+import context_cache
+from context_cache import ContextCache, LocalContextBackend, is_cache_error, prefix_key
+
+DOCUMENT = "A long source document. " * 100  # about 600 estimated tokens
+PROMPT = "Summarize the document above."
+
+
+@pytest.fixture(autouse=True)
+def local_prefixes(monkeypatch):
+    prefixes = {}
+    monkeypatch.setattr(context_cache, "_LOCAL_PREFIXES", prefixes)
+    return prefixes
+
+
+@pytest.fixture
+def registry_path(tmp_path):
+    return str(tmp_path / "context_caches.json")
+
+
+def make_cache(registry_path, backend=None, **kwargs):
+    kwargs.setdefault("min_tokens", 100)
+    return ContextCache(backend or LocalContextBackend(), registry_path=registry_path, **kwargs)
+
+
+def test_first_request_creates_the_cache_and_later_requests_hit_it(registry_path):
+    cache = make_cache(registry_path)
+    first = cache.request("gemini-a", DOCUMENT, PROMPT)
+    assert first["hit"] is False
+    assert first["contents"] == f"{DOCUMENT}\n\n{PROMPT}"
+
+    second = cache.request("gemini-a", DOCUMENT, "Another question.")
+    assert (second["cache"], second["hit"]) == (first["cache"], True)
+    assert cache.snapshot() == {"hits": 1, "created": 1, "skipped": 0, "failures": 0}
+
+    # Another server instance (same registry) reuses the cache as well
+    assert make_cache(registry_path).request("gemini-a", DOCUMENT, PROMPT)["cache"] == first["cache"]
+
+
+def test_caches_are_per_model_and_document(registry_path):
+    cache = make_cache(registry_path)
+    names = {cache.request(model, document, PROMPT)["cache"]
+             for model in ("gemini-a", "gemini-b") for document in (DOCUMENT, DOCUMENT + "Revised.")}
+    assert len(names) == 4
+    with open(registry_path, "r", encoding="utf-8") as f:
+        assert set(json.load(f)) == {prefix_key(model, document) for model in ("gemini-a", "gemini-b")
+                                     for document in (DOCUMENT, DOCUMENT + "Revised.")}
+
+
+def test_short_documents_are_not_cached(registry_path):
+    cache = make_cache(registry_path, min_tokens=10000)
+    assert cache.request("gemini-a", DOCUMENT, PROMPT) is None
+    assert cache.snapshot()["skipped"] == 1
+
+
+def test_caches_close_to_expiry_are_recreated(registry_path):
+    # Shorter than the expiry margin: every lookup finds the cache about to expire
+    cache = make_cache(registry_path, ttl_seconds=context_cache.EXPIRY_MARGIN_SECONDS - 1)
+    first = cache.request("gemini-a", DOCUMENT, PROMPT)
+    second = cache.request("gemini-a", DOCUMENT, PROMPT)
+    assert second["cache"] != first["cache"] and second["hit"] is False
+    assert cache.snapshot()["created"] == 2
+
+
+def test_failed_creation_falls_back_to_uncached_requests(registry_path):
+    class UnsupportedModel(LocalContextBackend):
+        calls = 0
+
+        def create(self, model, document, ttl_seconds, display_name):
+            UnsupportedModel.calls += 1
+            raise RuntimeError("model does not support caching")
+
+    cache = make_cache(registry_path, backend=UnsupportedModel())
+    assert cache.request("gemini-a", DOCUMENT, PROMPT) is None
+    assert cache.request("gemini-a", DOCUMENT, PROMPT) is None
+    # Not retried for the same prefix
+    assert UnsupportedModel.calls == 1
+    assert cache.snapshot()["failures"] == 1
+
+
+def test_local_cache_of_another_process_is_recreated(registry_path, local_prefixes):
+    first = make_cache(registry_path).request("gemini-a", DOCUMENT, PROMPT)
+    local_prefixes.clear()  # the process that created it is gone
+
+    cache = make_cache(registry_path)
+    request = cache.request("gemini-a", DOCUMENT, PROMPT)
+    assert request["cache"] != first["cache"]
+    assert request["contents"] == f"{DOCUMENT}\n\n{PROMPT}"
+
+
+def test_invalidate_forgets_the_cache(registry_path):
+    cache = make_cache(registry_path)
+    first = cache.request("gemini-a", DOCUMENT, PROMPT)
+    cache.invalidate("gemini-a", DOCUMENT)
+    assert cache.request("gemini-a", DOCUMENT, PROMPT)["cache"] != first["cache"]
+
+
+def test_documents_with_lone_surrogates_can_be_cached(registry_path):
+    document = DOCUMENT + "damaged \ud800 text"
+    assert make_cache(registry_path).request("gemini-a", document, PROMPT) is not None
+
+
+def test_is_cache_error():
+    assert is_cache_error(RuntimeError("404 NOT_FOUND: CachedContent not found"))
+    assert is_cache_error(RuntimeError("Invalid cached_content name"))
+    assert not is_cache_error(RuntimeError("429 RESOURCE_EXHAUSTED"))
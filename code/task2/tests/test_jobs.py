@@ -0,0 +1,147 @@
+"""Tests for the background job queue (jobs.py)."""
+
+import json
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+import jobs
+from jobs import CANCEL_FLAG, Job, JobQueue
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def read_state(queue, job_id):
+    with open(os.path.join(queue.job_dir, job_id, "job.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture(autouse=True)
+def fast_heartbeat(monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_HEARTBEAT_SECONDS", 0.05)
+    monkeypatch.setattr(jobs, "JOB_STALE_SECONDS", 0.5)
+
+
+def test_job_result_and_partials_survive_a_restart(tmp_path):
+    queue = JobQueue(job_dir=str(tmp_path))
+
+    def run(job):
+        queue.update(job, stage="summarizing", chunks_total=2)
+        for i in range(2):
+            queue.add_partial(job, {"chunk_index": i, "summary": f"summary {i}"})
+            queue.update(job, chunks_done=i + 1)
+        return {"combined_summary": "done"}
+
+    job = queue.submit("summarize_pdf", {"pdf_path": "a.pdf"}, run)
+    assert wait_for(lambda: read_state(queue, job.job_id)["status"] == jobs.SUCCEEDED)
+
+    # A new queue (e.g. after a server restart) reads the state from disk
+    restarted = JobQueue(job_dir=str(tmp_path))
+    reloaded = restarted.get(job.job_id)
+    assert reloaded.status == jobs.SUCCEEDED
+    assert (reloaded.chunks_done, reloaded.chunks_total) == (2, 2)
+    assert reloaded.to_dict()["progress"] == 1.0
+    assert restarted.result(job.job_id) == {"combined_summary": "done"}
+    assert [p["chunk_index"] for p in restarted.partial(job.job_id)] == [0, 1]
+    assert restarted.partial(job.job_id, offset=1, limit=1) == [{"chunk_index": 1, "summary": "summary 1"}]
+
+
+def test_failing_job_records_its_error(tmp_path):
+    queue = JobQueue(job_dir=str(tmp_path))
+
+    def run(job):
+        raise RuntimeError("extraction failed")
+
+    job = queue.submit("summarize_pdf", {}, run)
+    assert wait_for(lambda: read_state(queue, job.job_id)["status"] == jobs.FAILED)
+    assert read_state(queue, job.job_id)["error"] == "extraction failed"
+    assert queue.result(job.job_id) is None
+
+
+def test_cancel_running_and_queued_jobs(tmp_path):
+    queue = JobQueue(job_dir=str(tmp_path), max_workers=1)
+    started = threading.Event()
+
+    def run(job):
+        started.set()
+        while True:
+            job.check_cancelled()
+            time.sleep(0.01)
+
+    running = queue.submit("summarize_pdf", {}, run)
+    queued = queue.submit("summarize_pdf", {}, run)
+    assert started.wait(5)
+    assert queue.get(queued.job_id).status == jobs.QUEUED
+
+    assert queue.cancel(queued.job_id).status == jobs.CANCELLED
+    queue.cancel(running.job_id)
+    assert wait_for(lambda: read_state(queue, running.job_id)["status"] == jobs.CANCELLED)
+    # The cancelled queued job never runs
+    time.sleep(0.1)
+    assert read_state(queue, queued.job_id)["status"] == jobs.CANCELLED
+    assert read_state(queue, queued.job_id)["started_at"] is None
+
+
+def test_cancel_from_another_worker_goes_through_the_flag_file(tmp_path):
+    owner = JobQueue(job_dir=str(tmp_path))
+    other_worker = JobQueue(job_dir=str(tmp_path))
+    release = threading.Event()
+
+    def run(job):
+        while not release.is_set():
+            job.check_cancelled()
+            time.sleep(0.01)
+        return {}
+
+    job = owner.submit("summarize_pdf", {}, run)
+    # Pretend the job belongs to another live process (the parent of this one)
+    job.owner_pid = os.getppid()
+    assert wait_for(lambda: read_state(owner, job.job_id)["owner_pid"] == os.getppid())
+
+    seen = other_worker.get(job.job_id)
+    assert seen.status == jobs.RUNNING
+    other_worker.cancel(job.job_id)
+    assert os.path.exists(os.path.join(str(tmp_path), job.job_id, CANCEL_FLAG))
+
+    # The owner applies the flag at its next heartbeat
+    assert wait_for(lambda: job.status == jobs.CANCELLED)
+    assert wait_for(lambda: other_worker.get(job.job_id).status == jobs.CANCELLED)
+    release.set()
+
+
+def test_job_of_a_stopped_owner_is_reported_interrupted(tmp_path):
+    queue = JobQueue(job_dir=str(tmp_path))
+
+    def persist(job_id, heartbeat_at, owner_host="other-host"):
+        job = Job(job_id, "summarize_pdf", {})
+        job.status, job.owner_host, job.heartbeat_at = jobs.RUNNING, owner_host, heartbeat_at
+        os.makedirs(os.path.join(str(tmp_path), job_id))
+        with open(os.path.join(str(tmp_path), job_id, "job.json"), "w", encoding="utf-8") as f:
+            json.dump(job.to_dict(), f)
+
+    persist("fresh-job", time.time())
+    persist("stale-job", time.time() - 60)
+    # Left running by an earlier server that had this process's pid
+    persist("restarted-job", time.time(), owner_host=socket.gethostname())
+    assert queue.get("fresh-job").status == jobs.RUNNING
+    assert queue.get("stale-job").status == jobs.INTERRUPTED
+    assert queue.get("restarted-job").status == jobs.INTERRUPTED
+
+
+def test_get_rejects_malformed_and_unknown_ids(tmp_path):
+    queue = JobQueue(job_dir=str(tmp_path))
+    with pytest.raises(ValueError):
+        queue.get("../etc")
+    with pytest.raises(FileNotFoundError):
+        queue.get("20260101-000000-deadbeef")
+    assert queue.partial("20260101-000000-deadbeef") == []
@@ -0,0 +1,127 @@
+"""Tests for batch execution with the local batch backend (llm_backends.py)."""
+
+import threading
+
+import pytest
+
+import llm_backends
+from llm_backends import BatchCancelled, BatchCollector, LocalBatchBackend, run_batch_requests
+
+
+def make_requests(count, model="gemini-a"):
+    return [{"model": model, "system_prompt": "Summarize.", "user_prompt": f"Chunk:\n\nSentence {i}. More."}
+            for i in range(count)]
+
+
+class RecordingBackend(LocalBatchBackend):
+    """Local backend that records the size of every job it creates."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created = []
+
+    def create(self, model, requests, display_name):
+        self.created.append((model, len(requests), display_name))
+        return super().create(model, requests, display_name)
+
+
+def test_responses_come_back_in_request_order_across_models():
+    backend = RecordingBackend(generate=lambda request: request["user_prompt"].split("\n\n")[1])
+    requests = make_requests(3, "gemini-b") + make_requests(2, "gemini-a")
+    responses = run_batch_requests(backend, requests, poll_seconds=0.01)
+
+    assert responses == [request["user_prompt"].split("\n\n")[1] for request in requests]
+    # One job per model
+    assert sorted((model, size) for model, size, _ in backend.created) == [("gemini-a", 2), ("gemini-b", 3)]
+
+
+def test_default_local_answer_is_the_leading_sentences():
+    request = {"model": "m", "system_prompt": "s", "user_prompt": "Text:\n\nOne. Two? Three! Four."}
+    assert run_batch_requests(LocalBatchBackend(), [request], poll_seconds=0.01) == ["One. Two? Three!"]
+
+
+def test_failed_request_becomes_an_exception_in_its_slot():
+    def generate(request):
+        if "Sentence 1." in request["user_prompt"]:
+            raise ValueError("blocked")
+        return "ok"
+
+    responses = run_batch_requests(LocalBatchBackend(generate=generate), make_requests(3), poll_seconds=0.01)
+    assert responses[0] == responses[2] == "ok"
+    assert isinstance(responses[1], RuntimeError) and "blocked" in str(responses[1])
+
+
+def test_large_request_lists_are_split_into_several_jobs(monkeypatch):
+    monkeypatch.setattr(llm_backends, "BATCH_MAX_REQUESTS", 4)
+    backend = RecordingBackend()
+    responses = run_batch_requests(backend, make_requests(10), display_name="doc", poll_seconds=0.01)
+
+    assert len(responses) == 10 and all(isinstance(response, str) for response in responses)
+    assert [(size, name) for _, size, name in backend.created] == [(4, "doc-1"), (4, "doc-2"), (2, "doc-3")]
+
+
+def test_unfinished_jobs_time_out_and_are_cancelled():
+    backend = LocalBatchBackend(latency=5)
+    responses = run_batch_requests(backend, make_requests(2), poll_seconds=0.01, timeout=0.1)
+
+    assert all(isinstance(response, RuntimeError) and "timed out" in str(response) for response in responses)
+    assert all(job["state"] == "JOB_STATE_CANCELLED" for job in backend._jobs.values())
+
+
+def test_cancel_event_cancels_the_jobs():
+    backend = LocalBatchBackend(latency=5)
+    cancel_event = threading.Event()
+    threading.Timer(0.1, cancel_event.set).start()
+    with pytest.raises(BatchCancelled):
+        run_batch_requests(backend, make_requests(2), poll_seconds=0.01, cancel_event=cancel_event)
+    assert all(job["state"] == "JOB_STATE_CANCELLED" for job in backend._jobs.values())
+
+
+def run_documents(collector, documents):
+    """Hand in each document's requests from its own thread, like run_batch's document workers."""
+    results = {}
+
+    def run(key, requests):
+        results[key] = collector.run(key, requests)
+
+    threads = [threading.Thread(target=run, args=item) for item in documents.items()]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    return results
+
+
+def test_collector_pools_the_documents_into_one_submission():
+    backend = RecordingBackend(generate=lambda request: request["user_prompt"])
+    documents = {f"doc{i}.pdf": make_requests(i + 1) for i in range(3)}
+    collector = BatchCollector(backend, list(documents) + ["empty.pdf", "broken.pdf"],
+                               linger_seconds=10, poll_seconds=0.01)
+    collector.done("broken.pdf")  # e.g. failed extraction
+    documents["empty.pdf"] = []
+
+    results = run_documents(collector, documents)
+    for key, requests in documents.items():
+        assert results[key] == [request["user_prompt"] for request in requests]
+    assert len(backend.created) == 1
+    assert collector.snapshot() == {"submissions": 1, "documents": 3, "requests": 6}
+
+
+def test_collector_submits_full_groups_without_waiting_for_the_rest():
+    backend = RecordingBackend()
+    documents = {f"doc{i}.pdf": make_requests(2) for i in range(4)}
+    # doc9.pdf never hands in its requests
+    collector = BatchCollector(backend, list(documents) + ["doc9.pdf"], max_documents=2,
+                               linger_seconds=10, poll_seconds=0.01)
+
+    results = run_documents(collector, documents)
+    assert all(len(results[key]) == 2 for key in documents)
+    assert collector.snapshot() == {"submissions": 2, "documents": 4, "requests": 8}
+
+
+def test_collector_submits_after_the_linger_time():
+    collector = BatchCollector(LocalBatchBackend(), ["doc1.pdf", "doc2.pdf"], linger_seconds=0.1,
+                               poll_seconds=0.01)
+    results = run_documents(collector, {"doc1.pdf": make_requests(2)})
+    assert len(results["doc1.pdf"]) == 2
+    assert collector.snapshot()["submissions"] == 1
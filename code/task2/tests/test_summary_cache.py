@@ -0,0 +1,109 @@
+"""Tests for the content-addressed summary cache and the cached reduce tree (summary_cache.py)."""
+
+import pytest
+
+from summary_cache import SummaryCache, content_key, hierarchical_reduce
+
+
+class Combiner:
+    """combine() stand-in that records the node texts it was asked to summarize."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, text, final):
+        self.calls.append((text, final))
+        return f"{'final' if final else 'node'}({len(text)})"
+
+
+def chunk_summaries(count, changed=None, inserted=None):
+    summaries = [(str(i), f"summary of chunk {i}", True) for i in range(1, count + 1)]
+    if changed is not None:
+        summaries[changed] = (summaries[changed][0], "a revised summary", True)
+    if inserted is not None:
+        summaries.insert(inserted, ("new", "summary of an inserted chunk", True))
+    return summaries
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SummaryCache(cache_dir=str(tmp_path), enabled=True)
+
+
+def test_content_key_depends_on_text_and_params():
+    key = content_key("text", prompt="v1", model="m")
+    assert key == content_key("text", model="m", prompt="v1")
+    assert key != content_key("text", prompt="v2", model="m")
+    assert key != content_key("other text", prompt="v1", model="m")
+    # Lone surrogates from damaged PDF text can be hashed
+    assert content_key("bad \ud800 text")
+
+
+def test_cache_put_get_and_disabled(tmp_path, cache):
+    cache.put("ab" * 32, {"summary": "s"})
+    assert cache.get("ab" * 32) == {"summary": "s"}
+    assert cache.get("cd" * 32) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    disabled = SummaryCache(cache_dir=str(tmp_path), enabled=False)
+    disabled.put("ef" * 32, {"summary": "s"})
+    assert disabled.get("ab" * 32) is None
+
+
+def test_few_summaries_are_combined_in_one_root_node(cache):
+    combine = Combiner()
+    summary, stats = hierarchical_reduce(chunk_summaries(3), combine, cache, fan_in=4, model="m")
+    assert summary.startswith("final") and combine.calls[0][1] is True
+    assert combine.calls[0][0].startswith("Section 1: summary of chunk 1\n\nSection 2:")
+    assert (stats["levels"], stats["nodes"], stats["reused_nodes"]) == (1, 1, 0)
+
+
+def test_unchanged_document_reuses_every_node(cache):
+    first = Combiner()
+    summary, stats = hierarchical_reduce(chunk_summaries(40), first, cache, fan_in=4, model="m")
+    assert stats["levels"] > 1 and stats["reused_nodes"] == 0
+
+    again = Combiner()
+    repeated, stats = hierarchical_reduce(chunk_summaries(40), again, cache, fan_in=4, model="m")
+    assert repeated == summary
+    assert again.calls == []
+    assert stats["reused_nodes"] == stats["nodes"]
+
+
+def test_changed_chunk_recomputes_only_its_branch(cache):
+    hierarchical_reduce(chunk_summaries(40), Combiner(), cache, fan_in=4, model="m")
+
+    combine = Combiner()
+    _, stats = hierarchical_reduce(chunk_summaries(40, changed=20), combine, cache, fan_in=4, model="m")
+    assert 0 < len(combine.calls) == len(stats["recomputed_nodes"]) < stats["nodes"]
+    assert stats["reused_nodes"] == stats["nodes"] - len(combine.calls)
+    # One recomputed node per level, ending at the root
+    assert len(combine.calls) == stats["levels"]
+    assert combine.calls[-1][1] is True
+
+
+def test_inserted_chunk_only_changes_the_groups_around_it(cache):
+    _, before = hierarchical_reduce(chunk_summaries(60), Combiner(), cache, fan_in=4, model="m")
+
+    combine = Combiner()
+    _, stats = hierarchical_reduce(chunk_summaries(60, inserted=5), combine, cache, fan_in=4, model="m")
+    # Content-defined groups: the groups after the insertion point are unchanged
+    assert stats["reused_nodes"] >= before["nodes"] // 2
+    assert len(combine.calls) <= 2 * stats["levels"]
+
+
+def test_nodes_over_failed_chunks_are_not_cached(cache):
+    summaries = chunk_summaries(3)
+    summaries[1] = ("2", "[chunk 2 failed]", False)
+    hierarchical_reduce(summaries, Combiner(), cache, fan_in=4, model="m")
+
+    combine = Combiner()
+    _, stats = hierarchical_reduce(summaries, combine, cache, fan_in=4, model="m")
+    assert len(combine.calls) == 1 and stats["reused_nodes"] == 0
+
+
+def test_reduce_params_are_part_of_the_node_keys(cache):
+    hierarchical_reduce(chunk_summaries(3), Combiner(), cache, fan_in=4, model="m", max_length="short")
+    combine = Combiner()
+    hierarchical_reduce(chunk_summaries(3), combine, cache, fan_in=4, model="m", max_length="long")
+    assert len(combine.calls) == 1
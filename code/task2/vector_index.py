@@ -0,0 +1,208 @@
+"""
+In-process vector index over PDF chunks, persisted per document hash.
+
+summarize_pdf already embeds every sentence window to find chunk breakpoints;
+the index stores one vector per chunk (the normalized mean of its sentence
+embeddings), so an agent can retrieve the few chunks that answer a question
+instead of summarizing the whole document.
+
+Vectors are unit-normalized float32, so cosine similarity is a dot product.
+Small indexes are searched brute force with one matrix-vector product; indexes
+with IVF_MIN_VECTORS or more chunks also get an inverted file (k-means
+centroids), and a query only scans the lists of its IVF_PROBES nearest
+centroids. Each document is stored under output/indexes/<doc_id>/, where
+doc_id is a hash of the PDF bytes, so re-uploads of the same file reuse it.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+INDEX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "indexes")
+IVF_MIN_VECTORS = 4096
+IVF_PROBES = 8
+KMEANS_ITERATIONS = 10
+CACHE_SIZE = 8
+
+_SENTENCE_SPLIT_REGEX = r"(?<=[.?!])\s+"
+_cache: "OrderedDict[str, DocumentIndex]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def document_id(pdf_path: str) -> str:
+    """Content hash of a file, used as its index id."""
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:24]
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length (zero rows stay zero)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def pool_embeddings(embeddings: np.ndarray, counts: List[int]) -> np.ndarray:
+    """
+    Mean-pool consecutive rows into one normalized vector per group.
+
+    Args:
+        embeddings: (n, dim) sentence embeddings in document order
+        counts: Number of consecutive rows in each group (sums to n)
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+    sums = np.add.reduceat(embeddings, starts, axis=0)
+    return normalize(sums / np.asarray(counts, dtype=np.float32)[:, None])
+
+
+def embed_chunks(encode: Callable[[List[str]], np.ndarray], chunks: List[str]) -> np.ndarray:
+    """
+    Embed chunks as the mean of their sentence embeddings.
+
+    Embedding models truncate long inputs (all-MiniLM-L6-v2 at 256 tokens), so
+    a whole-chunk embedding would only describe its beginning; sentences are
+    encoded in one batched call instead and pooled per chunk.
+
+    Args:
+        encode: Encodes a list of texts to an (n, dim) array
+        chunks: Chunk texts
+    """
+    sentences, counts = [], []
+    for chunk in chunks:
+        parts = [s for s in re.split(_SENTENCE_SPLIT_REGEX, chunk) if s.strip()] or [chunk]
+        sentences.extend(parts)
+        counts.append(len(parts))
+    return pool_embeddings(encode(sentences), counts)
+
+
+def _kmeans(vectors: np.ndarray, num_lists: int, iterations: int = KMEANS_ITERATIONS,
+            seed: int = 0) -> np.ndarray:
+    """Spherical k-means: centroids of unit vectors, compared by dot product."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), num_lists, replace=False)]
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        empty = np.bincount(assignments, minlength=num_lists) == 0
+        # Re-seed empty lists with random vectors instead of dropping them
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = normalize(sums)
+    return centroids
+
+
+class DocumentIndex:
+    """
+    Chunk vectors and texts of one document.
+
+    Args:
+        doc_id: Document hash
+        vectors: (num_chunks, dim) embeddings (normalized on construction)
+        chunks: Chunk texts
+        metadata: Per-chunk metadata (e.g. chunk_info entries with pages)
+        info: Document-level fields (pdf_path, chunking_method, embedding_model)
+    """
+
+    def __init__(self, doc_id: str, vectors: np.ndarray, chunks: List[str],
+                 metadata: Optional[List[Dict]] = None, info: Optional[Dict] = None):
+        self.doc_id = doc_id
+        self.vectors = normalize(vectors)
+        self.chunks = chunks
+        self.metadata = metadata or [{} for _ in chunks]
+        self.info = info or {}
+        self.centroids = None
+        self.assignments = None
+        if len(chunks) >= IVF_MIN_VECTORS:
+            self.build_ivf()
+
+    def build_ivf(self, num_lists: Optional[int] = None) -> None:
+        """Cluster the vectors into inverted lists (about sqrt(n) lists)."""
+        num_lists = num_lists or max(1, int(np.sqrt(len(self.vectors))))
+        self.centroids = _kmeans(self.vectors, num_lists)
+        self.assignments = np.argmax(self.vectors @ self.centroids.T, axis=1)
+
+    def search(self, query_vector: np.ndarray, k: int = 5, probes: int = IVF_PROBES) -> List[Dict]:
+        """
+        Return the k chunks most similar to a query embedding.
+
+        Returns:
+            list[dict]: {"chunk_number" (1-based), "score", "text", **metadata}, best first
+        """
+        query = normalize(query_vector).reshape(-1)
+        if self.centroids is not None:
+            lists = np.argsort(-(self.centroids @ query))[:probes]
+            candidates = np.flatnonzero(np.isin(self.assignments, lists))
+        else:
+            candidates = np.arange(len(self.vectors))
+        if len(candidates) == 0:
+            return []
+        scores = self.vectors[candidates] @ query
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            {**self.metadata[candidates[i]], "chunk_number": int(candidates[i]) + 1,
+             "score": round(float(scores[i]), 4), "text": self.chunks[candidates[i]]}
+            for i in top
+        ]
+
+    def save(self, index_dir: str = INDEX_DIR) -> str:
+        """Write the index to <index_dir>/<doc_id>/ and return that directory."""
+        path = os.path.join(index_dir, self.doc_id)
+        os.makedirs(path, exist_ok=True)
+        arrays = {"vectors": self.vectors}
+        if self.centroids is not None:
+            arrays.update(centroids=self.centroids, assignments=self.assignments)
+        np.savez(os.path.join(path, "vectors.npz"), **arrays)
+        with open(os.path.join(path, "chunks.json"), "w", encoding="utf-8") as f:
+            json.dump({"info": self.info, "chunks": self.chunks, "metadata": self.metadata},
+                      f, ensure_ascii=False)
+        with _cache_lock:
+            _cache[self.doc_id] = self
+            _cache.move_to_end(self.doc_id)
+            if len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+        return path
+
+    @classmethod
+    def load(cls, doc_id: str, index_dir: str = INDEX_DIR) -> "DocumentIndex":
+        """
+        Load a saved index (cached in memory for repeated queries).
+
+        Raises:
+            ValueError: If doc_id is malformed
+            FileNotFoundError: If the document has not been indexed
+        """
+        if not doc_id or not all(c in "0123456789abcdef" for c in doc_id):
+            raise ValueError(f"Invalid doc_id: {doc_id}")
+        with _cache_lock:
+            if doc_id in _cache:
+                _cache.move_to_end(doc_id)
+                return _cache[doc_id]
+        path = os.path.join(index_dir, doc_id)
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"No index for doc_id {doc_id}")
+        with open(os.path.join(path, "chunks.json"), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        arrays = np.load(os.path.join(path, "vectors.npz"))
+        index = cls.__new__(cls)
+        index.doc_id = doc_id
+        index.vectors = arrays["vectors"]
+        index.chunks = data["chunks"]
+        index.metadata = data["metadata"]
+        index.info = data["info"]
+        index.centroids = arrays["centroids"] if "centroids" in arrays else None
+        index.assignments = arrays["assignments"] if "assignments" in arrays else None
+        with _cache_lock:
+            _cache[doc_id] = index
+        return index
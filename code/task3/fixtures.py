@@ -0,0 +1,224 @@
+"""
+Offline Fixtures
+Saved article snapshots for reproducible, network-free task3 runs.
+
+`fixtures/index.json` maps page URLs to HTML files in `fixtures/`. In offline
+mode the scraper serves those files through Playwright route interception
+and aborts every other request, and the MCP server summarizes with a local
+stand-in (SUMMARY_BACKEND=local: the leading sentences of the text) instead of
+Gemini, so timings measure the scraper and the MCP round trips only, not
+Wikipedia, the LLM or network variance. Set SUMMARY_BACKEND=gemini to time
+live summaries against the fixtures.
+
+The bundled Artificial_intelligence.html is a small synthetic page (about
+50 lines) with the same structure as the live article, so the code paths can
+run offline. It is far smaller than the live article and is not a
+performance baseline: bench warns and flags synthetic fixtures in its
+results. Record a real snapshot to benchmark with a realistic page size:
+
+    python fixtures.py record https://en.wikipedia.org/wiki/Artificial_intelligence
+    python fixtures.py bench --runs 20 --section History
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+INDEX_FILE = os.path.join(FIXTURES_DIR, "index.json")
+# Marker comment of hand-written fixtures (recorded snapshots never contain it)
+SYNTHETIC_MARKER = "Synthetic offline fixture"
+
+
+def load_fixtures(fixtures_dir=FIXTURES_DIR):
+    """
+    Load the URL-to-snapshot map.
+
+    Returns:
+        dict: {url: absolute path of the HTML snapshot}
+    """
+    with open(os.path.join(fixtures_dir, "index.json"), "r", encoding="utf-8") as f:
+        index = json.load(f)
+    return {url: os.path.join(fixtures_dir, filename) for url, filename in index.items()}
+
+
+def synthetic_fixtures(fixtures):
+    """Return the URLs whose snapshot is a hand-written synthetic page rather than a recording."""
+    synthetic = []
+    for url, path in fixtures.items():
+        with open(path, "r", encoding="utf-8") as f:
+            if SYNTHETIC_MARKER in f.read(4096):
+                synthetic.append(url)
+    return synthetic
+
+
+def warn_synthetic(fixtures):
+    """Print a warning if any fixture is synthetic; return the synthetic URLs."""
+    synthetic = synthetic_fixtures(fixtures)
+    if synthetic:
+        print("\n" + "!"*80, file=sys.stderr)
+        print(f"[WARNING] {len(synthetic)} of {len(fixtures)} fixture(s) are synthetic placeholder pages, "
+              "far smaller than the live articles:", file=sys.stderr)
+        for url in synthetic:
+            print(f"  {url}", file=sys.stderr)
+        print("Timings are NOT a realistic baseline. Record real snapshots first:\n"
+              "  python fixtures.py record URL", file=sys.stderr)
+        print("!"*80 + "\n", file=sys.stderr)
+    return synthetic
+
+
+def use_offline_summarizer():
+    """
+    Make the MCP servers started from now on summarize without Gemini.
+
+    An explicit SUMMARY_BACKEND is kept. Returns the backend in use.
+    """
+    return os.environ.setdefault("SUMMARY_BACKEND", "local")
+
+
+def route_fixtures(page, fixtures=None):
+    """
+    Serve fixtures on a sync Playwright page (or context) and abort everything else.
+
+    Lets the sync test scripts run offline:
+        route_fixtures(page)
+        page.goto("https://en.wikipedia.org/wiki/Artificial_intelligence")
+    """
+    fixtures = load_fixtures() if fixtures is None else fixtures
+
+    def handle(route):
+        fixture = fixtures.get(route.request.url)
+        if fixture:
+            route.fulfill(path=fixture, content_type="text/html; charset=utf-8")
+        else:
+            route.abort()
+
+    page.route("**/*", handle)
+
+
+async def record_snapshot(url, fixtures_dir=FIXTURES_DIR, browser_type="firefox"):
+    """
+    Save the rendered HTML of a live page and add it to the index.
+
+    Returns:
+        str: Path of the saved snapshot
+    """
+    from playwright.async_api import async_playwright
+
+    filename = re.sub(r"[^A-Za-z0-9_.-]+", "_", url.rstrip("/").rsplit("/", 1)[-1]) + ".html"
+    path = os.path.join(fixtures_dir, filename)
+    async with async_playwright() as p:
+        browser = await getattr(p, browser_type).launch(headless=True)
+        try:
+            page = await browser.new_page()
+            await page.goto(url, wait_until="networkidle", timeout=60000)
+            html = await page.content()
+        finally:
+            await browser.close()
+
+    os.makedirs(fixtures_dir, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
+
+    index_file = os.path.join(fixtures_dir, "index.json")
+    index = {}
+    if os.path.exists(index_file):
+        with open(index_file, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    index[url] = filename
+    with open(index_file, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+        f.write("\n")
+
+    print(f"[Fixtures] Saved {url} ({len(html)} chars) to {path}")
+    return path
+
+
+async def benchmark(runs=10, section=None, concurrency=4, pool_size=2, summarize=True, max_length="short"):
+    """
+    Time the scraper and the summarization pipeline against the fixtures.
+
+    Every fixture URL is scraped `runs` times. The scrape-only pass measures
+    the browser side; the pipeline pass adds call_mcp_summarize over a server
+    pool (skipped with summarize=False), with the offline summarizer unless
+    SUMMARY_BACKEND is set.
+
+    Returns:
+        dict: {"scrape": {...}, "pipeline": {...} or None, "summary_backend": ...,
+               "synthetic_fixtures": [urls]}
+    """
+    from scraper import AsyncScraper
+
+    summary_backend = use_offline_summarizer()
+    fixtures = load_fixtures()
+    synthetic = warn_synthetic(fixtures)
+    urls = [url for url in fixtures for _ in range(runs)]
+
+    start = time.perf_counter()
+    page_times = []
+    async with AsyncScraper(concurrency=concurrency, fixtures=fixtures) as scraper:
+        startup = time.perf_counter() - start
+        scrape_start = time.perf_counter()
+        async for document in scraper.scrape_many(urls, section=section):
+            if document["error"]:
+                print(f"[ERROR] {document['url']}: {document['error']}", file=sys.stderr)
+            page_times.append(document["elapsed"])
+        scrape_seconds = time.perf_counter() - scrape_start
+
+    page_times.sort()
+    scrape = {
+        "pages": len(page_times),
+        "startup_seconds": round(startup, 3),
+        "total_seconds": round(scrape_seconds, 3),
+        "pages_per_second": round(len(page_times) / scrape_seconds, 2) if scrape_seconds else None,
+        "median_page_seconds": round(page_times[len(page_times) // 2], 4) if page_times else None,
+        "max_page_seconds": round(page_times[-1], 4) if page_times else None,
+    }
+    print("\n" + "="*80)
+    print("OFFLINE SCRAPE BENCHMARK:")
+    print("="*80)
+    for key, value in scrape.items():
+        print(f"{key}: {value}")
+
+    pipeline_metrics = None
+    if summarize:
+        from pipeline import run_pipeline, print_metrics
+        output = await run_pipeline(urls, section=section, concurrency=concurrency, pool_size=pool_size,
+                                    max_length=max_length, scraper_options={"fixtures": fixtures})
+        pipeline_metrics = output["metrics"]
+        print(f"\nSummary backend: {summary_backend}")
+        print_metrics(pipeline_metrics)
+
+    if synthetic:
+        warn_synthetic(fixtures)
+    return {"scrape": scrape, "pipeline": pipeline_metrics, "summary_backend": summary_backend,
+            "synthetic_fixtures": synthetic}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record and benchmark offline task3 fixtures")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="Save live pages as fixtures")
+    record.add_argument("urls", nargs="+", help="Page URLs")
+
+    bench = commands.add_parser("bench", help="Time scraping and summarization against the fixtures")
+    bench.add_argument("--runs", type=int, default=10, help="Scrapes per fixture URL")
+    bench.add_argument("--section", help="Section title to extract (default: whole article)")
+    bench.add_argument("--concurrency", type=int, default=4, help="Pages loading at the same time")
+    bench.add_argument("--pool-size", type=int, default=2, help="MCP servers (concurrent summaries)")
+    bench.add_argument("--no-summarize", action="store_true", help="Only time the scraper")
+    bench.add_argument("--max-length", default="short", choices=["short", "medium", "long"])
+
+    args = parser.parse_args()
+    if args.command == "record":
+        for url in args.urls:
+            asyncio.run(record_snapshot(url))
+    else:
+        asyncio.run(benchmark(runs=args.runs, section=args.section, concurrency=args.concurrency,
+                              pool_size=args.pool_size, summarize=not args.no_summarize,
+                              max_length=args.max_length))
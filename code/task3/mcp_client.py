@@ -1,80 +1,332 @@
 """
 MCP Client Module
 Handles communication with the MCP summarization server.
+
+`MCPServerPool` keeps a set of warm `summarization_server.py` processes with
+initialized sessions, so repeated summarizations do not pay a process start,
+`initialize()` and `list_tools()` per call. Crashed workers are replaced and
+idle workers are health-checked with MCP pings.
 """
 
 import json
 import asyncio
+import datetime
+import os
+import sys
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
 
-async def call_mcp_summarize(text):
+# Get the absolute path to the server script
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "summarization_server.py")
+# Forwarded to the server processes, which otherwise only inherit a minimal
+# environment (their .env file still supplies GOOGLE_API_KEY)
+SERVER_ENV_VARS = ("SUMMARY_BACKEND",)
+
+
+def _server_env():
+    """Environment overrides for the server processes (None: the stdio client default)."""
+    env = {name: os.environ[name] for name in SERVER_ENV_VARS if name in os.environ}
+    return env or None
+
+
+class _PooledServer:
+    """One server process plus its initialized ClientSession."""
+
+    def __init__(self, worker_id, server_params):
+        self.worker_id = worker_id
+        self.server_params = server_params
+        self.session = None
+        self.tool_names = []
+        self.error = None
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task = None
+
+    @property
+    def alive(self):
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def start(self, timeout):
+        # The stdio/session context managers must be entered and exited in the same
+        # task, so each worker owns a long-lived task that holds them open
+        self._task = asyncio.create_task(self._serve(), name=f"mcp-worker-{self.worker_id}")
+        await asyncio.wait_for(self._ready.wait(), timeout)
+        if not self.alive:
+            raise RuntimeError(f"MCP worker {self.worker_id} failed to start: {self.error}")
+
+    async def _serve(self):
+        try:
+            async with stdio_client(self.server_params) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    tools = await session.list_tools()
+                    self.tool_names = [tool.name for tool in tools.tools]
+                    self.session = session
+                    self._ready.set()
+                    await self._stop.wait()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def ping(self, timeout):
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout)
+            return True
+        except Exception:
+            return False
+
+    async def stop(self, timeout=10):
+        self._stop.set()
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except (asyncio.TimeoutError, Exception):
+            self._task.cancel()
+
+
+class MCPServerPool:
+    """
+    Pool of warm MCP server processes with pooled sessions.
+
+    Each worker serves one tool call at a time (the server runs tools
+    synchronously), so the pool size is the number of concurrent calls.
+
+    Usage:
+        async with MCPServerPool(size=4) as pool:
+            result = await pool.call_tool("summarize_text", {"text": text})
+    """
+
+    def __init__(self, size=2, server_script=SERVER_SCRIPT, call_timeout=300,
+                 start_timeout=120, health_check_interval=30):
+        """
+        Args:
+            size: Number of server processes to keep warm
+            server_script: Path to the MCP server script
+            call_timeout: Seconds to wait for a single tool call
+            start_timeout: Seconds to wait for a worker to initialize
+            health_check_interval: Seconds between pings of idle workers (0 disables)
+        """
+        self.size = size
+        self.server_params = StdioServerParameters(
+            command=sys.executable,  # Use the same Python interpreter
+            args=[server_script],
+            env=_server_env()
+        )
+        self.call_timeout = call_timeout
+        self.start_timeout = start_timeout
+        self.health_check_interval = health_check_interval
+        self.tool_names = []
+        self.stats = {"calls": 0, "failures": 0, "replaced_workers": 0}
+        self._workers = []
+        self._idle = None
+        self._next_worker_id = 0
+        self._health_task = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        """Start all workers concurrently and begin health checks."""
+        self._idle = asyncio.Queue()
+        workers = await asyncio.gather(*(self._spawn() for _ in range(self.size)))
+        for worker in workers:
+            self._idle.put_nowait(worker)
+        self.tool_names = workers[0].tool_names
+        print(f"\n[MCP Pool] {self.size} server(s) ready. Available tools: {self.tool_names}")
+        if self.health_check_interval:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self):
+        """Stop health checks and shut down every worker process."""
+        if self._health_task:
+            self._health_task.cancel()
+        await asyncio.gather(*(worker.stop() for worker in self._workers), return_exceptions=True)
+        self._workers = []
+
+    async def _spawn(self):
+        worker = _PooledServer(self._next_worker_id, self.server_params)
+        self._next_worker_id += 1
+        self._workers.append(worker)
+        await worker.start(self.start_timeout)
+        return worker
+
+    async def _replace(self, worker):
+        print(f"[MCP Pool] Replacing worker {worker.worker_id} ({worker.error or 'unhealthy'})", file=sys.stderr)
+        self.stats["replaced_workers"] += 1
+        if worker in self._workers:
+            self._workers.remove(worker)
+        await worker.stop(timeout=2)
+        return await self._spawn()
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            # Only idle workers are pinged: a busy server cannot answer until its tool returns
+            for _ in range(self._idle.qsize()):
+                try:
+                    worker = self._idle.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                try:
+                    if not worker.alive or not await worker.ping(timeout=10):
+                        worker = await self._replace(worker)
+                except Exception as e:
+                    print(f"[MCP Pool] Health check failed to replace worker: {e}", file=sys.stderr)
+                finally:
+                    self._idle.put_nowait(worker)
+
+    async def call_tool(self, name, arguments=None):
+        """
+        Call a tool on the next free worker.
+
+        If the worker has crashed or the transport fails, the worker is replaced
+        and the call is retried once on the fresh process.
+
+        Returns:
+            mcp.types.CallToolResult
+        """
+        self.stats["calls"] += 1
+        worker = await self._idle.get()
+        try:
+            for attempt in range(2):
+                try:
+                    if not worker.alive:
+                        worker = await self._replace(worker)
+                    return await worker.session.call_tool(
+                        name,
+                        arguments=arguments,
+                        read_timeout_seconds=datetime.timedelta(seconds=self.call_timeout)
+                    )
+                except Exception as e:
+                    worker.error = e
+                    if attempt == 1 or worker.alive:
+                        # Tool timeouts/errors on a live worker are not retried
+                        self.stats["failures"] += 1
+                        raise
+        finally:
+            self._idle.put_nowait(worker)
+
+
+def _print_summary(result_data):
+    # Print the summary
+    print("\n" + "="*80)
+    print("SUMMARY FROM MCP SERVER:")
+    print("="*80)
+    print(result_data["summary"])
+    print("="*80)
+    print(f"\nSummary length: {result_data['metadata']['summary_length']} characters")
+    print(f"Model used: {result_data['metadata']['model']}")
+    print(f"Compression ratio: {result_data['metadata']['input_length'] / result_data['metadata']['summary_length']:.2f}x")
+    print("\n[SUCCESS] Summarization complete!")
+
+
+async def call_mcp_summarize(text, pool=None, max_length="short", verbose=True):
     """
-    Create an MCP client and call the summarize_text tool from the MCP server.
-    
+    Call the summarize_text tool from the MCP server.
+
     Args:
         text: The text to summarize
+        pool: Optional MCPServerPool to reuse warm servers; without one, a
+              single-use server is started and shut down for this call
+        max_length: Desired summary length - 'short', 'medium', or 'long'
+        verbose: Print the summary and metadata
+
+    Returns:
+        dict: The parsed summarize_text result, or None on error
     """
     if not text:
         print("\n[ERROR] No text to summarize")
-        return
-    
-    print("\n" + "="*80)
-    print("CALLING MCP SERVER TO SUMMARIZE TEXT")
-    print("="*80)
-    
+        return None
+
+    if verbose:
+        print("\n" + "="*80)
+        print("CALLING MCP SERVER TO SUMMARIZE TEXT")
+        print("="*80)
+
     try:
-        # Define server parameters for the MCP server
-        import sys
-        import os
-        
-        # Get the absolute path to the server script
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        server_script = os.path.join(script_dir, "summarization_server.py")
-        
-        server_params = StdioServerParameters(
-            command=sys.executable,  # Use the same Python interpreter
-            args=[server_script],
-            env=None
-        )
-        
-        # Create and connect to the MCP server
-        async with stdio_client(server_params) as (read, write):
-            async with ClientSession(read, write) as session:
-                # Initialize the connection
-                await session.initialize()
-                
-                # List available tools
-                tools = await session.list_tools()
-                print(f"\n[MCP Client] Available tools: {[tool.name for tool in tools.tools]}")
-                
-                # Call the summarize_text tool
-                print(f"\n[MCP Client] Calling summarize_text tool with {len(text)} characters...")
-                result = await session.call_tool("summarize_text", arguments={
-                    "text": text,
-                    "max_length": "short"
-                })
-                
-                # Parse the result
-                result_data = json.loads(result.content[0].text)
-                
-                if "error" in result_data:
-                    print(f"\n[ERROR] Summarization failed: {result_data['error']}")
-                    return
-                
-                # Print the summary
-                print("\n" + "="*80)
-                print("SUMMARY FROM MCP SERVER:")
-                print("="*80)
-                print(result_data["summary"])
-                print("="*80)
-                print(f"\nSummary length: {result_data['metadata']['summary_length']} characters")
-                print(f"Model used: {result_data['metadata']['model']}")
-                print(f"Compression ratio: {result_data['metadata']['input_length'] / result_data['metadata']['summary_length']:.2f}x")
-                print("\n[SUCCESS] Summarization complete!")
-                
+        if pool is None:
+            async with MCPServerPool(size=1, health_check_interval=0) as single_pool:
+                return await call_mcp_summarize(text, pool=single_pool, max_length=max_length, verbose=verbose)
+
+        # Call the summarize_text tool
+        print(f"\n[MCP Client] Calling summarize_text tool with {len(text)} characters...")
+        result = await pool.call_tool("summarize_text", arguments={
+            "text": text,
+            "max_length": max_length
+        })
+
+        # Parse the result
+        result_data = json.loads(result.content[0].text)
+
+        if "error" in result_data:
+            print(f"\n[ERROR] Summarization failed: {result_data['error']}")
+            return None
+
+        if verbose:
+            _print_summary(result_data)
+        return result_data
+
     except Exception as e:
         print(f"\n[ERROR] MCP client error: {e}")
         import traceback
-        traceback.print_exc()
\ No newline at end of file
+        traceback.print_exc()
+        return None
+
+
+async def summarize_texts(texts, pool_size=4, max_length="short"):
+    """
+    Summarize many texts concurrently over a pool of warm MCP servers.
+
+    Args:
+        texts: List of texts to summarize
+        pool_size: Number of server processes (concurrent calls)
+        max_length: Desired summary length - 'short', 'medium', or 'long'
+
+    Returns:
+        list: summarize_text results (or None for failures), in input order
+    """
+    async with MCPServerPool(size=pool_size) as pool:
+        return await asyncio.gather(*(
+            call_mcp_summarize(text, pool=pool, max_length=max_length, verbose=False)
+            for text in texts
+        ))
+
+
+async def summarize_stream(documents, pool, max_length="short"):
+    """
+    Summarize documents from an async stream (e.g. AsyncScraper.scrape_many).
+
+    Summaries start as soon as each document arrives, so scraping and
+    summarization overlap; at most `pool.size` summaries run at a time.
+
+    Args:
+        documents: Async iterable of dicts with a "text" key
+        pool: Started MCPServerPool
+        max_length: Desired summary length - 'short', 'medium', or 'long'
+
+    Yields:
+        tuple: (document, summarize_text result or None), in completion order
+    """
+    async def summarize(document):
+        if not document.get("text"):
+            return document, None
+        return document, await call_mcp_summarize(document["text"], pool=pool, max_length=max_length, verbose=False)
+
+    pending = set()
+    async for document in documents:
+        pending.add(asyncio.create_task(summarize(document)))
+        # Hand over finished summaries without blocking the stream
+        done = {task for task in pending if task.done()}
+        pending -= done
+        for task in done:
+            yield task.result()
+    for task in asyncio.as_completed(pending):
+        yield await task
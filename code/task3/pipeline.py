@@ -0,0 +1,193 @@
+"""
+Scrape-to-Summary Pipeline
+Overlaps browsing with summarization using a producer/consumer queue.
+
+The producer scrapes pages with AsyncScraper and puts documents on a bounded
+asyncio.Queue; `pool_size` consumers take documents off the queue and
+summarize them over an MCPServerPool while the next pages are still loading.
+When the queue is full the producer waits, so a slow summarization stage
+applies back-pressure instead of buffering every page in memory. The browser
+and the MCP servers are also started concurrently.
+
+End-to-end time approaches max(scrape time, summarize time) instead of their
+sum; the printed metrics report both stage spans so the overlap is visible.
+
+Usage:
+    python pipeline.py URL [URL ...] [--section History] [--concurrency 8] [--pool-size 4]
+"""
+
+import argparse
+import asyncio
+import time
+
+from mcp_client import MCPServerPool, call_mcp_summarize
+from scraper import AsyncScraper
+
+
+class StageMetrics:
+    """Throughput counters for one pipeline stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.failures = 0
+        self.busy_seconds = 0.0
+        self.first_start = None
+        self.last_end = None
+
+    def record(self, start, end, failed=False):
+        self.items += 1
+        self.failures += int(failed)
+        self.busy_seconds += end - start
+        self.first_start = start if self.first_start is None else min(self.first_start, start)
+        self.last_end = end if self.last_end is None else max(self.last_end, end)
+
+    @property
+    def span(self):
+        """Seconds from the stage's first item start to its last item end."""
+        if self.first_start is None:
+            return 0.0
+        return self.last_end - self.first_start
+
+    def as_dict(self):
+        return {
+            "items": self.items,
+            "failures": self.failures,
+            "span_seconds": round(self.span, 3),
+            "busy_seconds": round(self.busy_seconds, 3),
+            "items_per_second": round(self.items / self.span, 3) if self.span else None,
+        }
+
+
+async def run_pipeline(urls, section=None, concurrency=8, pool_size=4, queue_size=None,
+                       max_length="short", scraper_options=None):
+    """
+    Scrape URLs and summarize them with overlapping stages.
+
+    Args:
+        urls: Iterable of page URLs
+        section: Section title to extract; the whole article when None
+        concurrency: Pages loading at the same time
+        pool_size: MCP server processes (concurrent summaries)
+        queue_size: Maximum scraped documents waiting for a summarizer
+                    (default: 2 * pool_size)
+        max_length: Desired summary length - 'short', 'medium', or 'long'
+        scraper_options: Extra keyword arguments for AsyncScraper
+
+    Returns:
+        dict: {"results": [...], "metrics": {...}}; results are in completion order
+    """
+    queue = asyncio.Queue(maxsize=queue_size or 2 * pool_size)
+    scrape_metrics = StageMetrics("scrape")
+    summarize_metrics = StageMetrics("summarize")
+    results = []
+    max_queue_depth = 0
+
+    scraper = AsyncScraper(concurrency=concurrency, **(scraper_options or {}))
+    pool = MCPServerPool(size=pool_size)
+
+    async def produce():
+        nonlocal max_queue_depth
+        async for document in scraper.scrape_many(urls, section=section):
+            end = time.perf_counter()
+            scrape_metrics.record(end - document["elapsed"], end, failed=bool(document["error"]))
+            await queue.put(document)
+            max_queue_depth = max(max_queue_depth, queue.qsize())
+        for _ in range(pool_size):
+            await queue.put(None)
+
+    async def consume():
+        while True:
+            document = await queue.get()
+            if document is None:
+                return
+            result = None
+            error = document["error"]
+            start = time.perf_counter()
+            if document["text"]:
+                result = await call_mcp_summarize(document["text"], pool=pool,
+                                                  max_length=max_length, verbose=False)
+                summarize_metrics.record(start, time.perf_counter(), failed=result is None)
+                if result is None:
+                    error = error or "Summarization failed"
+            else:
+                # Skip the MCP call for empty content, like the test scripts do
+                error = error or "No text extracted"
+            results.append({
+                "url": document["url"],
+                "title": document["title"],
+                "section": document["section"],
+                "text_length": len(document["text"]),
+                "summary": result["summary"] if result else None,
+                "error": error,
+                "scrape_seconds": round(document["elapsed"], 3),
+                "summarize_seconds": round(time.perf_counter() - start, 3) if document["text"] else 0.0,
+            })
+
+    start = time.perf_counter()
+    try:
+        # Browser launch and server start-up overlap as well
+        await asyncio.gather(scraper.start(), pool.start())
+        startup_seconds = time.perf_counter() - start
+        await asyncio.gather(produce(), *(consume() for _ in range(pool_size)))
+    finally:
+        await asyncio.gather(scraper.close(), pool.close(), return_exceptions=True)
+    total = time.perf_counter() - start
+
+    metrics = {
+        "total_seconds": round(total, 3),
+        "startup_seconds": round(startup_seconds, 3),
+        "scrape": scrape_metrics.as_dict(),
+        "summarize": summarize_metrics.as_dict(),
+        "max_queue_depth": max_queue_depth,
+        "queue_size": queue.maxsize,
+        "blocked_requests": scraper.stats["blocked_requests"],
+        "replaced_workers": pool.stats["replaced_workers"],
+    }
+    return {"results": results, "metrics": metrics}
+
+
+def print_metrics(metrics):
+    """Print per-stage throughput and how much of the two stages overlapped."""
+    scrape, summarize = metrics["scrape"], metrics["summarize"]
+    print("\n" + "="*80)
+    print("PIPELINE METRICS:")
+    print("="*80)
+    print(f"Startup (browser + MCP servers): {metrics['startup_seconds']:.2f}s")
+    for name, stage in (("Scrape", scrape), ("Summarize", summarize)):
+        rate = f"{stage['items_per_second']:.2f}/s" if stage["items_per_second"] else "n/a"
+        print(f"{name:<10} {stage['items']} item(s), {stage['failures']} failure(s), "
+              f"span {stage['span_seconds']:.2f}s, {rate}")
+    print(f"Max queue depth: {metrics['max_queue_depth']}/{metrics['queue_size']}")
+    print(f"End-to-end: {metrics['total_seconds']:.2f}s "
+          f"(max of stages {max(scrape['span_seconds'], summarize['span_seconds']):.2f}s, "
+          f"sum {scrape['span_seconds'] + summarize['span_seconds']:.2f}s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape pages and summarize them with overlapping stages")
+    parser.add_argument("urls", nargs="+", help="Page URLs")
+    parser.add_argument("--section", help="Section title to extract (default: whole article)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Pages loading at the same time")
+    parser.add_argument("--pool-size", type=int, default=4, help="MCP servers (concurrent summaries)")
+    parser.add_argument("--queue-size", type=int, help="Scraped documents waiting for a summarizer")
+    parser.add_argument("--max-length", default="short", choices=["short", "medium", "long"])
+    parser.add_argument("--offline", action="store_true",
+                        help="Serve saved snapshots and summarize without Gemini (see fixtures.py)")
+    args = parser.parse_args()
+
+    scraper_options = None
+    if args.offline:
+        from fixtures import load_fixtures, warn_synthetic, use_offline_summarizer
+        use_offline_summarizer()
+        scraper_options = {"fixtures": load_fixtures()}
+        warn_synthetic(scraper_options["fixtures"])
+    output = asyncio.run(run_pipeline(args.urls, section=args.section, concurrency=args.concurrency,
+                                      pool_size=args.pool_size, queue_size=args.queue_size,
+                                      max_length=args.max_length, scraper_options=scraper_options))
+    for result in output["results"]:
+        print("\n" + "="*80)
+        print(f"{result['url']} ({result['text_length']} chars)")
+        print("="*80)
+        print(result["summary"] or f"[ERROR] {result['error']}")
+    print_metrics(output["metrics"])
@@ -0,0 +1,229 @@
+"""
+Async Scraping Engine
+Scrapes many Wikipedia pages concurrently with one headless browser.
+
+One browser is launched per engine. Each concurrency slot owns a browser
+context with a single page, and slots are handed out through a queue, so at
+most `concurrency` pages load at a time. Images, fonts and media (and
+optionally CSS) are aborted at the network layer. Pages are only waited on
+until `domcontentloaded`, because Wikipedia article text is server-rendered.
+
+Usage:
+    async with AsyncScraper(concurrency=8) as scraper:
+        async for document in scraper.scrape_many(urls):
+            print(document["url"], len(document["text"]))
+
+Or from the command line (optionally summarizing through a server pool):
+    python scraper.py https://en.wikipedia.org/wiki/Artificial_intelligence --section History --summarize
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from playwright.async_api import async_playwright
+
+from section_extraction import collect_structure_async, find_section, article_paragraphs
+
+
+# Resource types aborted by default; "stylesheet" is added with block_css=True.
+# Blocking CSS is faster but lets display:none elements leak into innerText.
+DEFAULT_BLOCKED_RESOURCES = ("image", "font", "media")
+
+
+class AsyncScraper:
+    """
+    Shared browser with a pool of contexts/pages.
+
+    Args:
+        concurrency: Number of pages loading at the same time
+        browser_type: 'firefox', 'chromium' or 'webkit'
+        headless: Run the browser without a window
+        blocked_resources: Playwright resource types to abort
+        block_css: Also abort stylesheets
+        wait_until: Load state passed to page.goto
+        timeout: Navigation timeout in milliseconds
+        fixtures: Optional {url: html_path} map for offline mode; fixture URLs are
+                  served from disk and every other request is aborted
+                  (see fixtures.load_fixtures)
+    """
+
+    def __init__(self, concurrency=8, browser_type="firefox", headless=True,
+                 blocked_resources=DEFAULT_BLOCKED_RESOURCES, block_css=False,
+                 wait_until="domcontentloaded", timeout=60000, fixtures=None):
+        self.concurrency = concurrency
+        self.browser_type = browser_type
+        self.headless = headless
+        self.blocked_resources = set(blocked_resources) | ({"stylesheet"} if block_css else set())
+        self.wait_until = wait_until
+        self.timeout = timeout
+        self.fixtures = fixtures
+        self.stats = {"pages": 0, "failures": 0, "blocked_requests": 0}
+        self._playwright = None
+        self._browser = None
+        self._pages = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        """Launch the browser and open one context/page per concurrency slot."""
+        self._playwright = await async_playwright().start()
+        launcher = getattr(self._playwright, self.browser_type)
+        self._browser = await launcher.launch(headless=self.headless)
+        self._pages = asyncio.Queue()
+        pages = await asyncio.gather(*(self._new_page() for _ in range(self.concurrency)))
+        for page in pages:
+            self._pages.put_nowait(page)
+        print(f"[Scraper] {self.browser_type} ready with {self.concurrency} page(s), "
+              f"blocking: {sorted(self.blocked_resources) or 'nothing'}"
+              + (f", offline with {len(self.fixtures)} fixture(s)" if self.fixtures is not None else ""),
+              file=sys.stderr)
+
+    async def close(self):
+        """Close every context, the browser and Playwright."""
+        if self._browser:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _new_page(self):
+        context = await self._browser.new_context()
+        if self.blocked_resources or self.fixtures is not None:
+            await context.route("**/*", self._route)
+        page = await context.new_page()
+        page.set_default_timeout(self.timeout)
+        return page
+
+    async def _route(self, route):
+        if self.fixtures is not None:
+            fixture = self.fixtures.get(route.request.url)
+            if fixture:
+                await route.fulfill(path=fixture, content_type="text/html; charset=utf-8")
+            else:
+                self.stats["blocked_requests"] += 1
+                await route.abort()
+        elif route.request.resource_type in self.blocked_resources:
+            self.stats["blocked_requests"] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _recycle(self, page):
+        # A page that failed mid-navigation may be left in a bad state; replace its context
+        try:
+            await page.context.close()
+        except Exception:
+            pass
+        return await self._new_page()
+
+    async def scrape(self, url, section=None, level=2):
+        """
+        Load one URL and extract its text.
+
+        Args:
+            url: Page URL
+            section: Section title to extract; the whole article when None
+            level: Heading level of the section
+
+        Returns:
+            dict: {"url", "title", "section", "text", "paragraphs", "elapsed", "error"}
+        """
+        page = await self._pages.get()
+        start = time.perf_counter()
+        document = {"url": url, "title": None, "section": section, "text": "",
+                    "paragraphs": 0, "elapsed": 0.0, "error": None}
+        try:
+            await page.goto(url, wait_until=self.wait_until, timeout=self.timeout)
+            document["title"] = await page.title()
+            structure = await collect_structure_async(page)
+            if section:
+                found = find_section(structure, section, level=level)
+                content = found["paragraphs"] if found else []
+                if found is None:
+                    document["error"] = f"Section '{section}' not found"
+            else:
+                content = article_paragraphs(structure)
+            document["text"] = "\n\n".join(content)
+            document["paragraphs"] = len(content)
+            self.stats["pages"] += 1
+        except Exception as e:
+            document["error"] = str(e)
+            self.stats["failures"] += 1
+            page = await self._recycle(page)
+        finally:
+            document["elapsed"] = time.perf_counter() - start
+            self._pages.put_nowait(page)
+        return document
+
+    async def scrape_many(self, urls, section=None, level=2):
+        """
+        Scrape URLs concurrently and yield documents as they finish.
+
+        Only `concurrency` scrapes are in flight at a time, so `urls` may be a
+        long (or lazy) iterable; results are yielded in completion order.
+        """
+        urls = iter(urls)
+        pending = set()
+        while True:
+            while len(pending) < self.concurrency:
+                url = next(urls, None)
+                if url is None:
+                    break
+                pending.add(asyncio.create_task(self.scrape(url, section=section, level=level)))
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+
+
+async def _main(args):
+    from mcp_client import MCPServerPool, summarize_stream
+
+    fixtures = None
+    if args.offline:
+        from fixtures import load_fixtures
+        fixtures = load_fixtures()
+
+    start = time.perf_counter()
+    async with AsyncScraper(concurrency=args.concurrency, browser_type=args.browser,
+                            headless=not args.headed, block_css=args.block_css,
+                            fixtures=fixtures) as scraper:
+        documents = scraper.scrape_many(args.urls, section=args.section)
+        if not args.summarize:
+            async for document in documents:
+                print(f"[{document['elapsed']:.2f}s] {document['url']}: "
+                      f"{len(document['text'])} chars, {document['paragraphs']} paragraphs"
+                      + (f" [ERROR] {document['error']}" if document["error"] else ""))
+        else:
+            async with MCPServerPool(size=args.pool_size) as pool:
+                async for document, result in summarize_stream(documents, pool, max_length=args.max_length):
+                    print("\n" + "="*80)
+                    print(f"{document['url']} ({len(document['text'])} chars)")
+                    print("="*80)
+                    print(result["summary"] if result else f"[ERROR] {document['error'] or 'Summarization failed'}")
+        print(f"\n[Scraper] {scraper.stats['pages']} page(s), {scraper.stats['failures']} failure(s), "
+              f"{scraper.stats['blocked_requests']} blocked request(s) in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape Wikipedia pages concurrently")
+    parser.add_argument("urls", nargs="+", help="Page URLs")
+    parser.add_argument("--section", help="Section title to extract (default: whole article)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Pages loading at the same time")
+    parser.add_argument("--browser", default="firefox", choices=["firefox", "chromium", "webkit"])
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    parser.add_argument("--block-css", action="store_true", help="Also block stylesheets")
+    parser.add_argument("--offline", action="store_true", help="Serve saved snapshots instead of the network (see fixtures.py)")
+    parser.add_argument("--summarize", action="store_true", help="Summarize each page through the MCP server pool")
+    parser.add_argument("--pool-size", type=int, default=4, help="MCP servers for --summarize")
+    parser.add_argument("--max-length", default="short", choices=["short", "medium", "long"])
+    asyncio.run(_main(parser.parse_args()))
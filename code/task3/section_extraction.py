@@ -0,0 +1,121 @@
+"""
+Section Extraction Module
+Collects the heading/paragraph structure of a Wikipedia page in a single
+`page.evaluate` call and slices sections in Python.
+
+Walking `#mw-content-text p` with per-paragraph `compareDocumentPosition`,
+`element_handle()` and `inner_text()` calls costs several browser round trips
+per paragraph; this module costs one round trip per page.
+"""
+
+# Headings and content paragraphs in document order, with their rendered text.
+# querySelectorAll returns matches in document order, so no position checks are needed.
+_STRUCTURE_JS = """
+() => Array.from(document.querySelectorAll("h1, h2, h3, h4, h5, h6, #mw-content-text p")).map(node => {
+    if (node.tagName === "P") {
+        return {type: "paragraph", text: node.innerText.trim()};
+    }
+    const wrapper = node.closest(".mw-heading");
+    return {
+        type: "heading",
+        level: Number(node.tagName.substring(1)),
+        id: node.id || (wrapper && wrapper.id) || null,
+        text: node.innerText.trim()
+    };
+})
+"""
+
+# Paragraphs shorter than this are skipped (empty spacers, coordinates, etc.)
+MIN_PARAGRAPH_CHARS = 20
+
+
+def collect_structure(page):
+    """
+    Collect the page's headings and paragraphs with one round trip (sync Playwright API).
+
+    Args:
+        page: playwright.sync_api.Page
+
+    Returns:
+        list[dict]: Items in document order, either
+            {"type": "heading", "level", "id", "text"} or {"type": "paragraph", "text"}
+    """
+    return page.evaluate(_STRUCTURE_JS)
+
+
+async def collect_structure_async(page):
+    """Async Playwright variant of collect_structure."""
+    return await page.evaluate(_STRUCTURE_JS)
+
+
+def list_sections(structure, level=2):
+    """
+    Return the titles of all headings of the given level, in page order.
+    """
+    return [item["text"] for item in structure if item["type"] == "heading" and item["level"] == level]
+
+
+def find_section(structure, title, level=2, min_chars=MIN_PARAGRAPH_CHARS):
+    """
+    Slice one section out of a collected page structure.
+
+    The section starts at the first heading of `level` whose text contains
+    `title` (or whose id equals it) and ends at the next heading of the same
+    or a higher level, so subsection paragraphs are included.
+
+    Args:
+        structure: Output of collect_structure
+        title: Section title (substring match) or heading id
+        level: Heading level of the section (2 for <h2>)
+        min_chars: Skip paragraphs shorter than this
+
+    Returns:
+        dict: {"title", "id", "heading_index", "next_section", "paragraphs"},
+              or None if no such section exists
+    """
+    headings = [i for i, item in enumerate(structure)
+                if item["type"] == "heading" and item["level"] == level]
+
+    for position, index in enumerate(headings):
+        heading = structure[index]
+        if title not in heading["text"] and heading["id"] != title:
+            continue
+
+        paragraphs = []
+        next_section = None
+        for item in structure[index + 1:]:
+            if item["type"] == "heading" and item["level"] <= level:
+                next_section = item["text"]
+                break
+            if item["type"] == "paragraph" and len(item["text"]) > min_chars:
+                paragraphs.append(item["text"])
+
+        return {
+            "title": heading["text"],
+            "id": heading["id"],
+            "heading_index": position,
+            "next_section": next_section,
+            "paragraphs": paragraphs
+        }
+    return None
+
+
+def article_paragraphs(structure, min_chars=MIN_PARAGRAPH_CHARS):
+    """
+    Return every substantial paragraph of the main content area, in page order.
+    """
+    return [item["text"] for item in structure
+            if item["type"] == "paragraph" and len(item["text"]) > min_chars]
+
+
+def extract_section_text(page, title, level=2):
+    """
+    Convenience wrapper: collect the structure and return one section's text.
+
+    Returns:
+        tuple[str, dict | None]: (paragraphs joined by blank lines, section dict or None)
+    """
+    section = find_section(collect_structure(page), title, level=level)
+    if section is None:
+        return "", None
+    return "\n\n".join(section["paragraphs"]), section
@@ -4,7 +4,9 @@ import sys
 import os
 import time
 import datetime
+import re
 import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # Suppress stdout during imports to avoid polluting MCP protocol
 _original_stdout = sys.stdout
@@ -14,6 +16,9 @@ from dotenv import load_dotenv
 
 # FastMCP Import
 from mcp.server.fastmcp import FastMCP
+# server_cli.py lives in code/common, shared with the task2 servers
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+from server_cli import run_server, http_app
 from langchain_experimental.text_splitter import SemanticChunker
 from langchain_huggingface import HuggingFaceEmbeddings
 # PDF and Language Detection Imports (lightweight)
@@ -138,10 +143,164 @@ def detect_language(text: str) -> str:
         return json.dumps({"error": f"Error detecting language: {str(e)}"})
 
 
+# --- Summarization settings ---
+MODEL_NAME = "gemini-3-flash-preview"
+# 'gemini', or 'local': answer with the leading sentences of the text instead of
+# calling Gemini, so offline runs (fixtures.py, --offline) need no network
+SUMMARY_BACKEND = os.getenv("SUMMARY_BACKEND", "gemini")
+
+# Inputs above this many tokens are summarized with a chunked map-reduce
+# instead of a single prompt (keeps each call well inside the context window)
+MAX_INPUT_TOKENS = int(os.getenv("SUMMARIZE_MAX_INPUT_TOKENS", "100000"))
+# Target size of each map-step chunk
+CHUNK_TOKENS = int(os.getenv("SUMMARIZE_CHUNK_TOKENS", "20000"))
+# Parallel chunk calls in the map step
+MAP_WORKERS = int(os.getenv("SUMMARIZE_MAP_WORKERS", "4"))
+# Rough chars-per-token ratio, used to skip the count_tokens call for clearly
+# small inputs and as a fallback when the tokenizer endpoint is unavailable
+CHARS_PER_TOKEN = 4
+
+LENGTH_GUIDE = {
+    "short": "in 2-3 sentences",
+    "medium": "in 1-2 paragraphs",
+    "long": "in 3-4 paragraphs with detailed key points"
+}
+
+SYSTEM_PROMPT = (
+    "You are a professional text summarization assistant. "
+    "Your task is to create clear, concise, and accurate summaries. "
+    "Focus on the main ideas, key points, and essential information. "
+    "Maintain objectivity and do not add information not present in the original text."
+)
+
+
+class SummarizationError(Exception):
+    """LLM call failed; the message is returned to the client as the error."""
+
+
+def _leading_sentences(user_prompt, count=3):
+    """Offline stand-in summary: the first sentences of the prompt's input text."""
+    text = user_prompt.split("\n\n", 1)[-1]
+    return " ".join(re.split(r"(?<=[.?!])\s+", text.strip())[:count])
+
+
+def _generate(client, user_prompt):
+    """Call Gemini with retry and exponential backoff on rate limits."""
+    if SUMMARY_BACKEND == "local":
+        return _leading_sentences(user_prompt)
+    max_retries = 3
+    retry_delay = 30  # seconds
+    for attempt in range(max_retries):
+        try:
+            response = client.models.generate_content(
+                model=MODEL_NAME,
+                contents=user_prompt,
+                config={
+                    'system_instruction': SYSTEM_PROMPT,
+                    'temperature': 0.7,
+                }
+            )
+            return response.text.strip()
+        except Exception as e:
+            if "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e):
+                if attempt < max_retries - 1:
+                    wait_time = retry_delay * (2 ** attempt)  # Exponential backoff
+                    print(f"Rate limit hit. Waiting {wait_time} seconds before retry {attempt + 2}/{max_retries}...", file=sys.stderr)
+                    time.sleep(wait_time)
+                else:
+                    raise SummarizationError(f"Rate limit exceeded after {max_retries} retries")
+            else:
+                raise SummarizationError(f"LLM API error: {str(e)}")
+
+
+def _count_tokens(client, text):
+    """
+    Count the tokens of a text with the Gemini tokenizer.
+
+    Texts whose estimate is far below the limit are not sent to count_tokens,
+    so normal-sized requests cost no extra round trip.
+
+    Returns:
+        tuple: (token count, "count_tokens" or "estimate")
+    """
+    estimate = len(text) // CHARS_PER_TOKEN
+    if estimate < MAX_INPUT_TOKENS // 2 or client is None:
+        return estimate, "estimate"
+    try:
+        response = client.models.count_tokens(model=MODEL_NAME, contents=text)
+        return response.total_tokens, "count_tokens"
+    except Exception as e:
+        print(f"MCP Server: count_tokens failed ({e}), using character estimate", file=sys.stderr)
+        return estimate, "estimate"
+
+
+def _split_text(text, max_chars):
+    """Split text into pieces of at most max_chars, at paragraph, then line, then word boundaries."""
+    pieces = []
+    current = ""
+    for paragraph in text.split("\n\n"):
+        if len(paragraph) > max_chars:
+            # Oversized paragraph: fall back to lines, then words
+            separator = "\n" if "\n" in paragraph else " "
+            parts = paragraph.split(separator)
+        else:
+            separator, parts = "\n\n", [paragraph]
+        for part in parts:
+            while len(part) > max_chars:
+                pieces.append(part[:max_chars])
+                part = part[max_chars:]
+            if current and len(current) + len(separator) + len(part) > max_chars:
+                pieces.append(current)
+                current = part
+            else:
+                current = current + separator + part if current else part
+    if current.strip():
+        pieces.append(current)
+    return [piece for piece in pieces if piece.strip()]
+
+
+def _map_reduce_summary(client, text, max_length, input_tokens):
+    """
+    Summarize an oversized text: summarize chunks in parallel, then summarize the summaries.
+
+    Returns:
+        tuple: (summary, reduce-step user prompt, number of chunks)
+    """
+    # Size chunks with the measured chars-per-token ratio of this text
+    chars_per_token = len(text) / max(input_tokens, 1)
+    chunks = _split_text(text, max(int(CHUNK_TOKENS * chars_per_token), 1000))
+    print(f"MCP Server: Input has ~{input_tokens} tokens, map-reduce over {len(chunks)} chunks", file=sys.stderr)
+
+    chunk_prompts = [
+        f"The following text is part {i} of {len(chunks)} of a longer document. "
+        f"Summarize this part {LENGTH_GUIDE['medium']}:\n\n{chunk}"
+        for i, chunk in enumerate(chunks, 1)
+    ]
+    with ThreadPoolExecutor(max_workers=MAP_WORKERS) as executor:
+        chunk_summaries = list(executor.map(lambda prompt: _generate(client, prompt), chunk_prompts))
+
+    combined = "\n\n".join(f"Part {i}: {summary}" for i, summary in enumerate(chunk_summaries, 1))
+    if len(combined) // CHARS_PER_TOKEN > MAX_INPUT_TOKENS:
+        # Summaries of a huge input can still be too long: reduce again
+        combined, _, _ = _map_reduce_summary(client, combined, "long", len(combined) // CHARS_PER_TOKEN)
+
+    user_prompt = (
+        f"The following are summaries of consecutive parts of one document. "
+        f"Combine them into a single summary of the whole document {LENGTH_GUIDE.get(max_length, LENGTH_GUIDE['medium'])}:\n\n"
+        f"{combined}"
+    )
+    return _generate(client, user_prompt), user_prompt, len(chunks)
+
+
 @mcp.tool()
 def summarize_text(text: str, max_length: str = "medium") -> str:
     """
     Summarize text using Gemini LLM.
+
+    Inputs larger than MAX_INPUT_TOKENS (counted with the Gemini tokenizer) are
+    split into chunks that are summarized in parallel and then combined; the
+    result has the same shape either way. With SUMMARY_BACKEND=local the
+    summary is the leading sentences of the text, for offline runs.
     
     Args:
         text: Text to summarize
@@ -156,80 +315,52 @@ def summarize_text(text: str, max_length: str = "medium") -> str:
         if not text or not text.strip():
             return json.dumps({"error": "Text is empty or contains only whitespace"})
         
-        # Define length guidelines
-        length_guide = {
-            "short": "in 2-3 sentences",
-            "medium": "in 1-2 paragraphs",
-            "long": "in 3-4 paragraphs with detailed key points"
-        }
-        
-        # Create system and user prompts
-        system_prompt = (
-            "You are a professional text summarization assistant. "
-            "Your task is to create clear, concise, and accurate summaries. "
-            "Focus on the main ideas, key points, and essential information. "
-            "Maintain objectivity and do not add information not present in the original text."
-        )
-        
-        user_prompt = (
-            f"Please summarize the following text {length_guide.get(max_length, length_guide['medium'])}:\n\n"
-            f"{text}"
-        )
-        
-        # Get API key
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            return json.dumps({"error": "GOOGLE_API_KEY not found in environment variables"})
-        
-        client = genai.Client(api_key=api_key)
-        
-        # Retry logic for rate limiting
-        max_retries = 3
-        retry_delay = 30  # seconds
-        summary = None
-        model_name = "gemini-3-flash-preview"
+        if SUMMARY_BACKEND == "local":
+            client = None
+        else:
+            # Get API key
+            api_key = os.getenv("GOOGLE_API_KEY")
+            if not api_key:
+                return json.dumps({"error": "GOOGLE_API_KEY not found in environment variables"})
+            client = genai.Client(api_key=api_key)
+        input_tokens, token_count_method = _count_tokens(client, text)
         
-        for attempt in range(max_retries):
-            try:
-                response = client.models.generate_content(
-                    model=model_name,
-                    contents=user_prompt,
-                    config={
-                        'system_instruction': system_prompt,
-                        'temperature': 0.7,
-                    }
+        try:
+            if input_tokens > MAX_INPUT_TOKENS:
+                strategy = "map_reduce"
+                summary, user_prompt, num_chunks = _map_reduce_summary(client, text, max_length, input_tokens)
+            else:
+                strategy = "single"
+                num_chunks = 1
+                user_prompt = (
+                    f"Please summarize the following text {LENGTH_GUIDE.get(max_length, LENGTH_GUIDE['medium'])}:\n\n"
+                    f"{text}"
                 )
-                summary = response.text.strip()
-                break  # Success, exit retry loop
-                
-            except Exception as e:
-                if "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e):
-                    if attempt < max_retries - 1:
-                        wait_time = retry_delay * (2 ** attempt)  # Exponential backoff
-                        print(f"Rate limit hit. Waiting {wait_time} seconds before retry {attempt + 2}/{max_retries}...", file=sys.stderr)
-                        time.sleep(wait_time)
-                    else:
-                        return json.dumps({"error": f"Rate limit exceeded after {max_retries} retries"})
-                else:
-                    return json.dumps({"error": f"LLM API error: {str(e)}"})
+                summary = _generate(client, user_prompt)
+        except SummarizationError as e:
+            return json.dumps({"error": str(e)})
         
         # Prepare structured response
         result = {
             "summary": summary,
             "prompt": {
-                "system_prompt": system_prompt,
+                "system_prompt": SYSTEM_PROMPT,
                 "user_prompt": user_prompt
             },
             "metadata": {
                 "input_length": len(text),
+                "input_tokens": input_tokens,
+                "token_count_method": token_count_method,
+                "strategy": strategy,
+                "num_chunks": num_chunks,
                 "summary_length": len(summary),
-                "model": model_name,
+                "model": MODEL_NAME if SUMMARY_BACKEND != "local" else "local",
                 "max_length": max_length,
                 "timestamp": datetime.datetime.now().isoformat()
             }
         }
         
-        print(f"MCP Server: Summarized {len(text)} chars to {len(summary)} chars", file=sys.stderr)
+        print(f"MCP Server: Summarized {len(text)} chars to {len(summary)} chars ({strategy})", file=sys.stderr)
         return json.dumps(result, indent=2)
         
     except Exception as e:
@@ -414,7 +545,12 @@ def summarize_pdf(pdf_path: str) -> str:
     except Exception as e:
         return json.dumps({"error": f"Error in summarize_pdf: {str(e)}"})
 
+def create_http_app():
+    """ASGI app factory used by uvicorn worker processes in HTTP mode."""
+    return http_app(mcp)
+
+
 if __name__ == "__main__":
-    print("Launching FastMCP Server via stdio...", file=sys.stderr)
-    mcp.run()
+    # stdio by default; --transport streamable-http/sse --host --port --workers to share one server
+    run_server(mcp, "summarization_server", default_port=8001, description="Task 3 summarization MCP server")
 # --- End MCP Server ---
@@ -13,12 +13,15 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from mcp_client import call_mcp_summarize
+from fixtures import route_fixtures, load_fixtures, warn_synthetic, use_offline_summarizer
+from section_extraction import collect_structure, find_section
 
 
-def main():
+def main(offline=False):
     """
     Baseline Flow:
-    1. Navigate to Wikipedia AI article
+    1. Navigate to Wikipedia AI article (served from fixtures/ with offline=True,
+       and later summarized without Gemini)
     2. Scroll to Applications section
     3. Extract and print paragraph text from Applications section
     """
@@ -28,6 +31,12 @@ def main():
         print("Launching Firefox browser...")
         browser = p.firefox.launch(headless=False)
         page = browser.new_page()
+        if offline:
+            # Serve the saved snapshot and abort every other request
+            fixtures = load_fixtures()
+            warn_synthetic(fixtures)
+            route_fixtures(page, fixtures)
+            use_offline_summarizer()
         
         try:
             # Step 1: Navigate directly to Wikipedia AI article
@@ -43,66 +52,25 @@ def main():
             page.wait_for_timeout(1000)
             print("[Step 2] ✓ Applications section visible")
             
-            # Step 3: Extract text from Applications section using Python
+            # Step 3: Extract text from Applications section
             print("\n[Step 3] Extracting text from Applications section...")
             
-            # Get all h2 headings
-            all_h2_headings = page.locator("h2").all()
+            # Collect all headings and paragraphs in a single browser round trip
+            structure = collect_structure(page)
             
-            # Find Applications section index
-            applications_index = -1
-            for i, heading in enumerate(all_h2_headings):
-                heading_text = heading.inner_text()
-                if "Applications" in heading_text:
-                    applications_index = i
-                    print(f"[Step 3] Found Applications section at index {i}")
-                    break
+            # Find Applications section and slice its paragraphs in Python
+            applications_section = find_section(structure, "Applications")
             
-            if applications_index == -1:
+            if applications_section is None:
                 print("[ERROR] Applications section not found!")
                 return
             
-            # Get all paragraphs from the page
-            all_paragraphs = page.locator("#mw-content-text p").all()
+            print(f"[Step 3] Found Applications section at index {applications_section['heading_index']}")
+            if applications_section["next_section"]:
+                print(f"[Step 3] Next section is: {applications_section['next_section']}")
             
-            # Get the Applications h2 element
-            applications_h2 = all_h2_headings[applications_index]
-            
-            # Get the next h2 element (Ethics section)
-            next_h2 = None
-            if applications_index + 1 < len(all_h2_headings):
-                next_h2 = all_h2_headings[applications_index + 1]
-                next_section_name = next_h2.inner_text()
-                print(f"[Step 3] Next section is: {next_section_name}")
-            
-            # Now filter paragraphs that are between Applications and next section
-            content = []
-            
-            for p in all_paragraphs:
-                try:
-                    # Check if paragraph comes after Applications heading
-                    is_after_applications = page.evaluate(
-                        "(args) => args.p.compareDocumentPosition(args.h2) & Node.DOCUMENT_POSITION_PRECEDING",
-                        {"p": p.element_handle(), "h2": applications_h2.element_handle()}
-                    )
-                    
-                    # Check if paragraph comes before next section (if exists)
-                    is_before_next = True
-                    if next_h2:
-                        is_before_next = page.evaluate(
-                            "(args) => args.p.compareDocumentPosition(args.h2) & Node.DOCUMENT_POSITION_FOLLOWING",
-                            {"p": p.element_handle(), "h2": next_h2.element_handle()}
-                        )
-                    
-                    # If paragraph is in the Applications section, add it
-                    if is_after_applications and is_before_next:
-                        text = p.inner_text().strip()
-                        if len(text) > 20:  # Only substantial paragraphs
-                            content.append(text)
-                
-                except Exception as e:
-                    # Skip paragraphs that cause errors
-                    continue
+            # Paragraphs between Applications and the next section (only substantial paragraphs)
+            content = applications_section["paragraphs"]
             
             extracted_text = '\n\n'.join(content)
             
@@ -132,8 +100,9 @@ def main():
 
 
 if __name__ == "__main__":
-    # Step 1: Extract Wikipedia content using Playwright
-    extracted_text = main()
+    # Step 1: Extract Wikipedia content using Playwright (--offline: from fixtures/,
+    # summarized by the server's local stand-in)
+    extracted_text = main(offline="--offline" in sys.argv[1:])
     
     # Step 2: Summarize using MCP client
     if extracted_text:
@@ -14,6 +14,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from mcp_client import call_mcp_summarize
+from section_extraction import collect_structure, find_section
 
 
 def main():
@@ -40,18 +41,13 @@ def main():
             # Step 2: Attempt to find a non-existent section
             print("\n[Step 2] Searching for non-existent section 'NonExistentSection'...")
             
-            # Get all h2 headings
-            all_h2_headings = page.locator("h2").all()
+            # Collect all headings and paragraphs in a single browser round trip
+            structure = collect_structure(page)
             
-            # Find section index
-            target_index = -1
-            for i, heading in enumerate(all_h2_headings):
-                heading_text = heading.inner_text()
-                if "NonExistentSection" in heading_text:
-                    target_index = i
-                    break
+            # Find section
+            target_section = find_section(structure, "NonExistentSection")
             
-            if target_index == -1:
+            if target_section is None:
                 print("[Step 2]  'NonExistentSection' not found in headings.")
                 print("\n" + "="*80)
                 print("RESULT: SECTION NOT FOUND ")
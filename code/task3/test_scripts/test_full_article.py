@@ -13,12 +13,15 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from mcp_client import call_mcp_summarize
+from fixtures import route_fixtures, load_fixtures, warn_synthetic, use_offline_summarizer
+from section_extraction import collect_structure, article_paragraphs
 
 
-def main():
+def main(offline=False):
     """
     Large Input Test Flow:
-    1. Navigate to Wikipedia AI article
+    1. Navigate to Wikipedia AI article (served from fixtures/ with offline=True,
+       and later summarized without Gemini)
     2. Extract all paragraph text from the main content area
     3. Summarize the large text block
     """
@@ -28,6 +31,12 @@ def main():
         print("Launching Firefox browser...")
         browser = p.firefox.launch(headless=False)
         page = browser.new_page()
+        if offline:
+            # Serve the saved snapshot and abort every other request
+            fixtures = load_fixtures()
+            warn_synthetic(fixtures)
+            route_fixtures(page, fixtures)
+            use_offline_summarizer()
         
         try:
             # Step 1: Navigate directly to Wikipedia AI article
@@ -39,18 +48,9 @@ def main():
             # Step 2: Extract all paragraph text from main content area
             print("\n[Step 2] Extracting full article text from main content area...")
             
-            # Get all paragraphs from the main content div
-            all_paragraphs = page.locator("#mw-content-text p").all()
-            
-            content = []
-            for p in all_paragraphs:
-                try:
-                    text = p.inner_text().strip()
-                    if len(text) > 20:  # Only substantial paragraphs
-                        content.append(text)
-                except Exception as e:
-                    # Skip paragraphs that cause errors
-                    continue
+            # Get all paragraphs from the main content div in a single browser round trip
+            structure = collect_structure(page)
+            content = article_paragraphs(structure)  # Only substantial paragraphs
             
             extracted_text = '\n\n'.join(content)
             
@@ -81,8 +81,9 @@ def main():
 
 
 if __name__ == "__main__":
-    # Step 1: Extract Wikipedia content using Playwright
-    extracted_text = main()
+    # Step 1: Extract Wikipedia content using Playwright (--offline: from fixtures/,
+    # summarized by the server's local stand-in)
+    extracted_text = main(offline="--offline" in sys.argv[1:])
     
     # Step 2: Summarize using MCP client
     if extracted_text:
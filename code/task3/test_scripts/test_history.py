@@ -13,12 +13,15 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from mcp_client import call_mcp_summarize
+from fixtures import route_fixtures, load_fixtures, warn_synthetic, use_offline_summarizer
+from section_extraction import collect_structure, find_section
 
 
-def main():
+def main(offline=False):
     """
     Baseline Flow:
-    1. Navigate to Wikipedia AI article
+    1. Navigate to Wikipedia AI article (served from fixtures/ with offline=True,
+       and later summarized without Gemini)
     2. Scroll to History section
     3. Extract and print paragraph text from History section
     """
@@ -28,6 +31,12 @@ def main():
         print("Launching Firefox browser...")
         browser = p.firefox.launch(headless=False)
         page = browser.new_page()
+        if offline:
+            # Serve the saved snapshot and abort every other request
+            fixtures = load_fixtures()
+            warn_synthetic(fixtures)
+            route_fixtures(page, fixtures)
+            use_offline_summarizer()
         
         try:
             # Step 1: Navigate directly to Wikipedia AI article
@@ -43,66 +52,25 @@ def main():
             page.wait_for_timeout(1000)
             print("[Step 2] ✓ History section visible")
             
-            # Step 3: Extract text from History section using Python
+            # Step 3: Extract text from History section
             print("\n[Step 3] Extracting text from History section...")
             
-            # Get all h2 headings
-            all_h2_headings = page.locator("h2").all()
+            # Collect all headings and paragraphs in a single browser round trip
+            structure = collect_structure(page)
             
-            # Find History section index
-            history_index = -1
-            for i, heading in enumerate(all_h2_headings):
-                heading_text = heading.inner_text()
-                if "History" in heading_text:
-                    history_index = i
-                    print(f"[Step 3] Found History section at index {i}")
-                    break
+            # Find History section and slice its paragraphs in Python
+            history_section = find_section(structure, "History")
             
-            if history_index == -1:
+            if history_section is None:
                 print("[ERROR] History section not found!")
                 return
             
-            # Get all paragraphs from the page
-            all_paragraphs = page.locator("#mw-content-text p").all()
+            print(f"[Step 3] Found History section at index {history_section['heading_index']}")
+            if history_section["next_section"]:
+                print(f"[Step 3] Next section is: {history_section['next_section']}")
             
-            # Get the History h2 element
-            history_h2 = all_h2_headings[history_index]
-            
-            # Get the next h2 element (Applications section)
-            next_h2 = None
-            if history_index + 1 < len(all_h2_headings):
-                next_h2 = all_h2_headings[history_index + 1]
-                next_section_name = next_h2.inner_text()
-                print(f"[Step 3] Next section is: {next_section_name}")
-            
-            # Now filter paragraphs that are between History and next section
-            content = []
-            
-            for p in all_paragraphs:
-                try:
-                    # Check if paragraph comes after History heading
-                    is_after_history = page.evaluate(
-                        "(args) => args.p.compareDocumentPosition(args.h2) & Node.DOCUMENT_POSITION_PRECEDING",
-                        {"p": p.element_handle(), "h2": history_h2.element_handle()}
-                    )
-                    
-                    # Check if paragraph comes before next section (if exists)
-                    is_before_next = True
-                    if next_h2:
-                        is_before_next = page.evaluate(
-                            "(args) => args.p.compareDocumentPosition(args.h2) & Node.DOCUMENT_POSITION_FOLLOWING",
-                            {"p": p.element_handle(), "h2": next_h2.element_handle()}
-                        )
-                    
-                    # If paragraph is in the History section, add it
-                    if is_after_history and is_before_next:
-                        text = p.inner_text().strip()
-                        if len(text) > 20:  # Only substantial paragraphs
-                            content.append(text)
-                
-                except Exception as e:
-                    # Skip paragraphs that cause errors
-                    continue
+            # Paragraphs between History and the next section (only substantial paragraphs)
+            content = history_section["paragraphs"]
             
             extracted_text = '\n\n'.join(content)
             
@@ -132,8 +100,9 @@ def main():
 
 
 if __name__ == "__main__":
-    # Step 1: Extract Wikipedia content using Playwright
-    extracted_text = main()
+    # Step 1: Extract Wikipedia content using Playwright (--offline: from fixtures/,
+    # summarized by the server's local stand-in)
+    extracted_text = main(offline="--offline" in sys.argv[1:])
     
     # Step 2: Summarize using MCP client
     if extracted_text: